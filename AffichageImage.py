@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+import numpy as np
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtCore import Qt
+
+# Budget mémoire par défaut des pixmaps mises à l'échelle (128 Mo)
+BUDGET_CACHE_PIXMAPS = 128 * 1024 * 1024
+
+# Octets par pixel d'une QPixmap (ARGB32 sur la plupart des plateformes)
+OCTETS_PAR_PIXEL_PIXMAP = 4
+
+# Enveloppe une image uint8 BGR (h, l, 3) ou grise (h, l) dans une QImage sans copier ses
+# pixels : la QImage lit directement le tampon NumPy, qui doit rester en vie aussi longtemps
+# qu'elle. Renvoie (QImage, tableau enveloppé) ; seule une vue non contiguë est copiée
+def envelopper_image(image):
+    image = np.ascontiguousarray(image)
+    haut, larg = image.shape[:2]
+    if image.ndim == 2:
+        return QImage(image.data, larg, haut, larg, QImage.Format.Format_Grayscale8), image
+    return QImage(image.data, larg, haut, 3 * larg, QImage.Format.Format_BGR888), image
+
+class CachePixmaps:
+
+    # Pixmaps de l'image affichée, mises à l'échelle une seule fois par facteur de zoom et
+    # gardées dans un cache LRU limité par un budget en octets. Changer d'image vide le cache
+    def __init__(self, budget_octets=BUDGET_CACHE_PIXMAPS):
+        self.budget_octets = budget_octets
+        self.image = None # Tableau NumPy enveloppé (gardé en vie pour la QImage)
+        self.q_image = None
+        self.pixmaps = OrderedDict()
+        self.total_octets = 0
+
+    # Remplace l'image affichée ; la même image (même tableau) garde ses pixmaps
+    def definir_image(self, image):
+        if image is self.image:
+            return
+        self.vider()
+        if image is not None:
+            self.q_image, self.image = envelopper_image(image)
+
+    # Pixmap de l'image au facteur de zoom donné (mise à l'échelle seulement si absente)
+    def obtenir(self, facteur_zoom):
+        if self.q_image is None:
+            return None
+
+        pixmap = self.pixmaps.get(facteur_zoom)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(facteur_zoom)
+            return pixmap
+
+        larg = max(1, int(self.q_image.width() * facteur_zoom))
+        haut = max(1, int(self.q_image.height() * facteur_zoom))
+        if (larg, haut) == (self.q_image.width(), self.q_image.height()):
+            pixmap = QPixmap.fromImage(self.q_image)
+        else:
+            # La QImage est réduite avant la conversion : seule la taille affichée est convertie
+            pixmap = QPixmap.fromImage(self.q_image.scaled(larg, haut, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                                           Qt.TransformationMode.FastTransformation))
+
+        taille = larg * haut * OCTETS_PAR_PIXEL_PIXMAP
+        if taille <= self.budget_octets:
+            self.pixmaps[facteur_zoom] = pixmap
+            self.total_octets += taille
+            self.evincer()
+        return pixmap
+
+    # Évince les pixmaps les moins récemment utilisées jusqu'à respecter le budget
+    def evincer(self):
+        while self.total_octets > self.budget_octets and self.pixmaps:
+            _, pixmap = self.pixmaps.popitem(last=False)
+            self.total_octets -= pixmap.width() * pixmap.height() * OCTETS_PAR_PIXEL_PIXMAP
+
+    # Vide le cache et libère l'image enveloppée
+    def vider(self):
+        self.pixmaps.clear()
+        self.total_octets = 0
+        self.image = None
+        self.q_image = None
@@ -1,16 +1,20 @@
 import sys
 import os
-import cv2
 from PyQt6 import uic
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QLabel, QFileDialog, QMessageBox,
-    QSizePolicy, QToolButton, QPushButton, QSlider, QScrollArea
+    QSizePolicy, QToolButton, QPushButton, QSlider, QScrollArea, QComboBox
 )
-from PyQt6.QtGui import QPixmap, QImage, QMouseEvent
-from PyQt6.QtCore import Qt, QPoint, pyqtSignal
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtCore import Qt, QPoint, QThread, QTimer, pyqtSignal
+
+from AffichageImage import CachePixmaps
 
 # Import du modèle renommé
-from ModeleurGraphe import ModeleurGraphe
+from CalqueDessin import CalqueDessin
+from ModeleurGraphe import ModeleurGraphe, COULEUR_CHEMIN, COULEUR_DEPART, COULEUR_ARRIVEE
+from SuiviCalcul import SuiviCalcul, CalculAnnule
+from VueTuilee import VueTuilee
 
 # Fonction utilitaire pour obtenir le chemin absolu des ressources (compatible PyInstaller)
 def chemin_ressource(chemin_relatif):
@@ -25,8 +29,44 @@ def chemin_ressource(chemin_relatif):
 # Définition du chemin vers le fichier d'interface
 FICHIER_UI = chemin_ressource('form.ui')
 
+# Au-delà de ce nombre de pixels, l'image est affichée par la vue tuilée (niveaux de détail)
+# plutôt que par une pixmap unique
+SEUIL_PIXELS_VUE_TUILEE = 4096 * 4096
+
+# Délai (ms) de regroupement des mouvements du slider de zoom : seule la dernière valeur
+# d'une rafale est affichée
+DELAI_ZOOM_MS = 40
+
+# Libellés affichés dans la liste déroulante des moteurs de recherche
+LIBELLES_MOTEURS = {
+    'dijkstra': "Dijkstra",
+    'a_etoile': "A* (heuristique grille)",
+    'bidirectionnel': "Dijkstra bidirectionnel",
+    'delta_stepping': "Delta-stepping (vectorisé)",
+    'hierarchique': "Hiérarchique par tuiles (HPA*)",
+    'contraction': "Hiérarchie de contraction",
+    'pyramide': "Pyramide multirésolution",
+    'incremental': "Replanification incrémentale (D* Lite)",
+    'anytime': "Anytime ARA* (budget de temps)",
+}
+
+# Libellés affichés dans la liste déroulante des modèles de coût (la table de transfert 'lut'
+# demande une table et n'est disponible que par ModeleurGraphe.definir_modele_cout)
+LIBELLES_MODELES_COUT = {
+    'contraste': "Contraste |ΔI|",
+    'gradient': "Gradient de Sobel (contours)",
+    'couleur': "Distance couleur Lab",
+}
+
+# Libellés affichés dans la liste déroulante des files de priorité
+LIBELLES_FILES = {
+    'tas': "Tas binaire",
+    'seaux': "Seaux (Dial)",
+}
+
 class LabelImage(QLabel):
     signal_clic = pyqtSignal(QPoint)
+    signal_survol = pyqtSignal(QPoint)
 
     # Initialise le label personnalisé avec les paramètres d'affichage et de souris
     def __init__(self, parent=None):
@@ -34,13 +74,84 @@ class LabelImage(QLabel):
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setScaledContents(False)
         self.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
-        self.setMouseTracking(False)
+        self.setMouseTracking(True) # Nécessaire à l'aperçu du chemin au survol
 
     # Détecte le clic gauche de la souris et émet un signal avec la position
     def mousePressEvent(self, evenement: QMouseEvent):
         if evenement.button() == Qt.MouseButton.LeftButton and self.pixmap() is not None:
             self.signal_clic.emit(evenement.pos())
 
+    # Émet la position de la souris lors du survol (bouton enfoncé ou non)
+    def mouseMoveEvent(self, evenement: QMouseEvent):
+        if self.pixmap() is not None:
+            self.signal_survol.emit(evenement.pos())
+
+class TravailleurArbre(QThread):
+
+    # Étend jusqu'au bout, hors du fil de l'interface, l'arbre des plus courts chemins issu
+    # du départ ; l'aperçu lit pendant ce temps les pixels déjà fixés. Une annulation laisse
+    # dans le cache un arbre partiel que le calcul suivant reprend
+    def __init__(self, modeleur, arbre, parent=None):
+        super().__init__(parent)
+        self.modeleur = modeleur
+        self.arbre = arbre
+        self.suivi = SuiviCalcul()
+
+    def run(self):
+        try:
+            self.modeleur.etendre_arbre(self.arbre, suivi=self.suivi)
+        except CalculAnnule:
+            pass
+
+class TravailleurChemin(QThread):
+    signal_progression = pyqtSignal(int, int)
+    signal_resultat = pyqtSignal(object)
+    signal_annule = pyqtSignal()
+    signal_erreur = pyqtSignal(str)
+
+    # Calcule le chemin avec le moteur sélectionné hors du fil de l'interface. La progression
+    # (pixels fixés, distance de la frontière) et le résultat sont transmis par signaux ; le
+    # suivi permet d'annuler le calcul depuis l'interface
+    def __init__(self, modeleur, noeud_depart, noeud_arrivee, parent=None):
+        super().__init__(parent)
+        self.modeleur = modeleur
+        self.noeud_depart = noeud_depart
+        self.noeud_arrivee = noeud_arrivee
+        self.suivi = SuiviCalcul(self.signal_progression.emit)
+
+    def run(self):
+        try:
+            resultat = self.modeleur.calculer_chemin(self.noeud_depart, self.noeud_arrivee, self.suivi)
+        except CalculAnnule:
+            self.signal_annule.emit()
+        except Exception as erreur:
+            self.signal_erreur.emit(str(erreur))
+        else:
+            self.signal_resultat.emit(resultat)
+
+class TravailleurReperes(QThread):
+    signal_progression = pyqtSignal(int, int)
+    signal_resultat = pyqtSignal(bool, str)
+    signal_annule = pyqtSignal()
+    signal_erreur = pyqtSignal(str)
+
+    # Calcule les repères ALT hors du fil de l'interface, avec les mêmes signaux et le même
+    # suivi (annulation depuis l'interface) que le calcul de chemin
+    def __init__(self, modeleur, parent=None):
+        super().__init__(parent)
+        self.modeleur = modeleur
+        self.suivi = SuiviCalcul(self.signal_progression.emit)
+
+    def run(self):
+        try:
+            succes, message = self.modeleur.pretraiter_reperes(suivi=self.suivi)
+        except CalculAnnule:
+            self.signal_annule.emit()
+        except Exception as erreur:
+            self.signal_erreur.emit(str(erreur))
+        else:
+            self.signal_resultat.emit(succes, message)
+
 class ApplicationChemin(QMainWindow):
     # Constructeur principal : charge l'interface UI et initialise les variables
     def __init__(self, modeleur_graphe):
@@ -49,7 +160,17 @@ class ApplicationChemin(QMainWindow):
         self.point_depart = None
         self.point_arrivee = None
         self.facteur_zoom = 1.0
+        self.affichage_tuile = False # Image courante affichée par la vue tuilée
+        self.cache_pixmaps = CachePixmaps() # Image affichée mise à l'échelle, par facteur de zoom
+        self.minuterie_zoom = QTimer(self) # Regroupe les valueChanged du slider de zoom
+        self.minuterie_zoom.setSingleShot(True)
+        self.minuterie_zoom.setInterval(DELAI_ZOOM_MS)
+        self.minuterie_zoom.timeout.connect(self.afficher_pixmap)
         self.est_en_cours = False
+        self.arbre_apercu = None # Arbre des plus courts chemins issu du départ (aperçu au survol)
+        self.calque_apercu = None # Calque du chemin d'aperçu, superposé au calque du modeleur
+        self.travailleurs_arbre = set() # Fils en cours (gardés en vie jusqu'à leur fin)
+        self.travailleur_chemin = None # Fil du calcul lancé par 'Calculer' ou du prétraitement ALT
 
         if not os.path.exists(FICHIER_UI):
              raise FileNotFoundError(f"Le fichier {FICHIER_UI} est introuvable.")
@@ -74,6 +195,16 @@ class ApplicationChemin(QMainWindow):
         else:
             self.setCentralWidget(self.label_image)
 
+        # Vue tuilée des très grandes images, placée à côté de la zone de défilement et
+        # affichée à sa place quand l'image dépasse SEUIL_PIXELS_VUE_TUILEE
+        self.vue_tuilee = VueTuilee()
+        self.vue_tuilee.setObjectName('vueTuilee')
+        self.vue_tuilee.hide()
+        if self.zone_defilement:
+            self.vue_tuilee.setSizePolicy(self.zone_defilement.sizePolicy())
+            disposition = self.zone_defilement.parentWidget().layout()
+            disposition.insertWidget(disposition.indexOf(self.zone_defilement) + 1, self.vue_tuilee)
+
         # 2. Récupération des Labels (Nouveaux noms français dans le findChild)
         self.lbl_dimensions = self.findChild(QLabel, 'valeurDimLabel')
         self.lbl_noeuds = self.findChild(QLabel, 'valeurNoeudsLabel')
@@ -93,18 +224,29 @@ class ApplicationChemin(QMainWindow):
         self.btn_charger = self.findChild(QToolButton, 'boutonCharger')
         self.btn_reset = self.findChild(QToolButton, 'boutonReinitialiser')
         self.btn_calculer = self.findChild(QPushButton, 'boutonCalculer')
+        self.btn_annuler = self.findChild(QPushButton, 'boutonAnnuler')
+        self.btn_reperes = self.findChild(QToolButton, 'boutonReperes')
 
         self.btn_conn4 = self.findChild(QToolButton, 'boutonConnexite4')
         self.btn_conn8 = self.findChild(QToolButton, 'boutonConnexite8')
 
         self.slider_zoom = self.findChild(QSlider, 'sliderZoom')
+        self.combo_moteur = self.findChild(QComboBox, 'comboMoteur')
+        self.combo_file = self.findChild(QComboBox, 'comboFile')
+        self.combo_cout = self.findChild(QComboBox, 'comboCout')
 
         # 4. Connexions des Signaux aux Slots (Fonctions)
         self.label_image.signal_clic.connect(self.gerer_clic_image)
+        self.label_image.signal_survol.connect(self.gerer_survol_image)
+        self.vue_tuilee.signal_clic.connect(self.gerer_clic_pixel)
+        self.vue_tuilee.signal_survol.connect(self.gerer_survol_pixel)
+        self.vue_tuilee.signal_zoom.connect(self.afficher_zoom_vue)
 
         if self.btn_charger: self.btn_charger.clicked.connect(self.ouvrir_image)
         if self.btn_reset: self.btn_reset.clicked.connect(self.reinitialiser_interface)
         if self.btn_calculer: self.btn_calculer.clicked.connect(self.lancer_dijkstra)
+        if self.btn_annuler: self.btn_annuler.clicked.connect(self.annuler_calcul)
+        if self.btn_reperes: self.btn_reperes.clicked.connect(self.pretraiter_reperes)
 
         if self.btn_conn4: self.btn_conn4.clicked.connect(lambda: self.definir_connexite('4'))
         if self.btn_conn8: self.btn_conn8.clicked.connect(lambda: self.definir_connexite('8'))
@@ -113,10 +255,34 @@ class ApplicationChemin(QMainWindow):
             self.slider_zoom.valueChanged.connect(self.changer_zoom)
             self.slider_zoom.setValue(100)
 
+        if self.combo_moteur is not None:
+            for moteur, libelle in LIBELLES_MOTEURS.items():
+                self.combo_moteur.addItem(libelle, moteur)
+            self.combo_moteur.currentIndexChanged.connect(
+                lambda index: self.definir_moteur(self.combo_moteur.itemData(index))
+            )
+
+        if self.combo_file is not None:
+            for type_file, libelle in LIBELLES_FILES.items():
+                self.combo_file.addItem(libelle, type_file)
+            self.combo_file.currentIndexChanged.connect(
+                lambda index: self.modeleur.definir_file_priorite(self.combo_file.itemData(index))
+            )
+
+        if self.combo_cout is not None:
+            for modele, libelle in LIBELLES_MODELES_COUT.items():
+                self.combo_cout.addItem(libelle, modele)
+            self.combo_cout.currentIndexChanged.connect(
+                lambda index: self.definir_cout(self.combo_cout.itemData(index))
+            )
+
     # Réinitialise l'interface et les variables pour un nouveau calcul
     def reinitialiser_interface(self):
+        self.arreter_apercus()
         self.point_depart = None
         self.point_arrivee = None
+        self.arbre_apercu = None
+        self.calque_apercu = None
         if self.btn_calculer: self.btn_calculer.setEnabled(False)
 
         if self.lbl_depart: self.lbl_depart.setText("N/A")
@@ -129,7 +295,8 @@ class ApplicationChemin(QMainWindow):
             self.lbl_statut.setStyleSheet("color: white;")
 
         if self.modeleur.est_chargee:
-            self.modeleur.charger_image() # Recharge l'originale sans dessins
+            self.modeleur.effacer_dessins() # L'image lue n'a jamais été modifiée : rien à relire
+            self.vue_tuilee.effacer_dessins()
             self.rafraichir_affichage()
 
     # Change le mode de connexité (4 ou 8) et met à jour l'apparence des boutons
@@ -143,6 +310,8 @@ class ApplicationChemin(QMainWindow):
                 self.btn_conn4.setChecked(False)
                 self.btn_conn8.setChecked(True)
 
+        # Les aperçus en cours étendent des arbres du graphe courant : ils s'arrêtent d'abord
+        self.arreter_apercus()
         self.modeleur.definir_mode_connexite(mode)
         if self.lbl_connexite: self.lbl_connexite.setText(f"{mode}-connexité")
 
@@ -151,61 +320,155 @@ class ApplicationChemin(QMainWindow):
             self.reinitialiser_interface()
             if self.lbl_statut: self.lbl_statut.setText(f"Mode {mode}-Connexité. Resélectionnez.")
 
-    # Met à jour le facteur de zoom selon le slider et rafraîchit l'affichage
+    # Change le modèle de coût des arêtes (les aperçus en cours sont arrêtés auparavant)
+    def definir_cout(self, modele):
+        self.arreter_apercus()
+        self.modeleur.definir_modele_cout(modele)
+
+        # L'aperçu issu du départ a été calculé avec l'ancien coût
+        if self.point_depart:
+            self.reinitialiser_interface()
+            if self.lbl_statut: self.lbl_statut.setText(f"Coût : {LIBELLES_MODELES_COUT[modele]}. Resélectionnez.")
+
+    # Change le moteur de recherche utilisé par le bouton 'Calculer'
+    def definir_moteur(self, moteur):
+        self.modeleur.definir_moteur_recherche(moteur)
+        if self.lbl_statut and self.point_arrivee:
+            self.lbl_statut.setText(f"Moteur : {LIBELLES_MOTEURS[moteur]}. Cliquez sur 'Calculer le chemin'.")
+
+    # Met à jour le facteur de zoom selon le slider ; l'affichage suit à la fin de la rafale
+    # de mouvements (la minuterie est relancée à chaque valeur)
     def changer_zoom(self, valeur):
         self.facteur_zoom = valeur / 100.0
         if self.lbl_zoom: self.lbl_zoom.setText(f"{valeur}%")
-        self.rafraichir_affichage()
+        if self.affichage_tuile:
+            self.vue_tuilee.definir_zoom(self.facteur_zoom) # Seules les tuiles visibles sont décodées
+        else:
+            self.minuterie_zoom.start()
+
+    # Affiche le zoom de la vue tuilée (ajustement à la fenêtre, Ctrl + molette)
+    def afficher_zoom_vue(self, facteur):
+        if self.lbl_zoom: self.lbl_zoom.setText(f"{facteur * 100:.3g}%")
 
     # Ouvre une boîte de dialogue pour charger une image depuis le disque
     def ouvrir_image(self):
-        chemin, _ = QFileDialog.getOpenFileName(self, "Ouvrir Image", "", "Images (*.png *.jpg *.jpeg *.bmp)")
+        chemin, _ = QFileDialog.getOpenFileName(self, "Ouvrir Image", "", "Images (*.png *.jpg *.jpeg *.bmp *.npy)")
         if chemin:
+            self.arreter_apercus() # Les aperçus lisent l'image et les plans de poids courants
             succes, message = self.modeleur.charger_image(chemin)
             if succes:
+                self.choisir_affichage()
                 self.reinitialiser_interface()
                 if self.lbl_dimensions: self.lbl_dimensions.setText(f"{self.modeleur.largeur} × {self.modeleur.hauteur}")
                 if self.lbl_noeuds: self.lbl_noeuds.setText(f"{self.modeleur.largeur * self.modeleur.hauteur}")
-                if self.slider_zoom: self.slider_zoom.setValue(100)
+                # La vue tuilée s'ajuste elle-même à la fenêtre
+                if self.slider_zoom and not self.affichage_tuile: self.slider_zoom.setValue(100)
             else:
                 QMessageBox.critical(self, "Erreur", message)
 
-    # Convertit l'image OpenCV en QPixmap, applique le zoom et l'affiche
-    def rafraichir_affichage(self):
-        if not self.modeleur.est_chargee: return
-
-        # Copie de l'image pour affichage
-        img_affichage = self.modeleur.image_couleur.copy()
-        haut, larg, canaux = img_affichage.shape
-        octets_par_ligne = 3 * larg
-
-        # Conversion format OpenCV (BGR) vers Qt (RGB)
-        q_img = QImage(img_affichage.data, larg, haut, octets_par_ligne, QImage.Format.Format_BGR888)
-        pixmap = QPixmap.fromImage(q_img)
-
-        # Calcul des nouvelles dimensions
-        nouv_larg = int(larg * self.facteur_zoom)
-        nouv_haut = int(haut * self.facteur_zoom)
-
-        if nouv_larg > 0 and nouv_haut > 0:
-            pixmap = pixmap.scaled(nouv_larg, nouv_haut, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.FastTransformation)
-
-        self.label_image.setFixedSize(nouv_larg, nouv_haut)
+    # Choisit l'affichage de l'image chargée : pixmap unique dans la zone de défilement, ou
+    # vue tuilée pour les très grandes images et les rasters ouverts par tuiles
+    def choisir_affichage(self):
+        self.affichage_tuile = self.zone_defilement is not None and (
+            self.modeleur.image_couleur is None or
+            self.modeleur.hauteur * self.modeleur.largeur > SEUIL_PIXELS_VUE_TUILEE)
+
+        self.cache_pixmaps.vider()
+        if self.zone_defilement: self.zone_defilement.setVisible(not self.affichage_tuile)
+        self.vue_tuilee.setVisible(self.affichage_tuile)
+        self.vue_tuilee.definir_source(self.modeleur.obtenir_source_affichage() if self.affichage_tuile else None)
+
+    # Compose l'image du modeleur, ses dessins et les calques donnés puis l'affiche au zoom
+    # courant. Sans dessin, l'image du modeleur est enveloppée telle quelle (aucune copie) et
+    # ses pixmaps déjà mises à l'échelle sont réutilisées
+    def rafraichir_affichage(self, *calques):
+        # La vue tuilée dessine marqueurs et chemins comme éléments vectoriels
+        if not self.modeleur.est_chargee or self.affichage_tuile: return
+
+        # Un raster tuilé n'a pas d'image couleur
+        self.cache_pixmaps.definir_image(self.modeleur.composer_image(*calques))
+        self.afficher_pixmap()
+
+    # Affiche la pixmap de l'image courante au facteur de zoom courant (cache LRU par zoom)
+    def afficher_pixmap(self):
+        self.minuterie_zoom.stop()
+        pixmap = self.cache_pixmaps.obtenir(self.facteur_zoom)
+        if pixmap is None: return
+
+        self.label_image.setFixedSize(pixmap.width(), pixmap.height())
         self.label_image.setPixmap(pixmap)
 
     # Convertit les coordonnées du clic souris en coordonnées réelles de l'image
     def gerer_clic_image(self, position):
-        if not self.modeleur.est_chargee: return
-
         # Ajustement des coordonnées en fonction du zoom
         x = int(position.x() / self.facteur_zoom)
         y = int(position.y() / self.facteur_zoom)
+        self.gerer_clic_pixel(y, x)
+
+    # Traite un clic sur le pixel (y, x) de l'image (étiquette ou vue tuilée)
+    def gerer_clic_pixel(self, y, x):
+        if not self.modeleur.est_chargee or self.est_en_cours: return
 
         if 0 <= x < self.modeleur.largeur and 0 <= y < self.modeleur.hauteur:
             self.selectionner_pixel(y, x) # Attention ordre (Ligne, Colonne) -> (y, x)
         else:
             if self.lbl_statut: self.lbl_statut.setText("Clic hors limites.")
 
+    # Pendant le choix de l'arrivée, dessine le chemin optimal vers le pixel survolé
+    def gerer_survol_image(self, position):
+        self.gerer_survol_pixel(int(position.y() / self.facteur_zoom), int(position.x() / self.facteur_zoom))
+
+    def gerer_survol_pixel(self, y, x):
+        if self.arbre_apercu is None or self.point_arrivee is not None or self.est_en_cours: return
+        if not (0 <= x < self.modeleur.largeur and 0 <= y < self.modeleur.hauteur): return
+
+        chemin, cout = self.modeleur.chemin_depuis_arbre(self.arbre_apercu, (y, x))
+        if not chemin: return
+
+        if self.affichage_tuile:
+            self.vue_tuilee.definir_apercu(chemin)
+        else:
+            self.calque_apercu.effacer()
+            self.calque_apercu.dessiner_pixels(chemin, (0, 255, 255))
+            self.rafraichir_affichage(self.calque_apercu)
+        if self.lbl_longueur: self.lbl_longueur.setText(str(len(chemin)))
+        if self.lbl_cout: self.lbl_cout.setText(f"{cout:.1f}")
+
+    # Lance en arrière-plan le calcul de l'arbre complet issu du départ pour l'aperçu
+    def lancer_apercu(self, h, l):
+        self.arbre_apercu = self.modeleur.obtenir_arbre(h * self.modeleur.largeur + l)
+        self.calque_apercu = CalqueDessin(self.modeleur.hauteur, self.modeleur.largeur)
+        if self.arbre_apercu.complet: return
+
+        travailleur = TravailleurArbre(self.modeleur, self.arbre_apercu, self)
+        self.travailleurs_arbre.add(travailleur)
+        travailleur.finished.connect(lambda: self.travailleurs_arbre.discard(travailleur))
+        travailleur.start()
+
+    # Annule les extensions d'arbre en cours et attend leur fin (au plus INTERVALLE_SUIVI pixels)
+    def arreter_apercus(self):
+        for travailleur in list(self.travailleurs_arbre):
+            travailleur.suivi.annuler()
+            travailleur.wait()
+
+    # Dessine un marqueur de sélection sur le calque du modeleur ou dans la vue tuilée
+    def dessiner_marqueur(self, noeud, couleur):
+        if self.affichage_tuile:
+            self.vue_tuilee.ajouter_marqueur(noeud, 2, couleur)
+        else:
+            self.modeleur.calque.dessiner_cercle(noeud, 2, couleur)
+            self.rafraichir_affichage()
+
+    # Dessine le chemin trouvé et ses marqueurs (tracé vectoriel dans la vue tuilée)
+    def dessiner_chemin(self, chemin):
+        if self.affichage_tuile:
+            self.vue_tuilee.ajouter_chemin(chemin, COULEUR_CHEMIN)
+            self.vue_tuilee.ajouter_marqueur(chemin[0], 4, COULEUR_DEPART)
+            self.vue_tuilee.ajouter_marqueur(chemin[-1], 4, COULEUR_ARRIVEE)
+        else:
+            self.modeleur.dessiner_chemin_sur_image(chemin)
+            self.rafraichir_affichage()
+
     # Gère la logique de sélection des points de départ et d'arrivée
     def selectionner_pixel(self, h, l):
         # Cas 1 : Sélection du point de départ
@@ -213,12 +476,11 @@ class ApplicationChemin(QMainWindow):
             self.point_depart = (h, l)
             if self.lbl_depart: self.lbl_depart.setText(f"({l}, {h})")
 
-            img_temp = self.modeleur.image_couleur.copy()
-            cv2.circle(img_temp, (l, h), radius=2, color=(255, 0, 0), thickness=-1)
-            self.afficher_image_temporaire(img_temp)
+            self.dessiner_marqueur((h, l), (255, 0, 0))
+            self.lancer_apercu(h, l)
 
             if self.lbl_statut:
-                self.lbl_statut.setText("Départ validé. Sélectionnez l'arrivée.")
+                self.lbl_statut.setText("Départ validé. Survolez l'image pour l'aperçu, puis sélectionnez l'arrivée.")
                 self.lbl_statut.setStyleSheet("color: #55aaff;")
 
         # Cas 2 : Sélection du point d'arrivée
@@ -226,12 +488,9 @@ class ApplicationChemin(QMainWindow):
             self.point_arrivee = (h, l)
             if self.lbl_arrivee: self.lbl_arrivee.setText(f"({l}, {h})")
 
-            img_temp = self.modeleur.image_couleur.copy()
-            # Redessine le départ
-            cv2.circle(img_temp, (self.point_depart[1], self.point_depart[0]), radius=2, color=(255, 0, 0), thickness=-1)
-            # Dessine l'arrivée
-            cv2.circle(img_temp, (l, h), radius=2, color=(0, 0, 255), thickness=-1)
-            self.afficher_image_temporaire(img_temp)
+            # Dessine l'arrivée (le départ est déjà dessiné) et masque l'aperçu
+            self.vue_tuilee.definir_apercu([])
+            self.dessiner_marqueur((h, l), (0, 0, 255))
 
             if self.lbl_statut:
                 self.lbl_statut.setText("Prêt ! Cliquez sur 'Calculer le chemin'.")
@@ -243,28 +502,89 @@ class ApplicationChemin(QMainWindow):
             self.reinitialiser_interface()
             if self.lbl_statut: self.lbl_statut.setText("Reset. Sélectionnez un nouveau départ.")
 
-    # Affiche une image temporaire (pour les marqueurs) sans écraser l'originale
-    def afficher_image_temporaire(self, img_bgr):
-        self.modeleur.image_couleur = img_bgr
-        self.rafraichir_affichage()
+    # Calcule les repères ALT de l'image courante (accélère ensuite le moteur A*) dans un fil
+    # séparé : l'interface reste réactive et le prétraitement peut être annulé
+    def pretraiter_reperes(self):
+        if not self.modeleur.est_chargee or self.est_en_cours: return
+
+        self.est_en_cours = True
+        self.activer_controles(False)
+        if self.lbl_statut:
+            self.lbl_statut.setText("Prétraitement des repères...")
+            self.lbl_statut.setStyleSheet("color: white;")
+
+        travailleur = TravailleurReperes(self.modeleur, self)
+        travailleur.signal_resultat.connect(self.afficher_resultat_reperes)
+        travailleur.signal_annule.connect(self.gerer_annulation)
+        travailleur.signal_erreur.connect(self.gerer_erreur_calcul)
+        travailleur.finished.connect(self.terminer_calcul)
+        self.travailleur_chemin = travailleur
+        travailleur.start()
 
-    # Lance l'algorithme de Dijkstra et met à jour l'interface avec les résultats
+    # Affiche le compte rendu du prétraitement des repères
+    def afficher_resultat_reperes(self, succes, message):
+        if self.lbl_statut:
+            self.lbl_statut.setText(message)
+            self.lbl_statut.setStyleSheet("color: #55ff55;" if succes else "color: red;")
+
+    # Active ou désactive les contrôles qui modifient l'image ou le graphe (pendant un calcul)
+    def activer_controles(self, actifs):
+        for widget in (self.btn_charger, self.btn_reset, self.btn_reperes, self.btn_conn4, self.btn_conn8,
+                       self.combo_moteur, self.combo_file, self.combo_cout):
+            if widget is not None: widget.setEnabled(actifs)
+        if self.btn_calculer: self.btn_calculer.setEnabled(actifs)
+        if self.btn_annuler: self.btn_annuler.setEnabled(not actifs)
+
+    # Lance le calcul du chemin dans un fil séparé : l'interface reste réactive et le calcul
+    # peut être annulé
     def lancer_dijkstra(self):
-        if not self.point_depart or not self.point_arrivee: return
+        if not self.point_depart or not self.point_arrivee or self.est_en_cours: return
 
-        if self.lbl_statut: self.lbl_statut.setText("Calcul en cours...")
-        if self.btn_calculer: self.btn_calculer.setEnabled(False)
-        QApplication.processEvents() # Force la mise à jour de l'UI
+        # Un arbre ne doit pas être étendu par deux fils à la fois : l'aperçu est arrêté et
+        # son arbre partiel (mis en cache) est repris par le calcul
+        self.arreter_apercus()
 
-        chemin, cout, visites = self.modeleur.executer_dijkstra(self.point_depart, self.point_arrivee)
+        self.est_en_cours = True
+        self.activer_controles(False)
+        if self.lbl_statut:
+            self.lbl_statut.setText("Calcul en cours...")
+            self.lbl_statut.setStyleSheet("color: white;")
+
+        travailleur = TravailleurChemin(self.modeleur, self.point_depart, self.point_arrivee, self)
+        travailleur.signal_progression.connect(self.afficher_progression)
+        travailleur.signal_resultat.connect(self.afficher_resultat)
+        travailleur.signal_annule.connect(self.gerer_annulation)
+        travailleur.signal_erreur.connect(self.gerer_erreur_calcul)
+        travailleur.finished.connect(self.terminer_calcul)
+        self.travailleur_chemin = travailleur
+        travailleur.start()
+
+    # Demande l'arrêt du calcul en cours (pris en compte au prochain point de contrôle)
+    def annuler_calcul(self):
+        if self.travailleur_chemin is None: return
+
+        self.travailleur_chemin.suivi.annuler()
+        if self.btn_annuler: self.btn_annuler.setEnabled(False)
+        if self.lbl_statut: self.lbl_statut.setText("Annulation...")
+
+    # Affiche la progression transmise par le fil de calcul
+    def afficher_progression(self, nb_noeuds_visites, distance):
+        if self.lbl_visites: self.lbl_visites.setText(str(nb_noeuds_visites))
+        if self.lbl_statut and self.travailleur_chemin is not None and not self.travailleur_chemin.suivi.annule:
+            self.lbl_statut.setText(f"Calcul en cours... frontière à distance {distance}")
+
+    # Met à jour l'interface avec le résultat du calcul
+    def afficher_resultat(self, resultat):
+        chemin, cout, visites = resultat
 
         if self.lbl_longueur: self.lbl_longueur.setText(str(len(chemin)))
-        if self.lbl_cout: self.lbl_cout.setText(f"{cout:.1f}")
+        if self.lbl_cout:
+            borne = self.modeleur.borne_sous_optimalite
+            self.lbl_cout.setText(f"{cout:.1f}" if borne is None else f"{cout:.1f} (≤ {borne:.2f} × opt.)")
         if self.lbl_visites: self.lbl_visites.setText(str(visites))
 
         if chemin:
-            self.modeleur.dessiner_chemin_sur_image(chemin)
-            self.rafraichir_affichage()
+            self.dessiner_chemin(chemin)
             if self.lbl_statut:
                 self.lbl_statut.setText("Chemin trouvé !")
                 self.lbl_statut.setStyleSheet("color: #55ff55;")
@@ -273,4 +593,27 @@ class ApplicationChemin(QMainWindow):
                 self.lbl_statut.setText("Impossible de trouver un chemin.")
                 self.lbl_statut.setStyleSheet("color: red;")
 
-        if self.btn_calculer: self.btn_calculer.setEnabled(True)
+    def gerer_annulation(self):
+        if self.lbl_statut:
+            self.lbl_statut.setText("Calcul annulé.")
+            self.lbl_statut.setStyleSheet("color: #ff9933;")
+
+    def gerer_erreur_calcul(self, message):
+        if self.lbl_statut:
+            self.lbl_statut.setText("Erreur pendant le calcul.")
+            self.lbl_statut.setStyleSheet("color: red;")
+        QMessageBox.critical(self, "Erreur", message)
+
+    # Fin du fil de calcul (résultat, annulation ou erreur) : l'interface est réactivée
+    def terminer_calcul(self):
+        self.travailleur_chemin = None
+        self.est_en_cours = False
+        self.activer_controles(True)
+
+    # À la fermeture, les fils en cours sont annulés et attendus
+    def closeEvent(self, evenement):
+        self.arreter_apercus()
+        if self.travailleur_chemin is not None:
+            self.travailleur_chemin.suivi.annuler()
+            self.travailleur_chemin.wait()
+        super().closeEvent(evenement)
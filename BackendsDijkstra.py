@@ -0,0 +1,129 @@
+import numpy as np
+
+from CacheArbres import ArbreChemins
+
+# scipy est optionnel : sans lui, seuls les moteurs NumPy du dépôt sont disponibles
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra as dijkstra_csgraph
+except ImportError:
+    csr_matrix = dijkstra_csgraph = None
+
+# Construit le graphe des pixels au format CSR directement à partir des plans de poids
+# (K directions x N pixels), sans boucle Python sur les arêtes. Les arêtes de chaque pixel
+# sont rangées par direction. Renvoie (debuts, voisins, poids) : indices int32 (debuts en
+# int64 si le nombre d'arêtes dépasse int32) et poids uint8
+def construire_csr(plans, decalages):
+    nb_pixels = plans.shape[1]
+    pixels, directions = np.nonzero(plans.T) # Ordre (pixel, direction) : lignes CSR triées
+
+    type_debuts = np.int32 if pixels.size < np.iinfo(np.int32).max else np.int64
+    debuts = np.zeros(nb_pixels + 1, dtype=type_debuts)
+    np.cumsum(np.count_nonzero(plans, axis=0), out=debuts[1:])
+
+    voisins = (pixels + np.asarray(decalages, dtype=np.int64)[directions]).astype(np.int32)
+    poids = plans[directions, pixels]
+    return debuts, voisins, poids
+
+class BackendNumpy:
+
+    # Moteurs du dépôt : Dijkstra repris à la demande (arbres) et delta-stepping (champs)
+    @staticmethod
+    def disponible():
+        return True
+
+    # Arbre complet issu de u_source, calculé par le Dijkstra du dépôt
+    @staticmethod
+    def calculer_arbre(modeleur, u_source):
+        arbre = modeleur.creer_arbre_vierge(u_source)
+        modeleur.etendre_arbre(arbre)
+        return arbre
+
+    # Champ des distances à la source la plus proche : (distances, prédécesseurs, origine)
+    @staticmethod
+    def calculer_champ(modeleur, u_sources):
+        return modeleur.calculer_champ_delta_stepping(np.asarray(u_sources, dtype=np.int64))[:3]
+
+    # Matrice int64 des coûts sources x cibles (plus grand entier du type des distances si
+    # inaccessible) :
+    # un Dijkstra par source, arrêté dès que toutes les cibles sont fixées. Quand sources et
+    # cibles coïncident, la symétrie du graphe (non orienté) dispense chaque recherche des
+    # cibles déjà traitées comme sources
+    @staticmethod
+    def calculer_couts(modeleur, u_sources, u_cibles, suivi=None):
+        u_cibles = np.asarray(u_cibles, dtype=np.int64)
+        inaccessible = np.iinfo(modeleur.obtenir_type_distances()).max
+        symetrique = np.array_equal(u_sources, u_cibles)
+        couts = np.empty((len(u_sources), len(u_cibles)), dtype=np.int64)
+
+        for rang, u_source in enumerate(u_sources):
+            cibles = u_cibles[rang:] if symetrique else u_cibles
+            arbre = modeleur.creer_arbre_vierge(int(u_source))
+            modeleur.etendre_arbre(arbre, cibles.tolist(), suivi)
+            couts[rang, len(u_cibles) - len(cibles):] = modeleur.convertir_distances(arbre.distances[cibles], inaccessible)
+
+        if symetrique:
+            bas = np.tril_indices(len(u_cibles), -1)
+            couts[bas] = couts.T[bas]
+        return couts
+
+class BackendScipy:
+
+    # scipy.sparse.csgraph.dijkstra (compilé) sur le graphe CSR exporté par le modeleur.
+    # Les prédécesseurs (indices de pixels) sont reconvertis en codes de direction sur
+    # 1 octet, ce qui demande des décalages distincts : largeur d'au moins 3 pixels
+    @staticmethod
+    def disponible():
+        return dijkstra_csgraph is not None
+
+    @staticmethod
+    def calculer_champ(modeleur, u_sources):
+        debuts, voisins, poids = modeleur.exporter_csr()
+        nb_pixels = modeleur.hauteur * modeleur.largeur
+        graphe = csr_matrix((poids, voisins, debuts), shape=(nb_pixels, nb_pixels))
+        # min_only : une seule ligne de distances, les prédécesseurs (indices de pixels) et la
+        # source la plus proche de chaque pixel
+        champ, predecesseurs_scipy, _ = dijkstra_csgraph(graphe, directed=True, indices=u_sources,
+                                                         return_predecessors=True, min_only=True)
+
+        distances, predecesseurs, origine = modeleur.creer_etat_recherche()
+        atteints = np.isfinite(champ)
+        distances[atteints] = champ[atteints].astype(distances.dtype) + origine
+
+        # Code de direction = 1 + position de (pixel - prédécesseur) dans les décalages
+        decalages = np.asarray(modeleur.obtenir_decalages(), dtype=np.int64)
+        marge = int(np.abs(decalages).max())
+        table_codes = np.zeros(2 * marge + 1, dtype=np.uint8)
+        table_codes[decalages + marge] = np.arange(1, len(decalages) + 1, dtype=np.uint8)
+
+        pixels = np.flatnonzero(predecesseurs_scipy >= 0)
+        predecesseurs[pixels] = table_codes[pixels - predecesseurs_scipy[pixels] + marge]
+        return distances, predecesseurs, origine
+
+    @staticmethod
+    def calculer_couts(modeleur, u_sources, u_cibles, suivi=None):
+        # Un seul appel compilé : le suivi n'est consulté qu'entre deux appels
+        debuts, voisins, poids = modeleur.exporter_csr()
+        nb_pixels = modeleur.hauteur * modeleur.largeur
+        graphe = csr_matrix((poids, voisins, debuts), shape=(nb_pixels, nb_pixels))
+        champs = dijkstra_csgraph(graphe, directed=True, indices=u_sources)[:, u_cibles]
+
+        sentinelle = np.iinfo(modeleur.obtenir_type_distances()).max
+        return np.where(np.isfinite(champs), champs, sentinelle).astype(np.int64)
+
+    @classmethod
+    def calculer_arbre(cls, modeleur, u_source):
+        if modeleur.largeur < 3:
+            return BackendNumpy.calculer_arbre(modeleur, u_source)
+
+        distances, predecesseurs, origine = cls.calculer_champ(modeleur, [u_source])
+        arbre = ArbreChemins(u_source, distances, predecesseurs, origine, None, modeleur.cle_arbre(u_source))
+        arbre.rayon = int(distances[distances != 0].max())
+        arbre.complet = True
+        return arbre
+
+# Backends de calcul des arbres et champs de distances : nom -> classe
+BACKENDS_DIJKSTRA = {
+    'numpy': BackendNumpy,
+    'scipy': BackendScipy,
+}
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+
+# Budget mémoire par défaut du cache d'arbres (256 Mo)
+BUDGET_CACHE_ARBRES = 256 * 1024 * 1024
+
+# Estimation de la place occupée par une entrée de file de priorité (tuple ou entier Python)
+OCTETS_PAR_ENTREE_FILE = 64
+
+class ArbreChemins:
+
+    # Arbre des plus courts chemins (éventuellement partiel) issu de u_source. La recherche
+    # peut être reprise là où elle s'était arrêtée grâce à la file de priorité conservée.
+    # Les distances sont stockées sous la forme coût + origine (0 = non atteint).
+    # cle est la clé de cache fixée à la création : l'image, la connexité ou le modèle de
+    # coût courants peuvent avoir changé quand l'arbre est rangé
+    def __init__(self, u_source, distances, predecesseurs, origine, file_priorite, cle=None):
+        self.u_source = u_source
+        self.cle = cle
+        self.distances = distances
+        self.predecesseurs = predecesseurs
+        self.origine = origine
+        self.file_priorite = file_priorite
+        self.rayon = origine - 1 # Distance stockée du dernier pixel fixé
+        self.complet = False
+
+    # Les poids valant au moins 1, tout pixel à distance <= rayon a sa distance définitive
+    # (un pixel non atteint, à 0, est au-delà de tout rayon)
+    def est_fixe(self, u):
+        return self.complet or self.distances.item(u) <= self.rayon
+
+    # Mémoire occupée par l'arbre (tableaux d'état + file de priorité)
+    def taille_octets(self):
+        taille_file = 0 if self.file_priorite is None else len(self.file_priorite) * OCTETS_PAR_ENTREE_FILE
+        return self.distances.nbytes + self.predecesseurs.nbytes + taille_file
+
+class CacheArbres:
+
+    # Cache LRU d'arbres de plus courts chemins, limité par un budget en octets
+    def __init__(self, budget_octets=BUDGET_CACHE_ARBRES):
+        self.budget_octets = budget_octets
+        self.arbres = OrderedDict()
+        self.tailles = {}
+        self.total_octets = 0
+
+    def __len__(self):
+        return len(self.arbres)
+
+    # Renvoie l'arbre associé à la clé (et le marque comme récemment utilisé), ou None
+    def obtenir(self, cle):
+        arbre = self.arbres.get(cle)
+        if arbre is not None:
+            self.arbres.move_to_end(cle)
+        return arbre
+
+    # Ajoute ou met à jour un arbre puis évince les moins récemment utilisés si besoin
+    def enregistrer(self, cle, arbre):
+        self.retirer(cle)
+
+        taille = arbre.taille_octets()
+        if taille > self.budget_octets:
+            return
+
+        self.arbres[cle] = arbre
+        self.tailles[cle] = taille
+        self.total_octets += taille
+        self.evincer()
+
+    # Retire l'arbre associé à la clé s'il est présent
+    def retirer(self, cle):
+        if cle in self.arbres:
+            del self.arbres[cle]
+            self.total_octets -= self.tailles.pop(cle)
+
+    # Évince les arbres les moins récemment utilisés jusqu'à respecter le budget
+    def evincer(self):
+        while self.total_octets > self.budget_octets and self.arbres:
+            cle, _ = self.arbres.popitem(last=False)
+            self.total_octets -= self.tailles.pop(cle)
+
+    # Modifie le budget (0 désactive le cache)
+    def definir_budget(self, budget_octets):
+        self.budget_octets = budget_octets
+        self.evincer()
+
+    # Vide entièrement le cache
+    def vider(self):
+        self.arbres.clear()
+        self.tailles.clear()
+        self.total_octets = 0
@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+
+class CalqueDessin:
+
+    # Calque de dessin (marqueurs, chemins) superposé à l'image couleur au moment de
+    # l'affichage : l'image elle-même n'est jamais modifiée. Couleurs BGR et masque de
+    # couverture sont alloués au premier dessin ; la boîte englobante de la zone dessinée
+    # limite l'effacement et la composition aux pixels réellement touchés
+    def __init__(self, hauteur, largeur):
+        self.hauteur = hauteur
+        self.largeur = largeur
+        self.couleurs = None
+        self.masque = None
+        self.boite = None # (h0, h1, l0, l1) de la zone dessinée, None si le calque est vide
+
+    def est_vide(self):
+        return self.boite is None
+
+    # Alloue les tableaux au premier dessin et agrandit la boîte englobante
+    def etendre_boite(self, h0, h1, l0, l1):
+        if self.masque is None:
+            self.couleurs = np.zeros((self.hauteur, self.largeur, 3), dtype=np.uint8)
+            self.masque = np.zeros((self.hauteur, self.largeur), dtype=np.uint8)
+
+        h0, h1 = max(0, h0), min(self.hauteur, h1)
+        l0, l1 = max(0, l0), min(self.largeur, l1)
+        if self.boite is not None:
+            b0, b1, c0, c1 = self.boite
+            h0, h1, l0, l1 = min(h0, b0), max(h1, b1), min(l0, c0), max(l1, c1)
+        self.boite = (h0, h1, l0, l1)
+
+    # Efface le calque (seule la zone dessinée est remise à zéro)
+    def effacer(self):
+        if self.boite is not None:
+            h0, h1, l0, l1 = self.boite
+            self.masque[h0:h1, l0:l1] = 0
+            self.boite = None
+
+    # Disque plein de centre (h, l) ; un rayon nul colore le seul pixel central
+    def dessiner_cercle(self, centre, rayon, couleur):
+        if rayon <= 0:
+            self.dessiner_pixels([centre], couleur)
+            return
+
+        h, l = centre
+        self.etendre_boite(h - rayon, h + rayon + 1, l - rayon, l + rayon + 1)
+        cv2.circle(self.couleurs, (l, h), radius=rayon, color=couleur, thickness=-1)
+        cv2.circle(self.masque, (l, h), radius=rayon, color=1, thickness=-1)
+
+    # Colore les pixels (tableau (n, 2) de coordonnées (h, l)) d'une couleur BGR ou d'un
+    # tableau (n, 3) de couleurs, une par pixel. Une épaisseur e > 1 colore aussi les pixels
+    # du disque de diamètre e autour de chacun : une écriture indexée par décalage du disque
+    def dessiner_pixels(self, pixels, couleurs, epaisseur=1):
+        pixels = np.asarray(pixels, dtype=np.int64).reshape(-1, 2)
+        if not pixels.size:
+            return
+
+        couleurs = np.asarray(couleurs, dtype=np.uint8)
+        bas, haut = -(epaisseur // 2), (epaisseur - 1) // 2
+        h_min, l_min = pixels.min(axis=0)
+        h_max, l_max = pixels.max(axis=0)
+        self.etendre_boite(int(h_min) + bas, int(h_max) + haut + 1, int(l_min) + bas, int(l_max) + haut + 1)
+
+        rayon_carre = (epaisseur / 2) ** 2
+        for dh in range(bas, haut + 1):
+            for dl in range(bas, haut + 1):
+                if epaisseur > 2 and dh * dh + dl * dl > rayon_carre:
+                    continue
+
+                h, l = pixels[:, 0] + dh, pixels[:, 1] + dl
+                dedans = (h >= 0) & (h < self.hauteur) & (l >= 0) & (l < self.largeur)
+                h, l = h[dedans], l[dedans]
+                self.couleurs[h, l] = couleurs if couleurs.ndim == 1 else couleurs[dedans]
+                self.masque[h, l] = 1
+
+    # Recopie les pixels dessinés sur image (même taille), dans la boîte englobante seulement
+    def appliquer(self, image):
+        if self.boite is None:
+            return
+
+        h0, h1, l0, l1 = self.boite
+        np.copyto(image[h0:h1, l0:l1], self.couleurs[h0:h1, l0:l1],
+                  where=self.masque[h0:h1, l0:l1, None].astype(bool))
@@ -0,0 +1,67 @@
+import heapq
+
+# Poids maximal d'une arête (les plans de poids sont en uint8)
+POIDS_MAX = 255
+
+class FileTas:
+
+    # Tas binaire (heapq) ; à priorité égale, le dernier pixel ajouté sort en premier
+    def __init__(self, amplitude=POIDS_MAX, priorite_initiale=0):
+        self.tas = []
+        self.compteur = 0
+        self.courant = priorite_initiale # Priorité du dernier pixel extrait
+
+    def __len__(self):
+        return len(self.tas)
+
+    # Ajoute le pixel u avec la priorité donnée
+    def ajouter(self, priorite, u):
+        self.compteur -= 1
+        heapq.heappush(self.tas, (priorite, self.compteur, u))
+
+    # Renvoie la plus petite priorité présente sans retirer d'élément
+    def minimum(self):
+        return self.tas[0][0]
+
+    # Retire et renvoie le pixel u de priorité minimale ; sa priorité est lue dans courant
+    def extraire(self):
+        self.courant, _, u = heapq.heappop(self.tas)
+        return u
+
+class FileSeaux:
+
+    # File à seaux circulaires de Dial pour priorités entières monotones : chaque priorité
+    # ajoutée est comprise entre le minimum courant et le minimum courant + amplitude
+    def __init__(self, amplitude=POIDS_MAX, priorite_initiale=0):
+        self.nb_seaux = amplitude + 1
+        self.seaux = [[] for _ in range(self.nb_seaux)]
+        self.courant = priorite_initiale # Priorité minimale courante et du dernier pixel extrait
+        self.taille = 0
+
+    def __len__(self):
+        return self.taille
+
+    # Ajoute le pixel u dans le seau de sa priorité (O(1), aucun tuple alloué)
+    def ajouter(self, priorite, u):
+        self.seaux[priorite % self.nb_seaux].append(u)
+        self.taille += 1
+
+    # Avance jusqu'au premier seau non vide et renvoie sa priorité (O(1) amorti)
+    def minimum(self):
+        while not self.seaux[self.courant % self.nb_seaux]:
+            self.courant += 1
+        return self.courant
+
+    # Retire et renvoie le pixel u de priorité minimale ; sa priorité est lue dans courant
+    def extraire(self):
+        seaux, nb_seaux = self.seaux, self.nb_seaux
+        while not seaux[self.courant % nb_seaux]:
+            self.courant += 1
+        self.taille -= 1
+        return seaux[self.courant % nb_seaux].pop()
+
+# Files de priorité disponibles : nom -> classe
+FILES_PRIORITE = {
+    'tas': FileTas,
+    'seaux': FileSeaux,
+}
@@ -0,0 +1,249 @@
+import heapq
+import numpy as np
+
+from SuiviCalcul import INTERVALLE_SUIVI
+
+# Nombre maximal de pixels fixés par une recherche de témoin : au-delà, le raccourci est
+# ajouté par prudence (jamais faux, au pire superflu)
+LIMITE_TEMOIN = 64
+
+# Limite plus courte pour les contractions simulées qui ne servent qu'à ordonner les pixels
+LIMITE_TEMOIN_SIMULATION = 16
+
+# Degré au-delà duquel un pixel n'est plus contracté : les pixels restants forment le noyau,
+# de rangs les plus élevés, où la requête devient un Dijkstra bidirectionnel ordinaire. Cela
+# borne le nombre de raccourcis (quadratique en le degré) créés par une contraction
+DEGRE_MAX_CONTRACTION = 24
+
+# Suffixe du fichier de hiérarchie enregistré à côté de l'image
+SUFFIXE_FICHIER = '.ch.npz'
+
+class HierarchieContraction:
+
+    # Hiérarchie de contraction du graphe des pixels. Pour chaque pixel, seules les arêtes
+    # vers des pixels de rang supérieur sont conservées (format CSR) :
+    # cibles[debut[u]:debut[u + 1]], couts[...] et milieux[...] (-1 = arête d'origine).
+    # Les arêtes entre pixels du noyau (non contractés) sont rangées chez leurs deux extrémités
+    def __init__(self, cle, largeur, rangs, debut, cibles, couts, milieux):
+        self.cle = cle
+        self.largeur = largeur
+        self.rangs = rangs
+        self.debut = debut
+        self.cibles = cibles
+        self.couts = couts
+        self.milieux = milieux
+
+    # Construit la hiérarchie à partir des plans de poids du modeleur. Les pixels sont
+    # contractés par priorité croissante : différence d'arêtes (raccourcis créés moins arêtes
+    # retirées) plus nombre de voisins déjà contractés, qui étale les contractions sur
+    # l'image. Les priorités sont mises à jour paresseusement : un pixel extrait dont la
+    # priorité recalculée dépasse le minimum de la file y est remis. Le suivi (SuiviCalcul)
+    # est consulté tous les INTERVALLE_SUIVI pixels évalués ou contractés
+    @classmethod
+    def construire(cls, modeleur, suivi=None):
+        hauteur, largeur = modeleur.hauteur, modeleur.largeur
+        nb_pixels = hauteur * largeur
+        plans = modeleur.obtenir_plans_poids().reshape(len(modeleur.obtenir_liste_voisins()), -1)
+        decalages = modeleur.obtenir_decalages()
+
+        # Graphe restant : pixel -> {voisin: (coût, milieu)}
+        voisins = [dict() for _ in range(nb_pixels)]
+        for code, decalage in enumerate(decalages):
+            sources = np.flatnonzero(plans[code])
+            for u, poids in zip(sources.tolist(), plans[code, sources].tolist()):
+                voisins[u][u + decalage] = (poids, -1)
+
+        contractes = [0] * nb_pixels # Voisins déjà contractés de chaque pixel
+        file_priorite = []
+        for v in range(nb_pixels):
+            file_priorite.append((cls.evaluer(voisins, v, contractes)[0], v))
+            if suivi is not None and v % INTERVALLE_SUIVI == 0:
+                suivi.verifier(v, 0)
+        heapq.heapify(file_priorite)
+
+        rangs = np.empty(nb_pixels, dtype=np.int32)
+        aretes_montantes = [None] * nb_pixels
+        noyau = []
+        rang = 0
+
+        while file_priorite:
+            _, v = heapq.heappop(file_priorite)
+            if len(voisins[v]) > DEGRE_MAX_CONTRACTION:
+                noyau.append(v)
+                continue
+
+            priorite, raccourcis = cls.evaluer(voisins, v, contractes, LIMITE_TEMOIN)
+            if file_priorite and priorite > file_priorite[0][0]:
+                heapq.heappush(file_priorite, (priorite, v))
+                continue
+
+            # Contraction de v : ses voisins restants sont tous de rang supérieur
+            restants = list(voisins[v].items())
+            aretes_montantes[v] = restants
+            for u, _ in restants:
+                del voisins[u][v]
+                contractes[u] += 1
+            voisins[v] = None
+            rangs[v] = rang
+            rang += 1
+            if suivi is not None and rang % INTERVALLE_SUIVI == 0:
+                suivi.verifier(rang, 0)
+
+            for u, w, cout in raccourcis:
+                existant = voisins[u].get(w)
+                if existant is None or existant[0] > cout:
+                    voisins[u][w] = (cout, v)
+                    voisins[w][u] = (cout, v)
+
+        # Le noyau prend les rangs les plus élevés ; ses arêtes restent dans les deux sens
+        for v in noyau:
+            aretes_montantes[v] = list(voisins[v].items())
+            rangs[v] = rang
+            rang += 1
+
+        # Conversion des arêtes montantes au format CSR compact
+        degres = np.array([len(aretes) for aretes in aretes_montantes], dtype=np.int64)
+        debut = np.zeros(nb_pixels + 1, dtype=np.int64)
+        np.cumsum(degres, out=debut[1:])
+        aretes = [arete for liste in aretes_montantes for arete in liste]
+        cibles = np.array([w for w, _ in aretes], dtype=np.int32)
+        couts = np.array([cout for _, (cout, _) in aretes], dtype=modeleur.obtenir_type_distances())
+        milieux = np.array([milieu for _, (_, milieu) in aretes], dtype=np.int32)
+
+        cle = (modeleur.empreinte_image, modeleur.mode_connexite, modeleur.modele_cout)
+        return cls(cle, largeur, rangs, debut, cibles, couts, milieux)
+
+    # Simule la contraction de v : renvoie (priorité, raccourcis [(u, w, coût), ...]). Un
+    # raccourci u - w via v n'est gardé que s'il n'existe pas de témoin au plus aussi court
+    # évitant v
+    @classmethod
+    def evaluer(cls, voisins, v, contractes, limite=LIMITE_TEMOIN_SIMULATION):
+        restants = list(voisins[v].items())
+        raccourcis = []
+        for i, (u, (cout_u, _)) in enumerate(restants):
+            candidats = {w: cout_u + cout_w for w, (cout_w, _) in restants[i + 1:]}
+            if not candidats:
+                continue
+
+            temoins = cls.rechercher_temoins(voisins, u, v, candidats, limite)
+            raccourcis += [(u, w, cout) for w, cout in candidats.items() if temoins.get(w, cout + 1) > cout]
+
+        return len(raccourcis) - len(restants) + contractes[v], raccourcis
+
+    # Recherche de témoins : Dijkstra borné depuis u dans le graphe restant privé de v,
+    # limité au coût maximal des candidats et à limite pixels fixés
+    @staticmethod
+    def rechercher_temoins(voisins, u, v, candidats, limite):
+        borne = max(candidats.values())
+        restants = set(candidats)
+        distances = {u: 0, v: -1} # v n'est jamais relâché (distance déjà minimale)
+        file_priorite = [(0, u)]
+        nb_fixes = 0
+
+        while file_priorite and restants and nb_fixes < limite:
+            dist_x, x = heapq.heappop(file_priorite)
+            if dist_x > distances[x]:
+                continue
+            if dist_x > borne:
+                break
+
+            nb_fixes += 1
+            restants.discard(x)
+            for y, (cout, _) in voisins[x].items():
+                nouvelle_dist = dist_x + cout
+                if nouvelle_dist <= borne and nouvelle_dist < distances.get(y, nouvelle_dist + 1):
+                    distances[y] = nouvelle_dist
+                    heapq.heappush(file_priorite, (nouvelle_dist, y))
+
+        del distances[v]
+        return distances
+
+    # Requête : deux recherches montantes (graphe non orienté), arrêtées dès que leur
+    # minimum dépasse le meilleur coût trouvé, puis dépliage des raccourcis. Le suivi
+    # (SuiviCalcul) est consulté tous les INTERVALLE_SUIVI sommets développés
+    def executer(self, u_depart, u_arrivee, suivi=None):
+        distances = ({u_depart: 0}, {u_arrivee: 0})
+        predecesseurs = ({u_depart: -1}, {u_arrivee: -1})
+        files = ([(0, u_depart)], [(0, u_arrivee)])
+        meilleur_cout, jonction = (0, u_depart) if u_depart == u_arrivee else (None, -1)
+        nb_noeuds_visites = 0
+
+        while True:
+            actives = [c for c in (0, 1) if files[c] and (meilleur_cout is None or files[c][0][0] < meilleur_cout)]
+            if not actives:
+                break
+
+            cote = min(actives, key=lambda c: files[c][0][0])
+            dist_x, x = heapq.heappop(files[cote])
+            if dist_x > distances[cote][x]:
+                continue
+
+            nb_noeuds_visites += 1
+            if suivi is not None and nb_noeuds_visites % INTERVALLE_SUIVI == 0:
+                suivi.verifier(nb_noeuds_visites, dist_x)
+            dist_opposee = distances[1 - cote].get(x)
+            if dist_opposee is not None and (meilleur_cout is None or dist_x + dist_opposee < meilleur_cout):
+                meilleur_cout, jonction = dist_x + dist_opposee, x
+
+            for i in range(self.debut[x], self.debut[x + 1]):
+                y = int(self.cibles[i])
+                nouvelle_dist = dist_x + int(self.couts[i])
+                if nouvelle_dist < distances[cote].get(y, nouvelle_dist + 1):
+                    distances[cote][y] = nouvelle_dist
+                    predecesseurs[cote][y] = x
+                    heapq.heappush(files[cote], (nouvelle_dist, y))
+
+        if meilleur_cout is None:
+            return [], 0, nb_noeuds_visites
+
+        # Suite de sommets de la hiérarchie : départ -> jonction -> arrivée
+        montee = [jonction]
+        while predecesseurs[0][montee[-1]] != -1:
+            montee.append(predecesseurs[0][montee[-1]])
+        montee.reverse()
+        descente = []
+        x = jonction
+        while predecesseurs[1][x] != -1:
+            x = predecesseurs[1][x]
+            descente.append(x)
+
+        sommets = montee + descente
+        pixels = [sommets[0]]
+        for a, b in zip(sommets, sommets[1:]):
+            pixels += self.deplier(a, b)
+
+        return [divmod(u, self.largeur) for u in pixels], meilleur_cout, nb_noeuds_visites
+
+    # Renvoie le milieu de l'arête a - b (stockée chez l'extrémité de rang inférieur)
+    def milieu_arete(self, a, b):
+        bas, haut = (a, b) if self.rangs[a] < self.rangs[b] else (b, a)
+        debut, fin = self.debut[bas], self.debut[bas + 1]
+        position = debut + int(np.flatnonzero(self.cibles[debut:fin] == haut)[0])
+        return int(self.milieux[position])
+
+    # Déplie récursivement le raccourci a - b : pixels du chemin, a exclu, b inclus
+    def deplier(self, a, b):
+        pixels = []
+        pile = [(a, b)]
+        while pile:
+            x, y = pile.pop()
+            milieu = self.milieu_arete(x, y)
+            if milieu < 0:
+                pixels.append(y)
+            else:
+                pile += [(milieu, y), (x, milieu)]
+        return pixels
+
+    # Enregistre la hiérarchie dans un fichier .npz
+    def sauvegarder(self, chemin):
+        np.savez(chemin, cle=np.array(self.cle, dtype=str), largeur=self.largeur, rangs=self.rangs,
+                 debut=self.debut, cibles=self.cibles, couts=self.couts, milieux=self.milieux)
+
+    # Charge une hiérarchie enregistrée ; None si elle ne correspond pas à la clé attendue
+    @classmethod
+    def charger(cls, chemin, cle):
+        with np.load(chemin) as donnees:
+            if tuple(donnees['cle'].tolist()) != tuple(str(c) for c in cle):
+                return None
+            return cls(cle, int(donnees['largeur']), donnees['rangs'], donnees['debut'],
+                       donnees['cibles'], donnees['couts'], donnees['milieux'])
@@ -0,0 +1,126 @@
+import hashlib
+import cv2
+import numpy as np
+
+# Module maximal du gradient de Sobel 3 x 3 sur une image 8 bits (4 x 255 x √2)
+MODULE_SOBEL_MAX = 4 * 255 * np.sqrt(2)
+
+class ModeleCout:
+
+    # Modèle de coût : calcule, par blocs vectorisés, les plans de poids uint8 (>= 1) d'une
+    # fenêtre de l'image. Le poids d'une arête ne dépend que de valeurs par pixel de ses deux
+    # extrémités et est symétrique (graphe non orienté). marge est le nombre de pixels lus
+    # en plus autour de la fenêtre pour calculer ces valeurs (filtres)
+    marge = 0
+
+    # Valeurs par pixel de la fenêtre [r0, r1) x [c0, c1) de l'image du modeleur
+    def calculer_valeurs(self, modeleur, r0, r1, c0, c1):
+        raise NotImplementedError
+
+    # Poids uint8 des arêtes reliant les pixels de valeurs a aux pixels de valeurs b
+    def calculer_poids(self, a, b):
+        raise NotImplementedError
+
+    # Calcule dans plans les poids des arêtes issues des pixels de la fenêtre [h0, h1) x [l0, l1)
+    def remplir_plans(self, modeleur, plans, liste_voisins, h0, h1, l0, l1):
+        r0, r1 = max(0, h0 - 1), min(modeleur.hauteur, h1 + 1)
+        c0, c1 = max(0, l0 - 1), min(modeleur.largeur, l1 + 1)
+        valeurs = self.calculer_valeurs(modeleur, r0, r1, c0, c1)
+
+        for k, (dh, dl) in enumerate(liste_voisins):
+            # Pixels de la fenêtre dont le voisin (h + dh, l + dl) reste dans l'image
+            a0, a1 = max(h0, -dh), min(h1, modeleur.hauteur - max(0, dh))
+            b0, b1 = max(l0, -dl), min(l1, modeleur.largeur - max(0, dl))
+            if a0 >= a1 or b0 >= b1:
+                continue
+
+            plans[k, a0:a1, b0:b1] = self.calculer_poids(
+                valeurs[a0 - r0:a1 - r0, b0 - c0:b1 - c0],
+                valeurs[a0 + dh - r0:a1 + dh - r0, b0 + dl - c0:b1 + dl - c0])
+
+class ModeleContraste(ModeleCout):
+
+    # Modèle historique : poids max(1, |I(u) - I(v)|) sur l'image grise
+    def __init__(self):
+        self.identifiant = 'contraste'
+
+    def calculer_valeurs(self, modeleur, r0, r1, c0, c1):
+        return modeleur.image_gris[r0:r1, c0:c1]
+
+    # |a - b| calculé en uint8 sans débordement : max(a, b) - min(a, b)
+    def calculer_poids(self, a, b):
+        poids = np.maximum(a, b)
+        poids -= np.minimum(a, b)
+        np.maximum(poids, 1, out=poids)
+        return poids
+
+class ModeleTransfert(ModeleContraste):
+
+    # Contraste après une table de transfert de 256 entrées appliquée aux niveaux de gris :
+    # poids max(1, |T[I(u)] - T[I(v)]|). La table identité redonne le modèle contraste
+    def __init__(self, table):
+        table = np.asarray(table)
+        if table.shape != (256,) or table.min() < 0 or table.max() > 255:
+            raise ValueError("La table de transfert doit compter 256 valeurs entre 0 et 255.")
+
+        self.table = table.astype(np.uint8)
+        self.identifiant = 'lut:' + hashlib.blake2b(self.table, digest_size=8).hexdigest()
+
+    def calculer_valeurs(self, modeleur, r0, r1, c0, c1):
+        return self.table[modeleur.image_gris[r0:r1, c0:c1]]
+
+class ModeleGradient(ModeleCout):
+
+    # Module du gradient de Sobel G, ramené à un coût par pixel sur [0, 255]. Avec inverse
+    # (ciseaux intelligents), les contours forts sont bon marché : c = 255 x (1 - G / Gmax) ;
+    # sinon ils sont évités : c = 255 x G / Gmax. Poids de l'arête : max(1, moyenne des coûts)
+    marge = 1
+
+    def __init__(self, inverse=True):
+        self.inverse = bool(inverse)
+        self.identifiant = f"gradient:{'inverse' if self.inverse else 'direct'}"
+
+    def calculer_valeurs(self, modeleur, r0, r1, c0, c1):
+        # Fenêtre élargie de la marge du filtre : le résultat ne dépend pas du découpage
+        e0, e1 = max(0, r0 - 1), min(modeleur.hauteur, r1 + 1)
+        f0, f1 = max(0, c0 - 1), min(modeleur.largeur, c1 + 1)
+        zone = np.ascontiguousarray(modeleur.image_gris[e0:e1, f0:f1])
+
+        module = cv2.magnitude(cv2.Sobel(zone, cv2.CV_32F, 1, 0, ksize=3),
+                               cv2.Sobel(zone, cv2.CV_32F, 0, 1, ksize=3))
+        couts = module[r0 - e0:r1 - e0, c0 - f0:c1 - f0] * np.float32(255 / MODULE_SOBEL_MAX)
+        if self.inverse:
+            couts = 255 - couts
+        return np.clip(np.rint(couts), 0, 255).astype(np.uint16)
+
+    def calculer_poids(self, a, b):
+        return np.maximum((a + b + 1) >> 1, 1).astype(np.uint8)
+
+class ModeleCouleurLab(ModeleCout):
+
+    # Distance couleur ΔE (CIE76) dans l'espace Lab entre les pixels de l'image couleur
+    # d'origine : poids max(1, min(255, echelle x ΔE))
+    def __init__(self, echelle=1.0):
+        if echelle <= 0:
+            raise ValueError("L'échelle doit être strictement positive.")
+        self.echelle = float(echelle)
+        self.identifiant = f"couleur:{self.echelle:g}"
+
+    def calculer_valeurs(self, modeleur, r0, r1, c0, c1):
+        if modeleur.image_couleur is None:
+            raise ValueError("Le modèle couleur nécessite une image couleur en mémoire.")
+
+        bloc = modeleur.image_couleur[r0:r1, c0:c1].astype(np.float32) / 255
+        return cv2.cvtColor(bloc, cv2.COLOR_BGR2Lab)
+
+    def calculer_poids(self, a, b):
+        distance = np.sqrt(((a - b) ** 2).sum(axis=-1)) * self.echelle
+        return np.clip(np.rint(distance), 1, 255).astype(np.uint8)
+
+# Modèles de coût disponibles : nom -> classe (paramètres passés au constructeur)
+MODELES_COUT = {
+    'contraste': ModeleContraste,
+    'gradient': ModeleGradient,
+    'couleur': ModeleCouleurLab,
+    'lut': ModeleTransfert,
+}
@@ -1,6 +1,23 @@
+import hashlib
+import os
+import tempfile
+import time
 import cv2
 import numpy as np
-import heapq
+
+from BackendsDijkstra import BACKENDS_DIJKSTRA, construire_csr
+from CacheArbres import ArbreChemins, CacheArbres
+from CalqueDessin import CalqueDessin
+from FilesPriorite import FILES_PRIORITE, POIDS_MAX
+from HierarchieContraction import HierarchieContraction, SUFFIXE_FICHIER
+from ModelesCout import MODELES_COUT, ModeleContraste
+from RechercheHierarchique import RechercheHierarchique, TAILLE_TUILE
+from RechercheAnytime import RechercheAnytime, BUDGET_ANYTIME, EPSILON_INITIAL
+from RechercheIncrementale import RechercheIncrementale
+from RecherchePyramide import RecherchePyramide, LARGEUR_COULOIR
+from RequetesLot import repartir_requetes, TAILLE_PAQUET
+from SourceImage import SourceTuilee, EXTENSIONS_RASTER
+from SuiviCalcul import INTERVALLE_SUIVI
 
 # Définition des mouvements pour la 4-connexité (Haut, Bas, Gauche, Droite)
 VOISINS_4_CONNEXITE = [
@@ -12,22 +29,149 @@ VOISINS_8_CONNEXITE = VOISINS_4_CONNEXITE + [
     (-1, -1), (-1, 1), (1, -1), (1, 1)
 ]
 
+# Moteurs de recherche disponibles : nom du moteur -> méthode du modeleur
+MOTEURS_RECHERCHE = {
+    'dijkstra': 'executer_dijkstra',
+    'a_etoile': 'executer_a_etoile',
+    'bidirectionnel': 'executer_dijkstra_bidirectionnel',
+    'delta_stepping': 'executer_delta_stepping',
+    'hierarchique': 'executer_hierarchique',
+    'contraction': 'executer_contraction',
+    'pyramide': 'executer_pyramide',
+    'incremental': 'executer_incremental',
+    'anytime': 'executer_anytime',
+}
+
+# Code de prédécesseur signifiant "aucun" : nul, comme tout octet d'un tableau neuf (le
+# code k + 1 désigne le déplacement k de la liste des voisins)
+PREDECESSEUR_AUCUN = 0
+
+# Systèmes de fichiers dont les fichiers résident en mémoire vive : inutiles pour les memmap
+SYSTEMES_FICHIERS_MEMOIRE = ('tmpfs', 'ramfs')
+
+# Couleurs (BGR) du chemin et de ses marqueurs de départ et d'arrivée
+COULEUR_CHEMIN = (0, 0, 255)
+COULEUR_DEPART = (255, 0, 0)
+COULEUR_ARRIVEE = (0, 255, 0)
+
+# Indique si le dossier est sur un système de fichiers en mémoire vive, d'après le point de
+# montage le plus long qui le contient dans /proc/mounts (hors Linux : False)
+def dossier_en_memoire(dossier):
+    try:
+        with open('/proc/mounts') as fichier:
+            montages = [ligne.split()[1:3] for ligne in fichier]
+    except OSError:
+        return False
+
+    dossier = os.path.realpath(dossier)
+    systeme_dossier, longueur = None, -1
+    for point, systeme in montages:
+        point = point.replace('\\040', ' ') # Espaces échappés dans /proc/mounts
+        if (dossier == point or dossier.startswith(point.rstrip('/') + '/')) and len(point) > longueur:
+            systeme_dossier, longueur = systeme, len(point)
+    return systeme_dossier in SYSTEMES_FICHIERS_MEMOIRE
+
 class ModeleurGraphe:
 
     # Initialise les variables de l'image, les dimensions et le mode par défaut
     def __init__(self):
         self.chemin_fichier_original = None
-        self.image_couleur = None
+        self.image_couleur = None # Image lue, jamais modifiée par les dessins
+        self.calque = None # Marqueurs et chemins superposés à l'affichage (CalqueDessin)
         self.image_gris = None
         self.largeur = 0
         self.hauteur = 0
         self.est_chargee = False
         self.mode_connexite = '4' # Mode par défaut
+        self.moteur_recherche = 'dijkstra' # Moteur utilisé par calculer_chemin
+        self.type_file_priorite = 'tas' # File de priorité utilisée par les moteurs
+        self.calculateur_cout = ModeleContraste() # Modèle de coût courant (MODELES_COUT)
+        self.modele_cout = self.calculateur_cout.identifiant # Identifiant du modèle et de ses paramètres
+        self.calculateurs_cout = {self.modele_cout: self.calculateur_cout} # Modèles déjà utilisés
+        self.empreinte_image = None # Empreinte du contenu de image_gris (clé des caches)
+        self.cache_arbres = CacheArbres() # Arbres de plus courts chemins par source
+        self.reperes = [] # Repères ALT (indices plats) et leurs champs de distances
+        self.distances_reperes = None
+        self.cle_reperes = None
+        self.hierarchie = None # Graphe abstrait par tuiles (HPA*)
+        self.contraction = None # Hiérarchie de contraction
+        self.pyramide = None # Pyramide multirésolution (recherche grossière puis raffinée)
+        self.incrementale = None # État D* Lite conservé entre les requêtes
+        self.budget_anytime = BUDGET_ANYTIME # Temps alloué (s) au moteur anytime
+        self.epsilon_anytime = EPSILON_INITIAL # Inflation initiale de l'heuristique (ARA*)
+        self.borne_sous_optimalite = None # Coût <= borne x optimum (None si non calculée)
+        self.suivi = None # Annulation et progression du calcul en cours (SuiviCalcul)
+        self.plans_poids = {} # Plans de poids par (connexité, modèle de coût), calculés à la demande
+        self.deltas = {} # Largeur de seau du delta-stepping par (connexité, modèle de coût)
+        self.graphes_csr = {} # Graphe CSR exporté par (connexité, modèle de coût)
+        self.backend_dijkstra = 'numpy' # Calcul des arbres complets (clé de BACKENDS_DIJKSTRA)
+        self.dossier_memmap = None # Dossier des tableaux np.memmap (None = tableaux en mémoire)
+        self.memmap_automatique = False # dossier_memmap choisi par charger_raster, pas par l'utilisateur
 
     # Met à jour le mode de connexité (4 ou 8 voisins)
     def definir_mode_connexite(self, mode):
         self.mode_connexite = mode
 
+    # Sélectionne le moteur de recherche (clé de MOTEURS_RECHERCHE)
+    def definir_moteur_recherche(self, moteur):
+        if moteur not in MOTEURS_RECHERCHE:
+            raise ValueError(f"Moteur de recherche inconnu : {moteur}")
+        self.moteur_recherche = moteur
+
+    # Sélectionne le modèle de coût (clé de MODELES_COUT) et ses paramètres. Les plans de poids
+    # déjà calculés pour ce modèle et ces paramètres sont réutilisés tels quels
+    def definir_modele_cout(self, nom, **parametres):
+        if nom not in MODELES_COUT:
+            raise ValueError(f"Modèle de coût inconnu : {nom}")
+        calculateur = MODELES_COUT[nom](**parametres)
+        self.calculateur_cout = self.calculateurs_cout.setdefault(calculateur.identifiant, calculateur)
+        self.modele_cout = calculateur.identifiant
+
+    # Sélectionne le backend des arbres complets (clé de BACKENDS_DIJKSTRA) ; 'scipy' exige
+    # que scipy soit installé
+    def definir_backend_dijkstra(self, backend):
+        if backend not in BACKENDS_DIJKSTRA:
+            raise ValueError(f"Backend inconnu : {backend}")
+        if not BACKENDS_DIJKSTRA[backend].disponible():
+            raise ValueError(f"Backend indisponible (dépendance manquante) : {backend}")
+        self.backend_dijkstra = backend
+
+    # Sélectionne la file de priorité des moteurs (clé de FILES_PRIORITE)
+    def definir_file_priorite(self, type_file):
+        if type_file not in FILES_PRIORITE:
+            raise ValueError(f"File de priorité inconnue : {type_file}")
+        self.type_file_priorite = type_file
+
+    # Active (dossier) ou désactive (None) le stockage des tableaux pleine image dans des
+    # fichiers np.memmap du dossier, pour les images dont l'état ne tient pas en mémoire.
+    # Le dossier doit être sur disque : un tmpfs garderait les fichiers en mémoire vive
+    def definir_dossier_memmap(self, dossier):
+        if dossier is not None and not os.path.isdir(dossier):
+            raise ValueError(f"Dossier de travail introuvable : {dossier}")
+        if dossier is not None and dossier_en_memoire(dossier):
+            raise ValueError(f"Dossier de travail en mémoire vive (tmpfs) : {dossier}")
+        self.dossier_memmap = dossier
+        self.memmap_automatique = False
+        self.plans_poids = {}
+        self.graphes_csr = {}
+        self.cache_arbres.vider()
+
+    # Alloue un tableau de zéros, en mémoire ou projeté sur un fichier temporaire du dossier
+    # memmap. Le fichier est supprimé dès sa création : la place disque est rendue quand le
+    # tableau n'est plus référencé. Aucun octet n'est écrit à l'allocation (pages à zéro à
+    # la demande, fichier creux) : seules les pages réellement visitées par une recherche
+    # sont touchées, d'où les états "vides" codés par 0
+    def allouer_tableau(self, forme, type_valeurs):
+        if self.dossier_memmap is None:
+            return np.zeros(forme, dtype=type_valeurs)
+
+        with tempfile.TemporaryFile(dir=self.dossier_memmap) as fichier:
+            return np.memmap(fichier, dtype=type_valeurs, mode='w+', shape=forme)
+
+    # Crée une file de priorité vide du type sélectionné (priorités >= priorite_initiale)
+    def creer_file_priorite(self, amplitude=POIDS_MAX, priorite_initiale=0):
+        return FILES_PRIORITE[self.type_file_priorite](amplitude, priorite_initiale)
+
     # Charge l'image depuis le disque, crée une copie grise et met à jour l'état
     def charger_image(self, chemin=None):
         if chemin is None and self.chemin_fichier_original is not None:
@@ -35,16 +179,33 @@ class ModeleurGraphe:
         elif chemin is None:
              return False, "Aucun chemin de fichier fourni."
 
+        # Les rasters (.npy, .raw) sont ouverts par tuiles plutôt que chargés en entier
+        if chemin.lower().endswith(EXTENSIONS_RASTER):
+            if isinstance(self.image_gris, SourceTuilee) and chemin == self.chemin_fichier_original:
+                return True, "Raster déjà ouvert (aucun dessin à effacer)."
+            return self.charger_raster(chemin)
+
         try:
             img = cv2.imread(chemin)
             if img is None:
                 return False, "Le fichier n'a pas pu être chargé."
 
-            self.image_couleur = img.copy()
+            # Le dossier memmap choisi automatiquement pour un raster ne vaut que pour lui
+            if self.memmap_automatique:
+                self.dossier_memmap = None
+                self.memmap_automatique = False
+
+            # Les dessins vont sur le calque : l'image lue n'a pas besoin de copie
+            self.image_couleur = img
             # Conversion en niveaux de gris pour calculer les poids (intensité)
             self.image_gris = cv2.cvtColor(self.image_couleur, cv2.COLOR_BGR2GRAY)
 
             self.hauteur, self.largeur = self.image_gris.shape
+            self.calque = CalqueDessin(self.hauteur, self.largeur)
+            self.plans_poids = {}
+            self.deltas = {}
+            self.graphes_csr = {}
+            self.empreinte_image = hashlib.blake2b(self.image_gris, digest_size=16).hexdigest()
             self.est_chargee = True
             self.chemin_fichier_original = chemin
             return True, f"Image chargée. Dimensions: {self.largeur}x{self.hauteur}"
@@ -53,100 +214,993 @@ class ModeleurGraphe:
             self.est_chargee = False
             return False, f"Erreur lors du chargement : {e}"
 
+    # Ouvre un raster .npy ou .raw (gris 8 bits, dimensions requises) trop grand pour la
+    # mémoire : les pixels sont lus par tuiles à la demande et aucune image couleur n'est
+    # gardée. Sauf dossier choisi par l'utilisateur, l'état des recherches passe en np.memmap,
+    # les plans de poids pesant plusieurs fois l'image : dans le dossier temporaire du système,
+    # ou à défaut dans celui du raster, un dossier en mémoire vive (tmpfs) étant écarté. Ce
+    # choix automatique est annulé au chargement suivant d'une image ordinaire
+    def charger_raster(self, chemin, hauteur=None, largeur=None):
+        try:
+            source = SourceTuilee.ouvrir(chemin, hauteur, largeur)
+        except (OSError, ValueError) as e:
+            self.est_chargee = False
+            return False, f"Erreur lors du chargement : {e}"
+
+        if self.dossier_memmap is None or self.memmap_automatique:
+            candidats = [tempfile.gettempdir(), os.path.dirname(os.path.abspath(chemin))]
+            dossier = next((dossier for dossier in candidats
+                            if os.access(dossier, os.W_OK) and not dossier_en_memoire(dossier)), None)
+            if dossier is None:
+                self.est_chargee = False
+                return False, "Aucun dossier de travail sur disque : choisissez-en un (definir_dossier_memmap)."
+            self.dossier_memmap = dossier
+            self.memmap_automatique = True
+
+        self.image_couleur = None
+        self.calque = None
+        self.image_gris = source
+        self.hauteur, self.largeur = source.shape
+        self.plans_poids = {}
+        self.deltas = {}
+        self.graphes_csr = {}
+        self.empreinte_image = source.calculer_empreinte()
+        self.est_chargee = True
+        self.chemin_fichier_original = chemin
+        return True, f"Raster ouvert par tuiles. Dimensions: {self.largeur}x{self.hauteur}"
+
+    # Renvoie la liste des déplacements (dh, dl) du mode de connexité courant
+    def obtenir_liste_voisins(self):
+        return VOISINS_8_CONNEXITE if self.mode_connexite == '8' else VOISINS_4_CONNEXITE
+
+    # Calcule (une seule fois par mode et modèle de coût) les plans de poids : un tableau uint8
+    # par direction, plans[k, h, l] = poids de l'arête (h, l) -> (h + dh, l + dl), 0 si le
+    # voisin sort de l'image
+    def obtenir_plans_poids(self):
+        if not self.est_chargee:
+            return None
+
+        cle = (self.mode_connexite, self.modele_cout)
+        if cle not in self.plans_poids:
+            liste_voisins = self.obtenir_liste_voisins()
+            plans = self.allouer_tableau((len(liste_voisins), self.hauteur, self.largeur), np.uint8)
+
+            # Calcul par bandes de lignes (une seule bande pour une image en mémoire) : une
+            # image tuilée n'est jamais lue en entier, seulement la bande et ses lignes voisines
+            hauteur_bande = getattr(self.image_gris, 'taille_tuile', self.hauteur)
+            for b0 in range(0, self.hauteur, hauteur_bande):
+                self.remplir_plans(plans, liste_voisins, b0, min(b0 + hauteur_bande, self.hauteur), 0, self.largeur)
+
+            self.plans_poids[cle] = plans
+
+        return self.plans_poids[cle]
+
+    # Calcule dans plans les poids des arêtes issues des pixels de la fenêtre [h0, h1) x [l0, l1)
+    # avec le modèle de coût donné (par défaut le modèle courant)
+    def remplir_plans(self, plans, liste_voisins, h0, h1, l0, l1, calculateur=None):
+        (calculateur or self.calculateur_cout).remplir_plans(self, plans, liste_voisins, h0, h1, l0, l1)
+
     # Générateur qui renvoie les voisins valides et le coût du déplacement (poids)
     def obtenir_voisins_et_poids(self, h, l):
         if not self.est_chargee:
             return
 
-        intensite_u = self.image_gris[h, l]
+        plans = self.obtenir_plans_poids()
+
+        # Les poids sont lus dans les plans précalculés (0 = voisin hors de l'image)
+        for (dh, dl), poids in zip(self.obtenir_liste_voisins(), plans[:, h, l].tolist()):
+            if poids:
+                yield (h + dh, l + dl), poids
+
+    # Crée un modeleur sur une image grise en mémoire (niveau de pyramide, fenêtre...) avec la
+    # configuration courante ; ses plans de poids sont calculés à partir de cette seule image
+    # (et de l'image couleur correspondante, nécessaire au modèle de coût couleur)
+    def creer_modeleur_image(self, image_gris, image_couleur=None):
+        modeleur = ModeleurGraphe()
+        modeleur.image_gris = image_gris
+        modeleur.image_couleur = image_couleur
+        modeleur.hauteur, modeleur.largeur = image_gris.shape
+        modeleur.mode_connexite = self.mode_connexite
+        modeleur.type_file_priorite = self.type_file_priorite
+        modeleur.calculateur_cout = self.calculateur_cout
+        modeleur.modele_cout = self.modele_cout
+        modeleur.definir_budget_cache(0)
+        modeleur.est_chargee = True
+        return modeleur
+
+    # Crée un modeleur restreint à la fenêtre [h0, h1) x [l0, l1) de l'image : il partage les
+    # poids du modeleur courant, mais les arêtes qui sortent de la fenêtre sont supprimées
+    def creer_sous_modeleur(self, h0, h1, l0, l1):
+        sous_modeleur = ModeleurGraphe()
+        sous_modeleur.image_gris = self.image_gris[h0:h1, l0:l1]
+        sous_modeleur.hauteur, sous_modeleur.largeur = h1 - h0, l1 - l0
+        sous_modeleur.mode_connexite = self.mode_connexite
+        sous_modeleur.type_file_priorite = self.type_file_priorite
+        sous_modeleur.calculateur_cout = self.calculateur_cout
+        sous_modeleur.modele_cout = self.modele_cout
+        sous_modeleur.definir_budget_cache(0)
+
+        plans = self.obtenir_plans_poids()[:, h0:h1, l0:l1].copy()
+        for k, (dh, dl) in enumerate(self.obtenir_liste_voisins()):
+            if dh < 0: plans[k, 0, :] = 0
+            if dh > 0: plans[k, -1, :] = 0
+            if dl < 0: plans[k, :, 0] = 0
+            if dl > 0: plans[k, :, -1] = 0
+
+        sous_modeleur.plans_poids[(self.mode_connexite, self.modele_cout)] = plans
+        sous_modeleur.est_chargee = True
+        return sous_modeleur
+
+    # Choisit le type entier des distances : int32 si le pire coût possible (décalé de
+    # l'origine) y tient, sinon int64
+    def obtenir_type_distances(self):
+        if 255 * self.hauteur * self.largeur < np.iinfo(np.int32).max:
+            return np.int32
+        return np.int64
+
+    # Renvoie les décalages en indice plat (dh * largeur + dl) du mode de connexité courant
+    def obtenir_decalages(self):
+        return [dh * self.largeur + dl for dh, dl in self.obtenir_liste_voisins()]
+
+    # Renvoie les (code de prédécesseur, décalage en indice plat) des déplacements courants
+    def obtenir_directions(self):
+        return list(enumerate(self.obtenir_decalages(), 1))
+
+    # Alloue l'état compact d'une recherche : distances entières et prédécesseurs codés sur
+    # 1 octet, tous deux à zéro. Une distance est stockée sous la forme coût + origine
+    # (origine = plus petit entier du type) : 0 signifie "non atteint" et reste supérieur à
+    # toute distance atteinte, les comparaisons des moteurs sont donc inchangées. Renvoie
+    # (distances, prédécesseurs, origine)
+    def creer_etat_recherche(self):
+        type_distances = self.obtenir_type_distances()
+        distances = self.allouer_tableau(self.hauteur * self.largeur, type_distances)
+        predecesseurs = self.allouer_tableau(self.hauteur * self.largeur, np.uint8)
+        return distances, predecesseurs, int(np.iinfo(type_distances).min)
+
+    # Coûts int64 correspondant à des distances stockées (voir creer_etat_recherche), avec
+    # non_atteint pour les pixels jamais atteints
+    def convertir_distances(self, distances, non_atteint):
+        distances = np.asarray(distances)
+        couts = distances.astype(np.int64) - np.iinfo(distances.dtype).min
+        couts[distances == 0] = non_atteint
+        return couts
+
+    # Remonte les codes de prédécesseurs de l'arrivée jusqu'au départ (indices plats)
+    def reconstruire_chemin(self, predecesseurs, u_depart, u_arrivee):
+        decalages = self.obtenir_decalages()
+        chemin = []
+        u = u_arrivee
 
-        # Sélection de la liste de voisins selon le mode choisi
-        liste_voisins = VOISINS_8_CONNEXITE if self.mode_connexite == '8' else VOISINS_4_CONNEXITE
+        while u != u_depart:
+            chemin.append(divmod(u, self.largeur))
+            code = predecesseurs[u]
+            if code == PREDECESSEUR_AUCUN:
+                return []
+            u -= decalages[code - 1]
+
+        chemin.append(divmod(u_depart, self.largeur))
+        chemin.reverse()
+        return chemin
+
+    # Coût d'un chemin [(h, l), ...] : somme des poids lus dans les plans le long du chemin
+    # (chaque pas doit être un déplacement du mode de connexité courant)
+    def calculer_cout_chemin(self, chemin):
+        if len(chemin) < 2:
+            return 0
+
+        # Code de direction de chaque pas, par une table indexée sur (dh, dl)
+        table_codes = np.zeros(9, dtype=np.int64)
+        for code, (dh, dl) in enumerate(self.obtenir_liste_voisins()):
+            table_codes[3 * (dh + 1) + dl + 1] = code
+
+        pixels = np.asarray(chemin, dtype=np.int64)
+        pas = np.diff(pixels, axis=0)
+        codes = table_codes[3 * (pas[:, 0] + 1) + pas[:, 1] + 1]
+        return int(self.obtenir_plans_poids()[codes, pixels[:-1, 0], pixels[:-1, 1]].sum(dtype=np.int64))
+
+    # Clé d'un arbre dans le cache : (empreinte de l'image, connexité, source, modèle de coût)
+    def cle_arbre(self, u_source):
+        return (self.empreinte_image, self.mode_connexite, u_source, self.modele_cout)
+
+    # Modifie le budget mémoire du cache d'arbres (0 le désactive)
+    def definir_budget_cache(self, budget_octets):
+        self.cache_arbres.definir_budget(budget_octets)
+
+    # Renvoie l'arbre issu de u_source : celui du cache s'il existe, sinon un arbre vierge que
+    # Dijkstra étendra à la demande. Avec un backend compilé, l'arbre est calculé en entier
+    # d'un coup et rangé dans le cache
+    def obtenir_arbre(self, u_source):
+        arbre = self.cache_arbres.obtenir(self.cle_arbre(u_source))
+        if arbre is None and self.backend_dijkstra != 'numpy':
+            arbre = BACKENDS_DIJKSTRA[self.backend_dijkstra].calculer_arbre(self, u_source)
+            self.cache_arbres.enregistrer(arbre.cle, arbre)
+        elif arbre is None:
+            arbre = self.creer_arbre_vierge(u_source)
+        return arbre
+
+    # Crée un arbre vierge issu de u_source (≈ 5 octets par pixel)
+    def creer_arbre_vierge(self, u_source):
+        distances, predecesseurs, origine = self.creer_etat_recherche()
+        distances[u_source] = origine
+        file_priorite = self.creer_file_priorite(priorite_initiale=origine)
+        file_priorite.ajouter(origine, u_source)
+        return ArbreChemins(u_source, distances, predecesseurs, origine, file_priorite, self.cle_arbre(u_source))
+
+    # Exporte le graphe des pixels au format CSR (debuts, voisins int32, poids uint8), calculé
+    # une fois par connexité et modèle de coût. Avec scipy : csr_matrix((poids, voisins, debuts))
+    def exporter_csr(self):
+        if not self.est_chargee:
+            return None
+
+        cle = (self.mode_connexite, self.modele_cout)
+        if cle not in self.graphes_csr:
+            plans = self.obtenir_plans_poids().reshape(len(self.obtenir_liste_voisins()), -1)
+            self.graphes_csr[cle] = construire_csr(plans, self.obtenir_decalages())
+        return self.graphes_csr[cle]
+
+    # Champ des distances à la plus proche des sources (liste de (h, l)) avec le backend
+    # sélectionné. Renvoie (distances, prédécesseurs, origine) en indices plats, distances
+    # stockées comme dans creer_etat_recherche
+    def calculer_champ_multi_sources(self, noeuds_sources):
+        if not self.est_chargee:
+            return None
 
-        for dh, dl in liste_voisins:
-            h_v, l_v = h + dh, l + dl
+        sources = np.asarray(noeuds_sources, dtype=np.int64).reshape(-1, 2)
+        u_sources = sources[:, 0] * self.largeur + sources[:, 1]
+        backend = BACKENDS_DIJKSTRA[self.backend_dijkstra]
+        if self.largeur < 3:
+            backend = BACKENDS_DIJKSTRA['numpy']
+        return backend.calculer_champ(self, u_sources)
 
-            # Vérification des limites de l'image
-            if 0 <= h_v < self.hauteur and 0 <= l_v < self.largeur:
-                intensite_v = self.image_gris[h_v, l_v]
-                # Le poids est la différence absolue d'intensité (contraste)
-                poids = abs(int(intensite_u) - int(intensite_v))
+    # Poursuit Dijkstra sur l'arbre jusqu'à ce que toutes les cibles soient fixées (ou jusqu'à
+    # épuisement si cibles vaut None), puis le range dans le cache. Renvoie le nombre de visites.
+    # Une annulation par le suivi laisse un arbre cohérent, rangé dans le cache et réutilisable
+    def etendre_arbre(self, arbre, cibles=None, suivi=None):
+        restantes = None
+        if cibles is not None:
+            restantes = {u for u in cibles if not arbre.est_fixe(u)}
+            if not restantes:
+                return 0
 
-                yield (h_v, l_v), max(1, poids)
+        distances, predecesseurs = arbre.distances, arbre.predecesseurs
+        file_priorite = arbre.file_priorite
+        ajouter, extraire = file_priorite.ajouter, file_priorite.extraire
+        # Lecture en entier Python : comparer un int à un scalaire NumPy est bien plus lent
+        lire_distance = distances.item
 
-    # Exécute l'algorithme de Dijkstra pour trouver le chemin le plus court
+        # Plans de poids précalculés (une ligne par direction) et décalages associés
+        plans = self.obtenir_plans_poids().reshape(len(self.obtenir_liste_voisins()), -1)
+        directions = self.obtenir_directions()
+        origine = arbre.origine
+        nb_noeuds_visites = 0
+
+        try:
+            while file_priorite:
+                u = extraire()
+                dist_u = file_priorite.courant
+
+                # Optimisation : si on a déjà trouvé mieux, on ignore
+                if dist_u > lire_distance(u):
+                    continue
+
+                nb_noeuds_visites += 1
+                arbre.rayon = dist_u
+
+                # Exploration des voisins (une seule lecture des poids pour toutes les directions).
+                # Une cible est elle aussi développée afin que la recherche puisse être reprise
+                for (code, decalage), poids in zip(directions, plans[:, u].tolist()):
+                    if not poids:
+                        continue
+
+                    v = u + decalage
+                    nouvelle_dist = dist_u + poids
+
+                    if nouvelle_dist < lire_distance(v):
+                        distances[v] = nouvelle_dist
+                        predecesseurs[v] = code
+                        ajouter(nouvelle_dist, v)
+
+                # Point de contrôle une fois u entièrement développé (arbre cohérent)
+                if suivi is not None and nb_noeuds_visites % INTERVALLE_SUIVI == 0:
+                    suivi.verifier(nb_noeuds_visites, dist_u - origine)
+
+                if restantes is not None and u in restantes:
+                    restantes.discard(u)
+                    if not restantes:
+                        break
+        finally:
+            if not file_priorite:
+                arbre.complet = True
+                arbre.file_priorite = None
+
+            # Clé de création : l'arbre ne dépend que de l'image et du graphe d'alors
+            self.cache_arbres.enregistrer(arbre.cle, arbre)
+
+        return nb_noeuds_visites
+
+    # Chemin optimal de la source de l'arbre vers noeud_arrivee par simple remontée des
+    # prédécesseurs, en O(longueur du chemin). Renvoie (chemin, coût), vide tant que le pixel
+    # n'est pas fixé : l'arbre peut être en cours d'extension dans un autre fil d'exécution
+    def chemin_depuis_arbre(self, arbre, noeud_arrivee):
+        u_arrivee = noeud_arrivee[0] * self.largeur + noeud_arrivee[1]
+        if not arbre.est_fixe(u_arrivee) or arbre.distances[u_arrivee] == 0:
+            return [], 0
+        cout = int(arbre.distances[u_arrivee]) - arbre.origine
+        return self.reconstruire_chemin(arbre.predecesseurs, arbre.u_source, u_arrivee), cout
+
+    # Exécute l'algorithme de Dijkstra pour trouver le chemin le plus court. Les arbres déjà
+    # calculés sont réutilisés : une requête couverte ne coûte que la remontée du chemin
     def executer_dijkstra(self, noeud_depart, noeud_arrivee):
         if not self.est_chargee:
             return [], 0, 0
 
-        h_depart, l_depart = noeud_depart
-        h_arrivee, l_arrivee = noeud_arrivee
+        # Les pixels sont manipulés par indice plat u = h * largeur + l
+        u_depart = noeud_depart[0] * self.largeur + noeud_depart[1]
+        u_arrivee = noeud_arrivee[0] * self.largeur + noeud_arrivee[1]
+
+        # Graphe non orienté : un arbre issu de l'arrivée qui couvre le départ convient aussi
+        arbre = self.cache_arbres.obtenir(self.cle_arbre(u_arrivee))
+        inverse = arbre is not None and arbre.est_fixe(u_depart)
+        if inverse:
+            u_depart, u_arrivee = u_arrivee, u_depart
+        else:
+            arbre = self.obtenir_arbre(u_depart)
+
+        nb_noeuds_visites = self.etendre_arbre(arbre, [u_arrivee], self.suivi)
+
+        # Reconstruction du chemin (Backtracking)
+        if arbre.distances[u_arrivee] == 0:
+            return [], 0, nb_noeuds_visites
+        cout_final = int(arbre.distances[u_arrivee]) - arbre.origine
+
+        chemin = self.reconstruire_chemin(arbre.predecesseurs, u_depart, u_arrivee)
+        if not chemin:
+            return [], 0, nb_noeuds_visites
+
+        if inverse:
+            chemin.reverse()
+        return chemin, cout_final, nb_noeuds_visites
+
+    # Calcule en une seule recherche les chemins du départ vers plusieurs arrivées (liste de
+    # (h, l) ou tableau de forme (n, 2)). La recherche s'arrête dès que toutes sont fixées.
+    # Renvoie (chemins, coûts, visites) ; chemin vide et coût 0 pour une arrivée inaccessible
+    def executer_dijkstra_multi(self, noeud_depart, noeuds_arrivee):
+        if not self.est_chargee:
+            return [], [], 0
+
+        cibles = np.asarray(noeuds_arrivee, dtype=np.int64).reshape(-1, 2)
+        u_depart = noeud_depart[0] * self.largeur + noeud_depart[1]
+        u_cibles = (cibles[:, 0] * self.largeur + cibles[:, 1]).tolist()
+
+        arbre = self.obtenir_arbre(u_depart)
+        nb_noeuds_visites = self.etendre_arbre(arbre, u_cibles, self.suivi)
+
+        chemins, couts = [], []
+        for u_arrivee in u_cibles:
+            chemin = []
+            if arbre.distances[u_arrivee] != 0:
+                chemin = self.reconstruire_chemin(arbre.predecesseurs, u_depart, u_arrivee)
+            chemins.append(chemin)
+            couts.append(int(arbre.distances[u_arrivee]) - arbre.origine if chemin else 0)
+
+        return chemins, couts, nb_noeuds_visites
+
+    # Sélectionne nb_reperes repères par le point le plus éloigné (chaque nouveau repère maximise
+    # sa distance aux précédents) et stocke leurs champs de distances (uint16 si possible).
+    # A* en tire ensuite des minorants par l'inégalité triangulaire (ALT). Le suivi
+    # (SuiviCalcul) est consulté pendant chaque champ ; une annulation garde les repères
+    # précédents
+    def pretraiter_reperes(self, nb_reperes=8, suivi=None):
+        if not self.est_chargee:
+            return False, "Aucune image chargée."
+
+        suivi_precedent, self.suivi = self.suivi, suivi
+        try:
+            # Le premier repère est le pixel le plus éloigné du centre de l'image
+            u_centre = (self.hauteur // 2) * self.largeur + self.largeur // 2
+            distances_min = self.convertir_distances(self.calculer_champ_delta_stepping(u_centre)[0], 0)
+            reperes, champs = [], []
+
+            for _ in range(min(nb_reperes, self.hauteur * self.largeur)):
+                if suivi is not None:
+                    suivi.verifier(len(reperes), 0)
+                u_repere = int(np.argmax(distances_min))
+                champ = self.convertir_distances(self.calculer_champ_delta_stepping(u_repere)[0], 0)
+                reperes.append(u_repere)
+                champs.append(champ)
+                np.minimum(distances_min, champ, out=distances_min)
+        finally:
+            self.suivi = suivi_precedent
+
+        champs = np.stack(champs)
+        if champs.max() < np.iinfo(np.uint16).max:
+            champs = champs.astype(np.uint16)
+
+        self.reperes = reperes
+        self.distances_reperes = champs
+        self.cle_reperes = (self.empreinte_image, self.mode_connexite, self.modele_cout)
+        return True, f"{len(reperes)} repères calculés ({champs.nbytes // (1024 * 1024)} Mo)."
+
+    # Indique si les repères ALT correspondent à l'image, la connexité et le coût courants
+    def reperes_valides(self):
+        return self.distances_reperes is not None and \
+            self.cle_reperes == (self.empreinte_image, self.mode_connexite, self.modele_cout)
+
+    # Heuristique admissible sur la grille : chaque pas coûte au moins 1, donc la distance
+    # de Manhattan (4-connexité) ou de Tchebychev (8-connexité) minore le coût restant.
+    # Avec des repères ALT, on prend aussi le max des |d(L, arrivée) - d(L, u)|
+    def creer_heuristique(self, u_arrivee):
+        largeur = self.largeur
+        h_arrivee, l_arrivee = divmod(u_arrivee, largeur)
+
+        if self.mode_connexite == '8':
+            def heuristique_grille(u):
+                h, l = divmod(u, largeur)
+                return max(abs(h - h_arrivee), abs(l - l_arrivee))
+        else:
+            def heuristique_grille(u):
+                h, l = divmod(u, largeur)
+                return abs(h - h_arrivee) + abs(l - l_arrivee)
+
+        if not self.reperes_valides():
+            return heuristique_grille
+
+        champs = self.distances_reperes
+        distances_arrivee = champs[:, u_arrivee].tolist()
+
+        # Maximum de minorants consistants : l'heuristique reste consistante
+        def heuristique(u):
+            borne = heuristique_grille(u)
+            for dist_arrivee, dist_u in zip(distances_arrivee, champs[:, u].tolist()):
+                ecart = dist_arrivee - dist_u if dist_arrivee > dist_u else dist_u - dist_arrivee
+                if ecart > borne:
+                    borne = ecart
+            return borne
+
+        return heuristique
+
+    # Exécute l'algorithme A* (même résultat que Dijkstra, moins de pixels explorés)
+    def executer_a_etoile(self, noeud_depart, noeud_arrivee):
+        if not self.est_chargee:
+            return [], 0, 0
+
+        u_depart = noeud_depart[0] * self.largeur + noeud_depart[1]
+        u_arrivee = noeud_arrivee[0] * self.largeur + noeud_arrivee[1]
+
+        distances, predecesseurs, origine = self.creer_etat_recherche()
+        distances[u_depart] = origine
 
-        # Initialisation des structures de données
-        distances = np.full((self.hauteur, self.largeur), np.inf)
-        distances[h_depart, l_depart] = 0
-        predecesseurs = np.empty((self.hauteur, self.largeur), dtype=object)
+        plans = self.obtenir_plans_poids().reshape(len(self.obtenir_liste_voisins()), -1)
+        directions = self.obtenir_directions()
+        heuristique = self.creer_heuristique(u_arrivee)
 
-        # File de priorité (Tas binaire) : (distance, h, l)
-        file_priorite = [(0, h_depart, l_depart)]
+        # File de priorité indexée par f = g + h. L'heuristique est consistante et le graphe
+        # non orienté, donc f augmente au plus de 2 x poids entre un pixel et son voisin.
+        # À f égal, le dernier pixel ajouté (le plus profond) sort en premier
+        file_priorite = self.creer_file_priorite(2 * POIDS_MAX, origine + heuristique(u_depart))
+        file_priorite.ajouter(origine + heuristique(u_depart), u_depart)
+        ajouter, extraire = file_priorite.ajouter, file_priorite.extraire
+        lire_distance = distances.item # Entiers Python (voir etendre_arbre)
+        suivi = self.suivi
         nb_noeuds_visites = 0
 
         while file_priorite:
-            dist_u, h_u, l_u = heapq.heappop(file_priorite)
+            u = extraire()
+            f_u, dist_u = file_priorite.courant, lire_distance(u)
 
-            # Optimisation : si on a déjà trouvé mieux, on ignore
-            if dist_u > distances[h_u, l_u]:
+            # Une entrée périmée a un f plus grand que g(u) + h(u) actuel
+            if f_u > dist_u + heuristique(u):
                 continue
 
             nb_noeuds_visites += 1
-            if (h_u, l_u) == noeud_arrivee:
+            if u == u_arrivee:
                 break
+            if suivi is not None and nb_noeuds_visites % INTERVALLE_SUIVI == 0:
+                suivi.verifier(nb_noeuds_visites, dist_u - origine)
 
-            # Exploration des voisins
-            for (h_v, l_v), poids in self.obtenir_voisins_et_poids(h_u, l_u):
+            for (code, decalage), poids in zip(directions, plans[:, u].tolist()):
+                if not poids:
+                    continue
+
+                v = u + decalage
                 nouvelle_dist = dist_u + poids
 
-                if nouvelle_dist < distances[h_v, l_v]:
-                    distances[h_v, l_v] = nouvelle_dist
-                    predecesseurs[h_v, l_v] = (h_u, l_u)
-                    heapq.heappush(file_priorite, (nouvelle_dist, h_v, l_v))
+                if nouvelle_dist < lire_distance(v):
+                    distances[v] = nouvelle_dist
+                    predecesseurs[v] = code
+                    ajouter(nouvelle_dist + heuristique(v), v)
 
-        # Reconstruction du chemin (Backtracking)
-        chemin = []
-        h_courant, l_courant = noeud_arrivee
-        cout_final = distances[h_arrivee, l_arrivee]
+        if distances[u_arrivee] == 0:
+            return [], 0, nb_noeuds_visites
+        cout_final = int(distances[u_arrivee]) - origine
 
-        if cout_final == np.inf:
+        chemin = self.reconstruire_chemin(predecesseurs, u_depart, u_arrivee)
+        if not chemin:
             return [], 0, nb_noeuds_visites
 
-        while (h_courant, l_courant) != noeud_depart:
-            chemin.append((h_courant, l_courant))
-            predecesseur = predecesseurs[h_courant, l_courant]
-            if predecesseur is None:
-                return [], 0, nb_noeuds_visites
-            h_courant, l_courant = predecesseur
+        return chemin, cout_final, nb_noeuds_visites
 
-        chemin.append(noeud_depart)
-        chemin.reverse()
+    # Exécute Dijkstra simultanément depuis le départ et depuis l'arrivée (graphe non orienté :
+    # le poids |I(u) - I(v)| est symétrique) et raccorde les deux demi-chemins
+    def executer_dijkstra_bidirectionnel(self, noeud_depart, noeud_arrivee):
+        if not self.est_chargee:
+            return [], 0, 0
+
+        u_depart = noeud_depart[0] * self.largeur + noeud_depart[1]
+        u_arrivee = noeud_arrivee[0] * self.largeur + noeud_arrivee[1]
+
+        # Un état compact par sens de recherche
+        distances_avant, predecesseurs_avant, origine = self.creer_etat_recherche()
+        distances_arriere, predecesseurs_arriere, _ = self.creer_etat_recherche()
+        distances_avant[u_depart] = origine
+        distances_arriere[u_arrivee] = origine
+
+        plans = self.obtenir_plans_poids().reshape(len(self.obtenir_liste_voisins()), -1)
+        directions = self.obtenir_directions()
+
+        file_avant = self.creer_file_priorite(priorite_initiale=origine)
+        file_avant.ajouter(origine, u_depart)
+        file_arriere = self.creer_file_priorite(priorite_initiale=origine)
+        file_arriere.ajouter(origine, u_arrivee)
+
+        # Lecture des distances en entiers Python (voir etendre_arbre)
+        lire_avant, lire_arriere = distances_avant.item, distances_arriere.item
+
+        # Meilleure somme connue des distances stockées (coût + 2 x origine) d'un chemin
+        # complet, 0 si aucun, et pixel où les deux recherches se rejoignent
+        meilleur_cout = 0 if u_depart != u_arrivee else 2 * origine
+        noeud_jonction = u_depart
+        suivi = self.suivi
+        nb_noeuds_visites = 0
+
+        while file_avant and file_arriere:
+            # Critère d'arrêt : aucun chemin passant par les frontières ne peut faire mieux
+            min_avant, min_arriere = file_avant.minimum(), file_arriere.minimum()
+            if min_avant + min_arriere >= meilleur_cout:
+                break
+
+            # On étend la frontière dont la distance minimale est la plus petite
+            if min_avant <= min_arriere:
+                file_priorite, distances, predecesseurs, lire_distance, lire_opposee = \
+                    file_avant, distances_avant, predecesseurs_avant, lire_avant, lire_arriere
+                dist_u = min_avant
+            else:
+                file_priorite, distances, predecesseurs, lire_distance, lire_opposee = \
+                    file_arriere, distances_arriere, predecesseurs_arriere, lire_arriere, lire_avant
+                dist_u = min_arriere
+
+            u = file_priorite.extraire()
+            if dist_u > lire_distance(u):
+                continue
+
+            nb_noeuds_visites += 1
+            if suivi is not None and nb_noeuds_visites % INTERVALLE_SUIVI == 0:
+                suivi.verifier(nb_noeuds_visites, min_avant + min_arriere - 2 * origine)
+
+            for (code, decalage), poids in zip(directions, plans[:, u].tolist()):
+                if not poids:
+                    continue
+
+                v = u + decalage
+                nouvelle_dist = dist_u + poids
+
+                if nouvelle_dist < lire_distance(v):
+                    distances[v] = nouvelle_dist
+                    predecesseurs[v] = code
+                    file_priorite.ajouter(nouvelle_dist, v)
+
+                    # Le pixel v a déjà été atteint par l'autre recherche : chemin candidat
+                    dist_opposee = lire_opposee(v)
+                    if dist_opposee != 0 and nouvelle_dist + dist_opposee < meilleur_cout:
+                        meilleur_cout = nouvelle_dist + dist_opposee
+                        noeud_jonction = v
+
+        if meilleur_cout == 0:
+            return [], 0, nb_noeuds_visites
+
+        # Départ -> jonction, puis jonction -> arrivée (demi-chemin arrière retourné)
+        chemin_avant = self.reconstruire_chemin(predecesseurs_avant, u_depart, noeud_jonction)
+        chemin_arriere = self.reconstruire_chemin(predecesseurs_arriere, u_arrivee, noeud_jonction)
+        if not chemin_avant or not chemin_arriere:
+            return [], 0, nb_noeuds_visites
+
+        chemin_arriere.reverse()
+        return chemin_avant + chemin_arriere[1:], meilleur_cout - 2 * origine, nb_noeuds_visites
+
+    # Choisit la largeur de seau delta à partir de l'histogramme des poids : 90 % des arêtes
+    # sont "légères" (poids <= delta), ce qui limite à la fois le nombre de seaux traités et
+    # les re-relaxations à l'intérieur d'un seau
+    def estimer_delta(self):
+        cle = (self.mode_connexite, self.modele_cout)
+        if cle not in self.deltas:
+            histogramme = np.bincount(self.obtenir_plans_poids().ravel(), minlength=POIDS_MAX + 1)
+            histogramme[0] = 0 # 0 = voisin hors de l'image
+            cumul = np.cumsum(histogramme)
+            self.deltas[cle] = max(1, int(np.searchsorted(cumul, 0.9 * cumul[-1])))
+
+        return self.deltas[cle]
+
+    # Relâche en bloc les arêtes sortant des pixels sources (indices uniques) dont le poids
+    # est dans [poids_min, poids_max] et renvoie les pixels dont la distance a diminué
+    def relacher_en_bloc(self, plans, decalages, distances, predecesseurs, sources, poids_min, poids_max):
+        dist_sources = distances[sources].astype(np.int64)
+        ameliores = []
+
+        for code, decalage in enumerate(decalages):
+            poids = plans[code, sources]
+            selection = (poids >= poids_min) & (poids <= poids_max)
+            if not selection.any():
+                continue
+
+            # Dans une même direction, deux sources distinctes ont deux cibles distinctes :
+            # une affectation groupée suffit (pas de conflit d'écriture)
+            cibles = sources[selection] + decalage
+            nouvelles_dist = dist_sources[selection] + poids[selection]
+            amelioration = nouvelles_dist < distances[cibles]
+            cibles = cibles[amelioration]
+
+            distances[cibles] = nouvelles_dist[amelioration]
+            predecesseurs[cibles] = code + 1
+            ameliores.append(cibles)
+
+        if not ameliores:
+            return sources[:0]
+        return np.unique(np.concatenate(ameliores))
+
+    # Delta-stepping vectorisé : les pixels sont regroupés en seaux de largeur delta et chaque
+    # seau est traité en entier par opérations NumPy sur les plans de poids. Sans arrivée, tout
+    # le champ de distances est calculé. Renvoie (distances, prédécesseurs, origine, visités),
+    # distances stockées comme dans creer_etat_recherche
+    def calculer_champ_delta_stepping(self, u_depart, u_arrivee=None, delta=None):
+        if delta is None:
+            delta = self.estimer_delta()
+
+        distances, predecesseurs, origine = self.creer_etat_recherche()
+        distances[u_depart] = origine
+
+        plans = self.obtenir_plans_poids().reshape(len(self.obtenir_liste_voisins()), -1)
+        decalages = self.obtenir_decalages()
+
+        # Pixels atteints mais pas encore fixés (distance >= borne inférieure du seau courant).
+        # u_depart peut être un tableau de sources : le champ est alors multi-sources
+        candidats = np.atleast_1d(np.asarray(u_depart, dtype=np.int64))
+        nb_noeuds_visites = 0
+
+        while candidats.size:
+            dist_candidats = distances[candidats]
+            borne_sup = int(dist_candidats.min()) // delta * delta + delta
+
+            dans_seau = dist_candidats < borne_sup
+            actifs = np.unique(candidats[dans_seau])
+            candidats = candidats[~dans_seau]
+            seau = [actifs]
+
+            # Phase légère : on relâche jusqu'à stabilisation du seau (réinsertions possibles)
+            while actifs.size:
+                ameliores = self.relacher_en_bloc(plans, decalages, distances, predecesseurs, actifs, 1, delta)
+                reste_dans_seau = distances[ameliores] < borne_sup
+                actifs = ameliores[reste_dans_seau]
+                seau.append(actifs)
+                candidats = np.concatenate((candidats, ameliores[~reste_dans_seau]))
+
+            # Le seau est fixé : ses arêtes lourdes mènent forcément aux seaux suivants
+            seau = np.unique(np.concatenate(seau))
+            nb_noeuds_visites += seau.size
+            ameliores = self.relacher_en_bloc(plans, decalages, distances, predecesseurs, seau, delta + 1, POIDS_MAX)
+
+            # On retire les doublons et les pixels désormais fixés
+            candidats = np.unique(np.concatenate((candidats, ameliores)))
+            candidats = candidats[distances[candidats] >= borne_sup]
+
+            # Arrêt anticipé : les pixels atteints mais non fixés (tous parmi les candidats)
+            # retrouvent leur état initial, sans parcourir le reste du tableau
+            if u_arrivee is not None and distances[u_arrivee] < borne_sup:
+                distances[candidats] = 0
+                predecesseurs[candidats] = PREDECESSEUR_AUCUN
+                break
+            # Un point de contrôle par seau (chaque seau est traité d'un bloc)
+            if self.suivi is not None:
+                self.suivi.verifier(nb_noeuds_visites, borne_sup - origine)
+
+        return distances, predecesseurs, origine, nb_noeuds_visites
+
+    # Exécute le delta-stepping vectorisé (mêmes distances que Dijkstra)
+    def executer_delta_stepping(self, noeud_depart, noeud_arrivee):
+        if not self.est_chargee:
+            return [], 0, 0
+
+        u_depart = noeud_depart[0] * self.largeur + noeud_depart[1]
+        u_arrivee = noeud_arrivee[0] * self.largeur + noeud_arrivee[1]
+
+        distances, predecesseurs, origine, nb_noeuds_visites = \
+            self.calculer_champ_delta_stepping(u_depart, u_arrivee)
+
+        if distances[u_arrivee] == 0:
+            return [], 0, nb_noeuds_visites
+        cout_final = int(distances[u_arrivee]) - origine
+
+        chemin = self.reconstruire_chemin(predecesseurs, u_depart, u_arrivee)
+        if not chemin:
+            return [], 0, nb_noeuds_visites
 
         return chemin, cout_final, nb_noeuds_visites
 
-    # Dessine le chemin trouvé et les marqueurs sur l'image couleur
-    def dessiner_chemin_sur_image(self, chemin, taille_marqueur=4):
-        if not self.est_chargee or not chemin:
+    # Construit le graphe abstrait par tuiles (HPA*). exact=True garde tous les pixels de
+    # bordure comme noeuds : plus long à construire, mais le chemin raffiné est optimal. Les
+    # coûts intra-tuile sont calculés avec le backend sélectionné ; le suivi peut annuler
+    def construire_hierarchie(self, taille_tuile=TAILLE_TUILE, exact=False, suivi=None):
+        if not self.est_chargee:
+            return False, "Aucune image chargée."
+
+        self.hierarchie = RechercheHierarchique(self, taille_tuile, exact, suivi)
+        return True, f"Hiérarchie construite : {len(self.hierarchie.noeuds)} noeuds abstraits."
+
+    # Indique si la hiérarchie par tuiles correspond à l'image, la connexité et au coût courants
+    def hierarchie_valide(self):
+        return self.hierarchie is not None and \
+            self.hierarchie.cle == (self.empreinte_image, self.mode_connexite, self.modele_cout)
+
+    # Recherche hiérarchique par tuiles (la hiérarchie est construite si elle est absente
+    # ou ne correspond plus à l'image, la connexité ou au modèle de coût courants)
+    def executer_hierarchique(self, noeud_depart, noeud_arrivee):
+        if not self.est_chargee:
+            return [], 0, 0
+
+        if not self.hierarchie_valide():
+            self.construire_hierarchie(suivi=self.suivi)
+
+        return self.hierarchie.executer(noeud_depart, noeud_arrivee, self.suivi)
+
+    # Chemin du fichier de hiérarchie de contraction enregistré à côté de l'image
+    def chemin_fichier_contraction(self):
+        if self.chemin_fichier_original is None:
+            return None
+        return f"{self.chemin_fichier_original}.{self.mode_connexite}{SUFFIXE_FICHIER}"
+
+    # Charge la hiérarchie de contraction enregistrée à côté de l'image si elle correspond à
+    # l'image, la connexité et au modèle de coût courants ; sinon la construit et l'enregistre.
+    # La construction (Python pur) traite de l'ordre de 2 000 pixels par seconde
+    def construire_contraction(self, sauvegarder=True, suivi=None):
+        if not self.est_chargee:
+            return False, "Aucune image chargée."
+
+        cle = (self.empreinte_image, self.mode_connexite, self.modele_cout)
+        chemin_fichier = self.chemin_fichier_contraction()
+
+        if chemin_fichier is not None and os.path.exists(chemin_fichier):
+            try:
+                self.contraction = HierarchieContraction.charger(chemin_fichier, cle)
+            except Exception:
+                self.contraction = None
+            if self.contraction is not None:
+                return True, "Hiérarchie de contraction chargée."
+
+        self.contraction = HierarchieContraction.construire(self, suivi)
+        if sauvegarder and chemin_fichier is not None:
+            try:
+                self.contraction.sauvegarder(chemin_fichier)
+            except OSError as e:
+                return True, f"Hiérarchie construite (non enregistrée : {e})."
+        return True, f"Hiérarchie de contraction construite ({len(self.contraction.cibles)} arêtes)."
+
+    # Requête sur la hiérarchie de contraction (chargée ou construite au premier appel)
+    def executer_contraction(self, noeud_depart, noeud_arrivee):
+        if not self.est_chargee:
+            return [], 0, 0
+
+        if self.contraction is None or \
+                self.contraction.cle != (self.empreinte_image, self.mode_connexite, self.modele_cout):
+            self.construire_contraction(suivi=self.suivi)
+
+        u_depart = noeud_depart[0] * self.largeur + noeud_depart[1]
+        u_arrivee = noeud_arrivee[0] * self.largeur + noeud_arrivee[1]
+        return self.contraction.executer(u_depart, u_arrivee, self.suivi)
+
+    # Construit la pyramide multirésolution ; largeur_couloir est la demi-largeur du couloir
+    # de raffinement et verifier_optimalite garantit un chemin optimal (A* exact si besoin) ;
+    # le suivi peut annuler la construction
+    def construire_pyramide(self, largeur_couloir=LARGEUR_COULOIR, verifier_optimalite=False, suivi=None):
+        if not self.est_chargee:
+            return False, "Aucune image chargée."
+
+        self.pyramide = RecherchePyramide(self, largeur_couloir, verifier_optimalite, suivi)
+        return True, f"Pyramide construite : {len(self.pyramide.niveaux)} niveaux."
+
+    # Indique si la pyramide correspond à l'image, la connexité et au modèle de coût courants
+    def pyramide_valide(self):
+        return self.pyramide is not None and \
+            self.pyramide.cle == (self.empreinte_image, self.mode_connexite, self.modele_cout)
+
+    # Reconstruit la pyramide si elle n'est plus valide, avec les réglages de la précédente
+    def actualiser_pyramide(self, suivi=None):
+        if self.pyramide is None:
+            self.construire_pyramide(suivi=suivi)
+        elif not self.pyramide_valide():
+            self.construire_pyramide(self.pyramide.largeur_couloir, self.pyramide.verifier_optimalite, suivi)
+
+    # Recherche grossière puis raffinée (la pyramide est construite si elle est absente ou
+    # ne correspond plus à l'image, la connexité ou au modèle de coût courants)
+    def executer_pyramide(self, noeud_depart, noeud_arrivee):
+        if not self.est_chargee:
+            return [], 0, 0
+
+        self.actualiser_pyramide(self.suivi)
+        return self.pyramide.executer(noeud_depart, noeud_arrivee, self.suivi)
+
+    # Replanification incrémentale (D* Lite) : l'état est conservé tant que le départ (ou
+    # l'arrivée, le graphe étant non orienté) reste le même. Déplacer l'autre extrémité ou
+    # modifier des pixels via modifier_pixels ne répare que la partie touchée de l'arbre
+    def executer_incremental(self, noeud_depart, noeud_arrivee):
+        if not self.est_chargee:
+            return [], 0, 0
+
+        u_depart = noeud_depart[0] * self.largeur + noeud_depart[1]
+        u_arrivee = noeud_arrivee[0] * self.largeur + noeud_arrivee[1]
+        cle = (self.empreinte_image, self.mode_connexite, self.modele_cout)
+
+        inverse = False
+        if self.incrementale is not None and self.incrementale.cle == cle and \
+                self.incrementale.u_racine == u_arrivee != u_depart:
+            u_depart, u_arrivee = u_arrivee, u_depart
+            inverse = True
+        elif self.incrementale is None or self.incrementale.cle != cle or \
+                self.incrementale.u_racine != u_depart:
+            self.incrementale = RechercheIncrementale(self, u_depart)
+
+        chemin, cout_final, nb_noeuds_visites = self.incrementale.executer(u_arrivee, self.suivi)
+        if inverse:
+            chemin.reverse()
+        return chemin, cout_final, nb_noeuds_visites
+
+    # Remplace les pixels gris à partir de (h0, l0) par valeurs (tableau 2D, tronqué au bord
+    # de l'image), recalcule les poids des seules arêtes touchées et prévient le moteur
+    # incrémental. Les autres structures dépendant de l'image sont invalidées par l'empreinte
+    def modifier_pixels(self, h0, l0, valeurs):
+        if not self.est_chargee:
+            return False, "Aucune image chargée."
+        if isinstance(self.image_gris, SourceTuilee):
+            return False, "Un raster ouvert par tuiles est en lecture seule."
+
+        valeurs = np.asarray(valeurs, dtype=np.uint8)
+        h1, l1 = min(self.hauteur, h0 + valeurs.shape[0]), min(self.largeur, l0 + valeurs.shape[1])
+        if h0 < 0 or l0 < 0 or h0 >= h1 or l0 >= l1:
+            return False, "Zone hors de l'image."
+        valeurs = valeurs[:h1 - h0, :l1 - l0]
+
+        self.image_gris[h0:h1, l0:l1] = valeurs
+        if self.image_couleur is not None:
+            self.image_couleur[h0:h1, l0:l1] = valeurs[:, :, None]
+
+        # Les arêtes touchées partent de la zone élargie d'un pixel, plus la marge du filtre
+        # du modèle de coût (les valeurs par pixel d'un gradient débordent de la zone)
+        for (mode, modele), plans in self.plans_poids.items():
+            calculateur = self.calculateurs_cout[modele]
+            marge = 1 + calculateur.marge
+            liste_voisins = VOISINS_8_CONNEXITE if mode == '8' else VOISINS_4_CONNEXITE
+            self.remplir_plans(plans, liste_voisins, max(0, h0 - marge), min(self.hauteur, h1 + marge),
+                               max(0, l0 - marge), min(self.largeur, l1 + marge), calculateur)
+
+        cle_precedente = (self.empreinte_image, self.mode_connexite, self.modele_cout)
+        self.deltas = {}
+        self.graphes_csr = {}
+        self.cache_arbres.vider()
+        self.empreinte_image = hashlib.blake2b(self.image_gris, digest_size=16).hexdigest()
+
+        if self.incrementale is not None and self.incrementale.cle == cle_precedente:
+            marge = self.calculateur_cout.marge
+            self.incrementale.notifier_modification(h0 - marge, h1 + marge, l0 - marge, l1 + marge)
+        return True, f"{(h1 - h0) * (l1 - l0)} pixels modifiés."
+
+    # Règle le budget de temps (en secondes) et l'inflation initiale du moteur anytime
+    def definir_budget_anytime(self, budget, epsilon=EPSILON_INITIAL):
+        if budget < 0 or epsilon < 1:
+            raise ValueError("Le budget doit être positif et epsilon au moins égal à 1.")
+        self.budget_anytime = budget
+        self.epsilon_anytime = epsilon
+
+    # Recherche anytime (ARA*) : premier chemin avec une heuristique gonflée, puis améliorations
+    # jusqu'à l'optimalité ou l'épuisement du budget. La borne de sous-optimalité du chemin
+    # renvoyé est placée dans borne_sous_optimalite
+    def executer_anytime(self, noeud_depart, noeud_arrivee):
+        if not self.est_chargee:
+            return [], 0, 0
+
+        echeance = time.perf_counter() + self.budget_anytime
+        u_depart = noeud_depart[0] * self.largeur + noeud_depart[1]
+        u_arrivee = noeud_arrivee[0] * self.largeur + noeud_arrivee[1]
+        recherche = RechercheAnytime(self, u_depart, u_arrivee, self.epsilon_anytime)
+
+        chemin, cout_final = [], 0
+        for chemin, cout_final, self.borne_sous_optimalite in recherche.ameliorer(echeance, self.suivi):
+            pass
+
+        if not chemin:
+            return [], 0, recherche.nb_noeuds_visites
+        return chemin, cout_final, recherche.nb_noeuds_visites
+
+    # Calcule le chemin avec le moteur de recherche sélectionné. Un suivi (SuiviCalcul) permet
+    # d'annuler le calcul depuis un autre fil (CalculAnnule est alors levée) et d'en recevoir
+    # la progression ; tous les moteurs le consultent, prétraitements compris
+    def calculer_chemin(self, noeud_depart, noeud_arrivee, suivi=None):
+        moteur = getattr(self, MOTEURS_RECHERCHE[self.moteur_recherche])
+        self.borne_sous_optimalite = None
+        self.suivi = suivi
+        try:
+            return moteur(noeud_depart, noeud_arrivee)
+        finally:
+            self.suivi = None
+
+    # Traite un lot de requêtes [(départ, arrivée), ...] avec le moteur sélectionné sur un pool
+    # de processus partageant l'image et les plans de poids en mémoire ; les résultats
+    # (chemin, coût, visites) sont produits au fil de l'eau, dans l'ordre des requêtes
+    def executer_lot(self, requetes, nb_processus=None, taille_paquet=TAILLE_PAQUET):
+        if not self.est_chargee:
+            return
+
+        # Les prétraitements sont faits une seule fois ici plutôt que dans chaque processus :
+        # la hiérarchie de contraction est enregistrée et rechargée depuis son fichier, la
+        # hiérarchie par tuiles et la pyramide sont placées en mémoire partagée
+        if self.moteur_recherche == 'contraction':
+            self.construire_contraction()
+        elif self.moteur_recherche == 'hierarchique' and not self.hierarchie_valide():
+            self.construire_hierarchie()
+        elif self.moteur_recherche == 'pyramide':
+            self.actualiser_pyramide()
+
+        yield from repartir_requetes(self, requetes, nb_processus, taille_paquet)
+
+    # Image à afficher : l'image couleur, ou le raster (gris ou BGR) d'une source tuilée que
+    # l'interface lit par fenêtres
+    def obtenir_source_affichage(self):
+        if isinstance(self.image_gris, SourceTuilee):
+            return self.image_gris.raster
+        return self.image_couleur
+
+    # Efface les marqueurs et chemins dessinés (l'image n'est ni relue ni recopiée)
+    def effacer_dessins(self):
+        if self.calque is not None:
+            self.calque.effacer()
+
+    # Image à afficher : l'image couleur avec le calque des dessins et les calques
+    # supplémentaires donnés (aperçu...) superposés. Sans dessin, l'image elle-même est
+    # renvoyée : elle ne doit pas être modifiée
+    def composer_image(self, *calques):
+        if self.image_couleur is None:
+            return None
+
+        calques = [calque for calque in (self.calque,) + calques if calque is not None and not calque.est_vide()]
+        if not calques:
             return self.image_couleur
 
+        image = self.image_couleur.copy()
+        for calque in calques:
+            calque.appliquer(image)
+        return image
+
+    # Dessine le chemin trouvé et les marqueurs sur le calque (par défaut celui du modeleur).
+    # Le chemin est tracé en une écriture indexée par décalage de l'épaisseur ; degrade
+    # (couleur de départ, couleur d'arrivée) le colore d'un dégradé le long du parcours
+    def dessiner_chemin_sur_image(self, chemin, taille_marqueur=4, calque=None, epaisseur=1, degrade=None):
+        calque = self.calque if calque is None else calque
+
+        # Un raster ouvert par tuiles n'a pas d'image couleur sur laquelle dessiner
+        if not self.est_chargee or not chemin or calque is None:
+            return calque
+
         # Convention OpenCV : BGR (Bleu, Vert, Rouge)
-        # Chemin : Rouge (0, 0, 255)
-        for h, l in chemin:
-            cv2.circle(self.image_couleur, (l, h), radius=0, color=(0, 0, 255), thickness=1)
+        # Chemin : Rouge, ou dégradé interpolé pixel par pixel
+        pixels = np.asarray(chemin, dtype=np.int64).reshape(-1, 2)
+        couleurs = COULEUR_CHEMIN
+        if degrade is not None:
+            debut, fin = np.asarray(degrade, dtype=np.float64)
+            avancement = np.linspace(0.0, 1.0, len(pixels))[:, None]
+            couleurs = np.rint(debut + (fin - debut) * avancement).astype(np.uint8)
+        calque.dessiner_pixels(pixels, couleurs, epaisseur)
 
-        # Départ : Bleu (255, 0, 0)
-        h_dep, l_dep = chemin[0]
-        cv2.circle(self.image_couleur, (l_dep, h_dep), radius=taille_marqueur, color=(255, 0, 0), thickness=-1)
+        # Départ : Bleu
+        calque.dessiner_cercle(chemin[0], taille_marqueur, COULEUR_DEPART)
 
-        # Arrivée : Vert (0, 255, 0)
-        h_arr, l_arr = chemin[-1]
-        cv2.circle(self.image_couleur, (l_arr, h_arr), radius=taille_marqueur, color=(0, 255, 0), thickness=-1)
+        # Arrivée : Vert
+        calque.dessiner_cercle(chemin[-1], taille_marqueur, COULEUR_ARRIVEE)
 
-        return self.image_couleur
+        return calque
@@ -0,0 +1,137 @@
+import heapq
+import time
+import numpy as np
+
+from SuiviCalcul import INTERVALLE_SUIVI
+
+# Facteur d'inflation de l'heuristique pour la première solution
+EPSILON_INITIAL = 3.0
+
+# Diminution de epsilon entre deux améliorations successives
+PAS_EPSILON = 0.5
+
+# Budget de temps par défaut (en secondes) d'une requête anytime
+BUDGET_ANYTIME = 0.05
+
+# Nombre de pixels développés entre deux lectures de l'horloge
+INTERVALLE_HORLOGE = 256
+
+# États d'un pixel dans la recherche
+NON_VU, OUVERT, FERME, INCOHERENT = 0, 1, 2, 3
+
+class RechercheAnytime:
+
+    # Recherche anytime ARA* : un A* pondéré (f = g + epsilon * h) donne vite un premier
+    # chemin de coût au plus epsilon fois l'optimum ; epsilon est ensuite diminué et la
+    # recherche reprise en ne redéveloppant que les pixels dont g a baissé (liste INCONS),
+    # jusqu'à l'optimalité (epsilon = 1) ou l'échéance
+    def __init__(self, modeleur, u_depart, u_arrivee, epsilon=EPSILON_INITIAL, pas=PAS_EPSILON):
+        self.modeleur = modeleur
+        self.u_depart = u_depart
+        self.u_arrivee = u_arrivee
+        self.epsilon = max(1.0, epsilon)
+        self.pas = pas
+        self.nb_noeuds_visites = 0
+
+        # Distances stockées sous la forme coût + origine (0 = non atteint), états à NON_VU
+        self.distances, self.predecesseurs, self.origine = modeleur.creer_etat_recherche()
+        self.etats = modeleur.allouer_tableau(modeleur.hauteur * modeleur.largeur, np.uint8)
+        self.heuristique = modeleur.creer_heuristique(u_arrivee)
+        self.ouverts = []
+        self.incoherents = []
+
+        self.distances[u_depart] = self.origine
+        self.ajouter(u_depart, self.origine)
+
+    # Ajoute u dans OUVERT avec la priorité g + epsilon * h (entrées périmées ignorées plus tard).
+    # dist_u est la distance stockée, g = dist_u - origine (les flottants restent exacts)
+    def ajouter(self, u, dist_u):
+        self.etats[u] = OUVERT
+        heapq.heappush(self.ouverts, (dist_u - self.origine + self.epsilon * self.heuristique(u), dist_u, u))
+
+    # Retire les entrées périmées en tête de OUVERT et renvoie la plus petite priorité
+    def minimum_ouverts(self):
+        while self.ouverts:
+            _, dist_u, u = self.ouverts[0]
+            if self.etats[u] == OUVERT and dist_u == self.distances[u]:
+                return self.ouverts[0][0]
+            heapq.heappop(self.ouverts)
+        return None
+
+    # Développe les pixels jusqu'à ce que g(arrivée) ne dépasse plus la plus petite priorité de
+    # OUVERT. Renvoie False si l'échéance est atteinte avant (None = pas d'échéance). Le
+    # suivi (SuiviCalcul) est consulté tous les INTERVALLE_SUIVI pixels développés
+    def ameliorer_chemin(self, echeance, suivi=None):
+        distances, predecesseurs, etats = self.distances, self.predecesseurs, self.etats
+        plans = self.modeleur.obtenir_plans_poids().reshape(len(self.modeleur.obtenir_liste_voisins()), -1)
+        directions = self.modeleur.obtenir_directions()
+
+        while True:
+            minimum = self.minimum_ouverts()
+            # Arrivée non atteinte (0) : g vaut -origine, au-delà de toute priorité
+            if minimum is None or distances.item(self.u_arrivee) - self.origine <= minimum:
+                return True
+            if echeance is not None and self.nb_noeuds_visites % INTERVALLE_HORLOGE == 0 \
+                    and time.perf_counter() > echeance:
+                return False
+            if suivi is not None and self.nb_noeuds_visites % INTERVALLE_SUIVI == 0:
+                suivi.verifier(self.nb_noeuds_visites, minimum)
+
+            _, dist_u, u = heapq.heappop(self.ouverts)
+            etats[u] = FERME
+            self.nb_noeuds_visites += 1
+
+            for (code, decalage), poids in zip(directions, plans[:, u].tolist()):
+                if not poids:
+                    continue
+
+                v = u + decalage
+                nouvelle_dist = dist_u + poids
+                if nouvelle_dist < distances[v]:
+                    distances[v] = nouvelle_dist
+                    predecesseurs[v] = code
+                    if etats[v] == FERME:
+                        etats[v] = INCOHERENT
+                        self.incoherents.append(v)
+                    elif etats[v] != INCOHERENT:
+                        self.ajouter(v, nouvelle_dist)
+
+    # Borne de sous-optimalité du chemin courant : g(arrivée) / min(g + h) sur OUVERT et INCONS
+    def calculer_borne(self):
+        cout = self.distances.item(self.u_arrivee) - self.origine
+        minorants = [dist_u - self.origine + self.heuristique(u) for _, dist_u, u in self.ouverts
+                     if self.etats[u] == OUVERT and dist_u == self.distances[u]]
+        minorants += [self.distances.item(u) - self.origine + self.heuristique(u) for u in self.incoherents]
+
+        if not minorants or min(minorants) >= cout:
+            return 1.0
+        return min(self.epsilon, cout / min(minorants))
+
+    # Générateur des solutions successives (chemin, coût du chemin, borne) : la première est
+    # produite quelle que soit l'échéance, les suivantes tant que l'échéance n'est pas dépassée
+    def ameliorer(self, echeance=None, suivi=None):
+        if not self.ameliorer_chemin(None, suivi) or self.distances[self.u_arrivee] == 0:
+            return
+
+        while True:
+            borne = self.calculer_borne()
+            # Un prédécesseur dont g a baissé depuis (INCONS) rend le chemin reconstruit moins
+            # cher que g(arrivée) : le coût est recalculé le long du chemin
+            chemin = self.modeleur.reconstruire_chemin(self.predecesseurs, self.u_depart, self.u_arrivee)
+            yield chemin, self.modeleur.calculer_cout_chemin(chemin), borne
+
+            if borne <= 1.0 or (echeance is not None and time.perf_counter() > echeance):
+                return
+
+            # Epsilon plus petit : INCONS rejoint OUVERT, les priorités sont recalculées et
+            # tous les pixels peuvent de nouveau être développés
+            self.epsilon = max(1.0, min(self.epsilon - self.pas, borne))
+            a_rouvrir = [u for _, dist_u, u in self.ouverts
+                         if self.etats[u] == OUVERT and dist_u == self.distances[u]] + self.incoherents
+            self.ouverts, self.incoherents = [], []
+            self.etats[self.etats == FERME] = NON_VU
+            for u in a_rouvrir:
+                self.ajouter(u, int(self.distances[u]))
+
+            if not self.ameliorer_chemin(echeance, suivi):
+                return
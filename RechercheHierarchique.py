@@ -0,0 +1,289 @@
+import heapq
+import numpy as np
+
+from BackendsDijkstra import BACKENDS_DIJKSTRA
+from SuiviCalcul import INTERVALLE_SUIVI
+
+# Taille par défaut (en pixels) du côté d'une tuile
+TAILLE_TUILE = 64
+
+# En mode approché, un seul passage (le moins coûteux) est retenu par segment de bordure
+LONGUEUR_SEGMENT = 8
+
+# Distance "infinie" du graphe abstrait
+DISTANCE_INFINIE = np.iinfo(np.int64).max
+
+class RechercheHierarchique:
+
+    # Découpe l'image du modeleur en tuiles et précalcule le graphe abstrait (HPA*) :
+    # - les noeuds sont des pixels de bordure reliés à une tuile voisine ;
+    # - les arêtes inter-tuiles sont les arêtes de l'image qui traversent une bordure ;
+    # - dans chaque tuile, une matrice donne le coût bordure -> bordure sans quitter la tuile.
+    # En mode exact, tous les pixels de bordure sont des noeuds : le coût abstrait est alors
+    # égal au coût optimal et le chemin raffiné est un plus court chemin. En mode approché,
+    # seul le passage le moins coûteux de chaque segment de LONGUEUR_SEGMENT pixels est gardé.
+    # Un suivi (SuiviCalcul) permet d'annuler la construction (CalculAnnule est alors levée).
+    # tableaux (issus de exporter) reprend un graphe déjà construit au lieu de le construire
+    def __init__(self, modeleur, taille_tuile=TAILLE_TUILE, exact=False, suivi=None, tableaux=None):
+        self.modeleur = modeleur
+        self.taille_tuile = taille_tuile
+        self.exact = exact
+        self.cle = (modeleur.empreinte_image, modeleur.mode_connexite, modeleur.modele_cout)
+
+        self.nb_tuiles_h = -(-modeleur.hauteur // taille_tuile)
+        self.nb_tuiles_l = -(-modeleur.largeur // taille_tuile)
+
+        self.noeuds = None # Indice plat (image) de chaque noeud abstrait
+        self.tuile_noeud = None # Tuile de chaque noeud
+        self.rang_noeud = None # Position du noeud dans la liste de sa tuile
+        self.noeuds_tuile = [] # Par tuile : identifiants des noeuds
+        self.locaux_tuile = [] # Par tuile : indices plats des noeuds dans la tuile
+        self.couts_tuile = [] # Par tuile : matrice des coûts intra-tuile
+        self.aretes_inter = {} # Identifiant -> [(identifiant voisin, poids)]
+
+        if tableaux is None:
+            self.construire(suivi)
+        else:
+            self.importer(tableaux)
+
+    # Renvoie la tuile contenant le pixel (h, l)
+    def tuile_pixel(self, h, l):
+        return (h // self.taille_tuile) * self.nb_tuiles_l + l // self.taille_tuile
+
+    # Renvoie les bornes [h0, h1) x [l0, l1) d'une tuile
+    def bornes_tuile(self, tuile):
+        i, j = divmod(tuile, self.nb_tuiles_l)
+        h0, l0 = i * self.taille_tuile, j * self.taille_tuile
+        return h0, min(h0 + self.taille_tuile, self.modeleur.hauteur), l0, min(l0 + self.taille_tuile, self.modeleur.largeur)
+
+    # Liste les arêtes qui traversent une bordure de tuile : (u, v, poids) en indices plats
+    def lister_passages(self):
+        modeleur = self.modeleur
+        plans = modeleur.obtenir_plans_poids()
+        liste_voisins = modeleur.obtenir_liste_voisins()
+        taille = self.taille_tuile
+        lignes = np.arange(modeleur.hauteur)
+        colonnes = np.arange(modeleur.largeur)
+        passages = []
+
+        if self.exact:
+            # Toutes les arêtes dont les deux extrémités sont dans des tuiles différentes
+            for k, (dh, dl) in enumerate(liste_voisins):
+                change_ligne = (lignes + dh) // taille != lignes // taille
+                change_colonne = (colonnes + dl) // taille != colonnes // taille
+                traverse = (change_ligne[:, None] | change_colonne[None, :]) & (plans[k] > 0)
+                h, l = np.nonzero(traverse)
+                u = h * modeleur.largeur + l
+                passages.append((u, u + dh * modeleur.largeur + dl, plans[k, h, l]))
+            return passages
+
+        # Mode approché : passages droits uniquement, le moins coûteux de chaque segment
+        for (dh, dl), longueur in (((1, 0), modeleur.largeur), ((0, 1), modeleur.hauteur)):
+            k = liste_voisins.index((dh, dl))
+            debuts = np.flatnonzero(np.arange(longueur) % taille % LONGUEUR_SEGMENT == 0)
+            fins = np.append(debuts[1:], longueur)
+
+            for bordure in range(taille, modeleur.hauteur if dh else modeleur.largeur, taille):
+                poids_bordure = plans[k, bordure - 1, :] if dh else plans[k, :, bordure - 1]
+                for debut, fin in zip(debuts, fins):
+                    position = debut + int(np.argmin(poids_bordure[debut:fin]))
+                    h, l = (bordure - 1, position) if dh else (position, bordure - 1)
+                    u = h * modeleur.largeur + l
+                    passages.append((np.array([u]), np.array([u + dh * modeleur.largeur + dl]),
+                                     np.array([poids_bordure[position]])))
+        return passages
+
+    # Construit les noeuds, les arêtes inter-tuiles et les matrices de coûts intra-tuile
+    def construire(self, suivi=None):
+        largeur = self.modeleur.largeur
+        passages = self.lister_passages()
+
+        origines = np.concatenate([u for u, _, _ in passages] + [np.zeros(0, dtype=np.int64)])
+        destinations = np.concatenate([v for _, v, _ in passages] + [np.zeros(0, dtype=np.int64)])
+        poids = np.concatenate([p for _, _, p in passages] + [np.zeros(0, dtype=np.uint8)])
+
+        self.noeuds = np.unique(np.concatenate((origines, destinations)))
+        h, l = np.divmod(self.noeuds, largeur)
+        self.tuile_noeud = (h // self.taille_tuile) * self.nb_tuiles_l + l // self.taille_tuile
+
+        # Arêtes inter-tuiles (graphe non orienté : on les ajoute dans les deux sens)
+        ids_origines = np.searchsorted(self.noeuds, origines)
+        ids_destinations = np.searchsorted(self.noeuds, destinations)
+        self.aretes_inter = {}
+        for i, j, p in zip(ids_origines.tolist(), ids_destinations.tolist(), poids.tolist()):
+            self.aretes_inter.setdefault(i, []).append((j, p))
+            self.aretes_inter.setdefault(j, []).append((i, p))
+
+        # Matrices intra-tuile : une recherche par noeud, limitée à la tuile et arrêtée dès que
+        # les noeuds de la tuile sont fixés (un seul appel compilé par tuile avec scipy)
+        self.rang_noeud = np.zeros(len(self.noeuds), dtype=np.int64)
+        self.noeuds_tuile, self.locaux_tuile, self.couts_tuile = [], [], []
+        backend = BACKENDS_DIJKSTRA[self.modeleur.backend_dijkstra]
+        nb_noeuds_traites = 0
+
+        for tuile in range(self.nb_tuiles_h * self.nb_tuiles_l):
+            ids = np.flatnonzero(self.tuile_noeud == tuile)
+            h0, h1, l0, l1 = self.bornes_tuile(tuile)
+            locaux = (h[ids] - h0) * (l1 - l0) + (l[ids] - l0)
+            self.rang_noeud[ids] = np.arange(len(ids))
+
+            sous_modeleur = self.modeleur.creer_sous_modeleur(h0, h1, l0, l1)
+            couts = np.zeros((0, 0), dtype=np.int64)
+            if len(ids):
+                couts = backend.calculer_couts(sous_modeleur, locaux, locaux, suivi)
+
+            self.noeuds_tuile.append(ids)
+            self.locaux_tuile.append(locaux)
+            self.couts_tuile.append(couts)
+
+            nb_noeuds_traites += len(ids)
+            if suivi is not None:
+                suivi.verifier(nb_noeuds_traites, 0)
+
+    # Tableaux NumPy décrivant le graphe abstrait, pour le partager entre processus (les
+    # listes par tuile sont mises bout à bout, avec leurs débuts)
+    def exporter(self):
+        tailles = np.array([len(ids) for ids in self.noeuds_tuile], dtype=np.int64)
+        aretes = [(i, j, p) for i, voisins in self.aretes_inter.items() for j, p in voisins]
+        return {
+            'noeuds': self.noeuds,
+            'tuile_noeud': self.tuile_noeud,
+            'rang_noeud': self.rang_noeud,
+            'debuts_tuile': np.concatenate(([0], np.cumsum(tailles))),
+            'noeuds_tuile': np.concatenate(self.noeuds_tuile),
+            'locaux_tuile': np.concatenate(self.locaux_tuile),
+            'couts_tuile': np.concatenate([couts.ravel() for couts in self.couts_tuile]),
+            'aretes_inter': np.array(aretes, dtype=np.int64).reshape(-1, 3),
+        }
+
+    # Reprend le graphe abstrait décrit par les tableaux de exporter (vues, sans copie)
+    def importer(self, tableaux):
+        self.noeuds = tableaux['noeuds']
+        self.tuile_noeud = tableaux['tuile_noeud']
+        self.rang_noeud = tableaux['rang_noeud']
+
+        debuts = tableaux['debuts_tuile'].tolist()
+        debut_couts = 0
+        for debut, fin in zip(debuts, debuts[1:]):
+            self.noeuds_tuile.append(tableaux['noeuds_tuile'][debut:fin])
+            self.locaux_tuile.append(tableaux['locaux_tuile'][debut:fin])
+            taille = fin - debut
+            couts = tableaux['couts_tuile'][debut_couts:debut_couts + taille * taille]
+            self.couts_tuile.append(couts.reshape(taille, taille))
+            debut_couts += taille * taille
+
+        for i, j, p in tableaux['aretes_inter'].tolist():
+            self.aretes_inter.setdefault(i, []).append((j, p))
+
+    # Calcule le chemin : insertion du départ et de l'arrivée dans le graphe abstrait,
+    # recherche abstraite, puis raffinement limité aux tuiles traversées. Le suivi
+    # (SuiviCalcul) est transmis aux recherches dans les tuiles et consulté par la recherche
+    # abstraite tous les INTERVALLE_SUIVI noeuds développés
+    def executer(self, noeud_depart, noeud_arrivee, suivi=None):
+        modeleur = self.modeleur
+        largeur = modeleur.largeur
+
+        tuile_depart = self.tuile_pixel(*noeud_depart)
+        tuile_arrivee = self.tuile_pixel(*noeud_arrivee)
+        sous_depart, local_depart = self.localiser(tuile_depart, noeud_depart, suivi=suivi)
+        sous_arrivee, local_arrivee = self.localiser(tuile_arrivee, noeud_arrivee, suivi=suivi)
+
+        # Champs de distances du départ et de l'arrivée dans leurs tuiles respectives
+        champ_depart, pred_depart, _, visites_depart = sous_depart.calculer_champ_delta_stepping(local_depart)
+        champ_arrivee, pred_arrivee, _, visites_arrivee = sous_arrivee.calculer_champ_delta_stepping(local_arrivee)
+        champ_depart = sous_depart.convertir_distances(champ_depart, DISTANCE_INFINIE)
+        champ_arrivee = sous_arrivee.convertir_distances(champ_arrivee, DISTANCE_INFINIE)
+        nb_noeuds_visites = visites_depart + visites_arrivee
+
+        distances = np.full(len(self.noeuds), DISTANCE_INFINIE, dtype=np.int64)
+        predecesseurs = np.full(len(self.noeuds), -1, dtype=np.int64)
+        restes = np.full(len(self.noeuds), DISTANCE_INFINIE, dtype=np.int64)
+
+        ids_depart = self.noeuds_tuile[tuile_depart]
+        distances[ids_depart] = champ_depart[self.locaux_tuile[tuile_depart]]
+        restes[self.noeuds_tuile[tuile_arrivee]] = champ_arrivee[self.locaux_tuile[tuile_arrivee]]
+        file_priorite = [(d, i) for d, i in zip(distances[ids_depart].tolist(), ids_depart.tolist())]
+        heapq.heapify(file_priorite)
+
+        # Même tuile : le chemin direct dans la tuile est un candidat
+        meilleur_cout, meilleur_noeud = DISTANCE_INFINIE, -1
+        if tuile_depart == tuile_arrivee and champ_depart[local_arrivee] != DISTANCE_INFINIE:
+            meilleur_cout = int(champ_depart[local_arrivee])
+
+        while file_priorite:
+            dist_i, i = heapq.heappop(file_priorite)
+            if dist_i > distances[i]:
+                continue
+            if dist_i >= meilleur_cout:
+                break
+
+            nb_noeuds_visites += 1
+            if suivi is not None and nb_noeuds_visites % INTERVALLE_SUIVI == 0:
+                suivi.verifier(nb_noeuds_visites, dist_i)
+            if restes[i] != DISTANCE_INFINIE and dist_i + restes[i] < meilleur_cout:
+                meilleur_cout, meilleur_noeud = int(dist_i + restes[i]), i
+
+            # Arêtes intra-tuile (vectorisées) puis arêtes inter-tuiles
+            tuile = self.tuile_noeud[i]
+            ids = self.noeuds_tuile[tuile]
+            nouvelles_dist = dist_i + self.couts_tuile[tuile][self.rang_noeud[i]]
+            amelioration = nouvelles_dist < distances[ids]
+            voisins = list(zip(ids[amelioration].tolist(), nouvelles_dist[amelioration].tolist()))
+            voisins += [(j, dist_i + p) for j, p in self.aretes_inter.get(i, ())]
+
+            for j, nouvelle_dist in voisins:
+                if nouvelle_dist < distances[j]:
+                    distances[j] = nouvelle_dist
+                    predecesseurs[j] = i
+                    heapq.heappush(file_priorite, (nouvelle_dist, j))
+
+        if meilleur_cout == DISTANCE_INFINIE:
+            return [], 0, nb_noeuds_visites
+
+        if meilleur_noeud < 0:
+            chemin_local = sous_depart.reconstruire_chemin(pred_depart, local_depart, local_arrivee)
+            return self.globaliser(tuile_depart, chemin_local), meilleur_cout, nb_noeuds_visites
+
+        # Suite des noeuds abstraits, du premier (dans la tuile de départ) au dernier
+        sequence = [meilleur_noeud]
+        while predecesseurs[sequence[-1]] >= 0:
+            sequence.append(int(predecesseurs[sequence[-1]]))
+        sequence.reverse()
+
+        # Raffinement : départ -> premier noeud, noeud -> noeud, dernier noeud -> arrivée
+        premier_local = int(self.locaux_tuile[tuile_depart][self.rang_noeud[sequence[0]]])
+        chemin = self.globaliser(tuile_depart, sous_depart.reconstruire_chemin(pred_depart, local_depart, premier_local))
+
+        for i, j in zip(sequence, sequence[1:]):
+            u_j = int(self.noeuds[j])
+            if self.tuile_noeud[i] != self.tuile_noeud[j]:
+                chemin.append(divmod(u_j, largeur))
+                continue
+
+            tuile = int(self.tuile_noeud[i])
+            sous_modeleur, local_i = self.localiser(tuile, divmod(int(self.noeuds[i]), largeur), suivi=suivi)
+            _, local_j = self.localiser(tuile, divmod(u_j, largeur), sous_modeleur)
+            segment, _, visites = sous_modeleur.executer_dijkstra(divmod(local_i, sous_modeleur.largeur), divmod(local_j, sous_modeleur.largeur))
+            nb_noeuds_visites += visites
+            chemin += self.globaliser(tuile, segment)[1:]
+
+        dernier_local = int(self.locaux_tuile[tuile_arrivee][self.rang_noeud[sequence[-1]]])
+        fin = self.globaliser(tuile_arrivee, sous_arrivee.reconstruire_chemin(pred_arrivee, local_arrivee, dernier_local))
+        fin.reverse()
+        chemin += fin[1:]
+
+        return chemin, meilleur_cout, nb_noeuds_visites
+
+    # Renvoie le sous-modeleur d'une tuile (qui reçoit le suivi) et l'indice plat local du
+    # pixel (h, l)
+    def localiser(self, tuile, noeud, sous_modeleur=None, suivi=None):
+        h0, h1, l0, l1 = self.bornes_tuile(tuile)
+        if sous_modeleur is None:
+            sous_modeleur = self.modeleur.creer_sous_modeleur(h0, h1, l0, l1)
+            sous_modeleur.suivi = suivi
+        return sous_modeleur, (noeud[0] - h0) * (l1 - l0) + (noeud[1] - l0)
+
+    # Convertit un chemin en coordonnées de tuile en coordonnées de l'image
+    def globaliser(self, tuile, chemin_local):
+        h0, _, l0, _ = self.bornes_tuile(tuile)
+        return [(h0 + h, l0 + l) for h, l in chemin_local]
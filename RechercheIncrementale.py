@@ -0,0 +1,133 @@
+import heapq
+
+from SuiviCalcul import INTERVALLE_SUIVI
+
+class RechercheIncrementale:
+
+    # Replanification incrémentale D* Lite. Le graphe étant non orienté, la recherche est
+    # enracinée au départ (g(u) = coût estimé départ -> u) et l'arrivée joue le rôle de
+    # l'extrémité mobile : la déplacer ne fait qu'augmenter le décalage km des clés. Après
+    # une modification de pixels, seuls les sommets dont une arête a changé sont remis en
+    # file, et la réparation ne touche que la partie de l'arbre concernée
+    def __init__(self, modeleur, u_racine):
+        self.modeleur = modeleur
+        self.u_racine = u_racine
+        self.u_cible = u_racine
+        self.cle = (modeleur.empreinte_image, modeleur.mode_connexite, modeleur.modele_cout)
+
+        # g, rhs et prédécesseur de rhs (code de direction, comme les autres moteurs). g et rhs
+        # sont stockés sous la forme coût + origine, 0 valant l'infini
+        self.g, self.predecesseurs, self.origine = modeleur.creer_etat_recherche()
+        self.rhs = modeleur.allouer_tableau(modeleur.hauteur * modeleur.largeur, self.g.dtype)
+        self.rhs[u_racine] = self.origine
+
+        liste_voisins = modeleur.obtenir_liste_voisins()
+        self.directions = modeleur.obtenir_directions()
+        self.opposes = [liste_voisins.index((-dh, -dl)) + 1 for dh, dl in liste_voisins]
+        self.km = 0
+        self.file_priorite = []
+        self.ajouter(u_racine)
+
+    # Minorant du coût entre u et la cible (un pas coûte au moins 1)
+    def heuristique(self, u):
+        h, l = divmod(u, self.modeleur.largeur)
+        h_cible, l_cible = divmod(self.u_cible, self.modeleur.largeur)
+        if self.modeleur.mode_connexite == '8':
+            return max(abs(h - h_cible), abs(l - l_cible))
+        return abs(h - h_cible) + abs(l - l_cible)
+
+    def calculer_cle(self, u):
+        m = min(int(self.g[u]), int(self.rhs[u]))
+        return (m + self.heuristique(u) + self.km, m)
+
+    # File paresseuse : les entrées périmées sont ignorées ou réinsérées à l'extraction
+    def ajouter(self, u):
+        heapq.heappush(self.file_priorite, self.calculer_cle(u) + (u,))
+
+    # Recalcule rhs(u) = min(g(v) + c(v, u)) sur les voisins v, puis remet u en file s'il
+    # est incohérent (g != rhs)
+    def mettre_a_jour_sommet(self, u, plans):
+        if u != self.u_racine:
+            # Un voisin non atteint (g = 0) donne une somme positive, jamais retenue
+            meilleur, meilleur_code = 0, 0
+            for (code, decalage), poids in zip(self.directions, plans[:, u].tolist()):
+                if not poids:
+                    continue
+                g_v = int(self.g[u + decalage])
+                if g_v + poids < meilleur:
+                    meilleur, meilleur_code = g_v + poids, self.opposes[code - 1]
+            self.rhs[u] = meilleur
+            self.predecesseurs[u] = meilleur_code
+
+        if self.g[u] != self.rhs[u]:
+            self.ajouter(u)
+
+    # Développe les sommets incohérents jusqu'à ce que la cible soit cohérente et que sa clé
+    # ne dépasse pas celle du sommet en tête de file. Renvoie le nombre de sommets développés.
+    # Le suivi (SuiviCalcul) est consulté avant l'extraction, tous les INTERVALLE_SUIVI
+    # sommets développés : une annulation laisse l'état cohérent et réparable
+    def calculer_plus_court_chemin(self, suivi=None):
+        plans = self.modeleur.obtenir_plans_poids().reshape(len(self.directions), -1)
+        g, rhs = self.g, self.rhs
+        nb_noeuds_visites = 0
+
+        while self.file_priorite:
+            cle_cible = self.calculer_cle(self.u_cible)
+            k1, k2, u = self.file_priorite[0]
+            if (k1, k2) >= cle_cible and g[self.u_cible] == rhs[self.u_cible]:
+                break
+            if suivi is not None and nb_noeuds_visites % INTERVALLE_SUIVI == 0:
+                suivi.verifier(nb_noeuds_visites, k2 - self.origine)
+
+            heapq.heappop(self.file_priorite)
+            if g[u] == rhs[u]:
+                continue
+            cle_u = self.calculer_cle(u)
+            if (k1, k2) < cle_u:
+                heapq.heappush(self.file_priorite, cle_u + (u,))
+                continue
+            if (k1, k2) > cle_u:
+                continue
+
+            nb_noeuds_visites += 1
+            voisins = [u + decalage for (_, decalage), poids in zip(self.directions, plans[:, u].tolist()) if poids]
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = 0
+                self.mettre_a_jour_sommet(u, plans)
+            for v in voisins:
+                self.mettre_a_jour_sommet(v, plans)
+
+        return nb_noeuds_visites
+
+    # Déplace la cible : les clés déjà en file restent des minorants grâce à km
+    def deplacer_cible(self, u_cible):
+        self.km += self.heuristique(u_cible)
+        self.u_cible = u_cible
+
+    # Signale que les pixels de la fenêtre [h0, h1) x [l0, l1) ont changé : les poids des
+    # arêtes touchant la fenêtre élargie d'un pixel sont à jour dans les plans du modeleur
+    def notifier_modification(self, h0, h1, l0, l1):
+        modeleur = self.modeleur
+        plans = modeleur.obtenir_plans_poids().reshape(len(self.directions), -1)
+        self.cle = (modeleur.empreinte_image, modeleur.mode_connexite, modeleur.modele_cout)
+
+        for h in range(max(0, h0 - 1), min(modeleur.hauteur, h1 + 1)):
+            for u in range(h * modeleur.largeur + max(0, l0 - 1), h * modeleur.largeur + min(modeleur.largeur, l1 + 1)):
+                self.mettre_a_jour_sommet(u, plans)
+
+    # Calcule (ou répare) le chemin de la racine vers u_cible
+    def executer(self, u_cible, suivi=None):
+        if u_cible != self.u_cible:
+            self.deplacer_cible(u_cible)
+
+        nb_noeuds_visites = self.calculer_plus_court_chemin(suivi)
+        if self.rhs[u_cible] == 0:
+            return [], 0, nb_noeuds_visites
+        cout_final = int(self.rhs[u_cible]) - self.origine
+
+        chemin = self.modeleur.reconstruire_chemin(self.predecesseurs, self.u_racine, u_cible)
+        if not chemin:
+            return [], 0, nb_noeuds_visites
+        return chemin, cout_final, nb_noeuds_visites
@@ -0,0 +1,164 @@
+import cv2
+import numpy as np
+
+# Demi-largeur par défaut (en pixels du niveau raffiné) du couloir autour du chemin grossier
+LARGEUR_COULOIR = 4
+
+# La pyramide est réduite jusqu'à ce que le plus grand côté passe sous cette taille
+COTE_MIN_PYRAMIDE = 256
+
+# Hauteur (paire) des bandes de lignes réduites d'un coup lors de la construction
+HAUTEUR_BANDE = 512
+
+class RecherchePyramide:
+
+    # Recherche multirésolution : pyramide d'images grises réduites de moitié à chaque niveau.
+    # Le chemin est calculé au niveau le plus grossier, puis raffiné niveau par niveau dans
+    # un couloir dilaté autour du chemin du niveau supérieur. Le résultat est un chemin valide
+    # mais pas forcément optimal ; verifier_optimalite le compare au minorant pleine résolution
+    # et, si l'écart n'est pas nul, le remplace par un A* exact. tableaux (issus de exporter)
+    # reprend des niveaux déjà construits au lieu de les construire
+    def __init__(self, modeleur, largeur_couloir=LARGEUR_COULOIR, verifier_optimalite=False, suivi=None,
+                 tableaux=None):
+        self.modeleur = modeleur
+        self.largeur_couloir = largeur_couloir
+        self.verifier_optimalite = verifier_optimalite
+        self.cle = (modeleur.empreinte_image, modeleur.mode_connexite, modeleur.modele_cout)
+        self.niveaux = [modeleur] # Modeleur de chaque niveau (0 = pleine résolution)
+        self.optimal_certifie = False # Dernière requête : coût égal au minorant pleine résolution
+
+        if tableaux is None:
+            self.construire(suivi)
+        else:
+            self.importer(tableaux)
+
+    # Réduit une image (grise ou couleur) de moitié (moyenne des blocs 2 x 2) par bandes de
+    # lignes : une image tuilée n'est jamais lue en entier
+    @staticmethod
+    def reduire(image):
+        hauteur, largeur = image.shape[:2]
+        bandes = []
+        for h0 in range(0, hauteur, HAUTEUR_BANDE):
+            bande = np.ascontiguousarray(image[h0:min(h0 + HAUTEUR_BANDE, hauteur), 0:largeur])
+            taille = ((bande.shape[1] + 1) // 2, (bande.shape[0] + 1) // 2)
+            bandes.append(cv2.resize(bande, taille, interpolation=cv2.INTER_AREA))
+        return np.concatenate(bandes)
+
+    # Construit les niveaux grossiers successifs (l'image couleur suit, pour le modèle de
+    # coût couleur). Le suivi (SuiviCalcul) est consulté avant chaque niveau
+    def construire(self, suivi=None):
+        modeleur = self.modeleur
+        while max(modeleur.hauteur, modeleur.largeur) > COTE_MIN_PYRAMIDE:
+            if suivi is not None:
+                suivi.verifier(len(self.niveaux), 0)
+            couleur = modeleur.image_couleur
+            modeleur = self.modeleur.creer_modeleur_image(self.reduire(modeleur.image_gris),
+                                                          None if couleur is None else self.reduire(couleur))
+            self.niveaux.append(modeleur)
+
+    # Tableaux NumPy des niveaux grossiers (image grise, image couleur éventuelle et plans de
+    # poids, calculés ici), pour les partager entre processus
+    def exporter(self):
+        tableaux = {}
+        for niveau, modeleur in enumerate(self.niveaux[1:], 1):
+            tableaux[f'gris_{niveau}'] = modeleur.image_gris
+            tableaux[f'plans_{niveau}'] = modeleur.obtenir_plans_poids()
+            if modeleur.image_couleur is not None:
+                tableaux[f'couleur_{niveau}'] = modeleur.image_couleur
+        return tableaux
+
+    # Reprend les niveaux grossiers décrits par les tableaux de exporter (sans copie) : leurs
+    # plans de poids ne sont pas recalculés
+    def importer(self, tableaux):
+        niveau = 1
+        while f'gris_{niveau}' in tableaux:
+            modeleur = self.modeleur.creer_modeleur_image(tableaux[f'gris_{niveau}'], tableaux.get(f'couleur_{niveau}'))
+            modeleur.plans_poids[(modeleur.mode_connexite, modeleur.modele_cout)] = tableaux[f'plans_{niveau}']
+            self.niveaux.append(modeleur)
+            niveau += 1
+
+    # Calcule le chemin au niveau le plus grossier puis le raffine jusqu'à la pleine résolution.
+    # Le suivi (SuiviCalcul) est confié aux modeleurs de chaque niveau le temps de leur A*
+    def executer(self, noeud_depart, noeud_arrivee, suivi=None):
+        dernier = len(self.niveaux) - 1
+        grossier = self.niveaux[dernier]
+        suivi_precedent, grossier.suivi = grossier.suivi, suivi
+        try:
+            chemin, cout, nb_noeuds_visites = grossier.executer_a_etoile(
+                (noeud_depart[0] >> dernier, noeud_depart[1] >> dernier),
+                (noeud_arrivee[0] >> dernier, noeud_arrivee[1] >> dernier))
+        finally:
+            grossier.suivi = suivi_precedent
+
+        for niveau in range(dernier - 1, -1, -1):
+            if not chemin:
+                return [], 0, nb_noeuds_visites
+            depart = (noeud_depart[0] >> niveau, noeud_depart[1] >> niveau)
+            arrivee = (noeud_arrivee[0] >> niveau, noeud_arrivee[1] >> niveau)
+            chemin, cout, visites = self.raffiner(self.niveaux[niveau], chemin, depart, arrivee, suivi)
+            nb_noeuds_visites += visites
+
+        if not chemin:
+            return [], 0, nb_noeuds_visites
+
+        # Minorant pleine résolution (grille, ou repères ALT s'ils sont à jour)
+        modeleur = self.modeleur
+        u_depart = noeud_depart[0] * modeleur.largeur + noeud_depart[1]
+        u_arrivee = noeud_arrivee[0] * modeleur.largeur + noeud_arrivee[1]
+        self.optimal_certifie = cout <= modeleur.creer_heuristique(u_arrivee)(u_depart)
+
+        if self.verifier_optimalite and not self.optimal_certifie:
+            chemin_exact, cout_exact, visites = modeleur.executer_a_etoile(noeud_depart, noeud_arrivee)
+            nb_noeuds_visites += visites
+            self.optimal_certifie = True
+            if chemin_exact and cout_exact < cout:
+                chemin, cout = chemin_exact, cout_exact
+
+        return chemin, cout, nb_noeuds_visites
+
+    # Raffine un chemin du niveau supérieur dans un couloir du niveau du modeleur donné, dont
+    # les plans de poids sont découpés à la fenêtre du couloir. Si le couloir ne relie pas le
+    # départ à l'arrivée, il est élargi jusqu'à couvrir l'image
+    def raffiner(self, modeleur, chemin_grossier, depart, arrivee, suivi=None):
+        # Blocs 2 x 2 couverts par le chemin grossier, bornés à l'image du niveau
+        points = np.asarray(chemin_grossier, dtype=np.int64) * 2
+        blocs = np.concatenate([points + decalage for decalage in ((0, 0), (0, 1), (1, 0), (1, 1))])
+        blocs = np.minimum(blocs, (modeleur.hauteur - 1, modeleur.largeur - 1))
+        nb_noeuds_visites = 0
+        rayon = self.largeur_couloir
+
+        while True:
+            h0, l0 = np.maximum(blocs.min(axis=0) - rayon, 0).tolist()
+            h1, l1 = np.minimum(blocs.max(axis=0) + rayon + 1, (modeleur.hauteur, modeleur.largeur)).tolist()
+
+            masque = np.zeros((h1 - h0, l1 - l0), dtype=np.uint8)
+            masque[blocs[:, 0] - h0, blocs[:, 1] - l0] = 1
+            if rayon > 0:
+                masque = cv2.dilate(masque, np.ones((2 * rayon + 1, 2 * rayon + 1), dtype=np.uint8))
+
+            # Les poids sont pris dans les plans du niveau : un modèle à filtre (gradient) donne
+            # ainsi les mêmes poids qu'en pleine image, sans effet de bord à la découpe
+            sous_modeleur = modeleur.creer_sous_modeleur(h0, h1, l0, l1)
+            sous_modeleur.suivi = suivi
+            self.restreindre(sous_modeleur, masque.astype(bool))
+            chemin, cout, visites = sous_modeleur.executer_a_etoile(
+                (depart[0] - h0, depart[1] - l0), (arrivee[0] - h0, arrivee[1] - l0))
+            nb_noeuds_visites += visites
+
+            if chemin:
+                return [(h0 + h, l0 + l) for h, l in chemin], cout, nb_noeuds_visites
+            if (h0, l0, h1, l1) == (0, 0, modeleur.hauteur, modeleur.largeur) and masque.all():
+                return [], 0, nb_noeuds_visites
+            rayon = 2 * rayon + 1
+
+    # Supprime des plans de poids du modeleur toutes les arêtes dont une extrémité sort du masque
+    @staticmethod
+    def restreindre(modeleur, masque):
+        plans = modeleur.obtenir_plans_poids()
+        for k, (dh, dl) in enumerate(modeleur.obtenir_liste_voisins()):
+            dedans = np.zeros_like(masque)
+            h0, h1 = max(0, -dh), modeleur.hauteur - max(0, dh)
+            l0, l1 = max(0, -dl), modeleur.largeur - max(0, dl)
+            if h0 < h1 and l0 < l1:
+                dedans[h0:h1, l0:l1] = masque[h0:h1, l0:l1] & masque[h0 + dh:h1 + dh, l0 + dl:l1 + dl]
+            plans[k][~dedans] = 0
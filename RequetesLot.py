@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+import numpy as np
+
+from RechercheHierarchique import RechercheHierarchique
+from RecherchePyramide import RecherchePyramide
+
+# Nombre de requêtes envoyées d'un coup à un processus (amortit les échanges inter-processus)
+TAILLE_PAQUET = 16
+
+# Modeleur propre à chaque processus du pool, construit une seule fois par l'initialiseur
+modeleur_travailleur = None
+segments_travailleur = []
+
+# Prétraitements partagés : attribut du modeleur -> classe reconstruite à partir des tableaux
+PRETRAITEMENTS_PARTAGES = {
+    'hierarchie': RechercheHierarchique,
+    'pyramide': RecherchePyramide,
+}
+
+# Copie un tableau dans un segment de mémoire partagée ; renvoie le segment et sa description
+def partager_tableau(tableau):
+    tableau = np.ascontiguousarray(tableau)
+    segment = shared_memory.SharedMemory(create=True, size=max(1, tableau.nbytes))
+    np.ndarray(tableau.shape, dtype=tableau.dtype, buffer=segment.buf)[...] = tableau
+    return segment, (segment.name, tableau.shape, tableau.dtype.str)
+
+# Projette un segment partagé existant en tableau NumPy, sans copie. Le processus qui s'y
+# rattache ne doit pas le supprimer à sa sortie : seul le créateur le libère
+def rattacher_tableau(description):
+    nom, forme, type_valeurs = description
+    try:
+        segment = shared_memory.SharedMemory(name=nom, track=False)
+    except TypeError: # Python < 3.13 : pas d'option track
+        segment = shared_memory.SharedMemory(name=nom)
+    return segment, np.ndarray(forme, dtype=np.dtype(type_valeurs), buffer=segment.buf)
+
+# Initialiseur du pool : reconstruit un modeleur dont les images, les plans de poids, les
+# champs des repères et les prétraitements (arguments du constructeur dans parametres, par
+# attribut) pointent sur la mémoire partagée (rien n'est sérialisé par requête)
+def initialiser_travailleur(classe_modeleur, configuration, descriptions, parametres):
+    global modeleur_travailleur, segments_travailleur
+
+    tableaux = {}
+    for nom, description in descriptions.items():
+        segment, tableaux[nom] = rattacher_tableau(description)
+        segments_travailleur.append(segment)
+
+    modeleur = classe_modeleur()
+    for attribut, valeur in configuration.items():
+        setattr(modeleur, attribut, valeur)
+    modeleur.image_gris = tableaux['image_gris']
+    modeleur.image_couleur = tableaux.get('image_couleur')
+    modeleur.hauteur, modeleur.largeur = modeleur.image_gris.shape
+    modeleur.calculateurs_cout = {modeleur.modele_cout: modeleur.calculateur_cout}
+    modeleur.plans_poids = {(modeleur.mode_connexite, modeleur.modele_cout): tableaux['plans']}
+    if 'distances_reperes' in tableaux:
+        modeleur.distances_reperes = tableaux['distances_reperes']
+    modeleur.est_chargee = True
+
+    for attribut, arguments in parametres.items():
+        prefixe = f'{attribut}.'
+        tableaux_pretraitement = {nom[len(prefixe):]: tableau for nom, tableau in tableaux.items()
+                                  if nom.startswith(prefixe)}
+        setattr(modeleur, attribut, PRETRAITEMENTS_PARTAGES[attribut](modeleur, *arguments,
+                                                                       tableaux=tableaux_pretraitement))
+    modeleur_travailleur = modeleur
+
+# Traite une requête (départ, arrivée) dans un processus du pool
+def traiter_requete(requete):
+    noeud_depart, noeud_arrivee = requete
+    return modeleur_travailleur.calculer_chemin(tuple(noeud_depart), tuple(noeud_arrivee))
+
+# Répartit les requêtes sur un pool de processus et renvoie les résultats (chemin, coût,
+# visites) au fur et à mesure, dans l'ordre de soumission. L'image grise, les plans de poids,
+# les champs des repères valides et la hiérarchie par tuiles ou la pyramide du moteur courant
+# (si elles sont à jour) sont placés une fois pour toutes en mémoire partagée
+def repartir_requetes(modeleur, requetes, nb_processus=None, taille_paquet=TAILLE_PAQUET):
+    plans = modeleur.obtenir_plans_poids()
+    tableaux = {
+        'image_gris': modeleur.image_gris[0:modeleur.hauteur, 0:modeleur.largeur],
+        'plans': plans,
+    }
+    configuration = {
+        'chemin_fichier_original': modeleur.chemin_fichier_original,
+        'mode_connexite': modeleur.mode_connexite,
+        'moteur_recherche': modeleur.moteur_recherche,
+        'type_file_priorite': modeleur.type_file_priorite,
+        'calculateur_cout': modeleur.calculateur_cout,
+        'modele_cout': modeleur.modele_cout,
+        'empreinte_image': modeleur.empreinte_image,
+        'dossier_memmap': modeleur.dossier_memmap,
+    }
+    if modeleur.image_couleur is not None:
+        tableaux['image_couleur'] = modeleur.image_couleur
+    if modeleur.reperes_valides():
+        tableaux['distances_reperes'] = modeleur.distances_reperes
+        configuration['reperes'] = modeleur.reperes
+        configuration['cle_reperes'] = modeleur.cle_reperes
+
+    parametres = {}
+    if modeleur.moteur_recherche == 'hierarchique' and modeleur.hierarchie_valide():
+        parametres['hierarchie'] = (modeleur.hierarchie.taille_tuile, modeleur.hierarchie.exact)
+    if modeleur.moteur_recherche == 'pyramide' and modeleur.pyramide_valide():
+        parametres['pyramide'] = (modeleur.pyramide.largeur_couloir, modeleur.pyramide.verifier_optimalite)
+    for attribut in parametres:
+        for nom, tableau in getattr(modeleur, attribut).exporter().items():
+            tableaux[f'{attribut}.{nom}'] = tableau
+
+    segments, descriptions = [], {}
+    try:
+        for nom, tableau in tableaux.items():
+            segment, descriptions[nom] = partager_tableau(tableau)
+            segments.append(segment)
+
+        with multiprocessing.Pool(nb_processus or os.cpu_count(), initialiser_travailleur,
+                                  (type(modeleur), configuration, descriptions, parametres)) as pool:
+            yield from pool.imap(traiter_requete, requetes, taille_paquet)
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
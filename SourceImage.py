@@ -0,0 +1,95 @@
+import hashlib
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+# Côté (en pixels) des tuiles lues dans le raster
+TAILLE_TUILE_SOURCE = 512
+
+# Nombre de tuiles gardées en mémoire par le cache LRU (64 tuiles de 512² = 16 Mo)
+NB_TUILES_CACHE = 64
+
+# Extensions reconnues comme rasters bruts projetés en mémoire
+EXTENSIONS_RASTER = ('.npy', '.raw')
+
+class SourceTuilee:
+
+    # Image en niveaux de gris lue à la demande, par tuiles, dans un raster projeté en
+    # mémoire (np.memmap). Le raster est de forme (hauteur, largeur) en niveaux de gris ou
+    # (hauteur, largeur, 3) en BGR ; seules les tuiles converties en gris sont mises en cache
+    def __init__(self, raster, taille_tuile=TAILLE_TUILE_SOURCE, nb_tuiles_cache=NB_TUILES_CACHE):
+        if raster.ndim not in (2, 3) or raster.dtype != np.uint8:
+            raise ValueError("Le raster doit être un tableau uint8 (h, l) ou (h, l, 3).")
+
+        self.raster = raster
+        self.taille_tuile = taille_tuile
+        self.nb_tuiles_cache = nb_tuiles_cache
+        self.shape = raster.shape[:2]
+        self.hauteur, self.largeur = self.shape
+        self.tuiles = OrderedDict() # (i, j) -> tuile grise
+
+    # Ouvre un raster .npy (forme lue dans l'en-tête) ou .raw (gris 8 bits, dimensions requises)
+    @classmethod
+    def ouvrir(cls, chemin, hauteur=None, largeur=None, **options):
+        if chemin.lower().endswith('.npy'):
+            raster = np.load(chemin, mmap_mode='r')
+        elif hauteur is None or largeur is None:
+            raise ValueError("Les dimensions d'un raster brut doivent être fournies.")
+        else:
+            raster = np.memmap(chemin, dtype=np.uint8, mode='r', shape=(hauteur, largeur))
+        return cls(raster, **options)
+
+    # Convertit un bloc du raster en niveaux de gris (copie contiguë en mémoire)
+    def convertir_gris(self, bloc):
+        if bloc.ndim == 3:
+            return cv2.cvtColor(np.ascontiguousarray(bloc), cv2.COLOR_BGR2GRAY)
+        return np.array(bloc)
+
+    # Renvoie la tuile (i, j) en niveaux de gris, lue dans le raster si elle n'est pas en cache
+    def obtenir_tuile(self, i, j):
+        tuile = self.tuiles.get((i, j))
+        if tuile is not None:
+            self.tuiles.move_to_end((i, j))
+            return tuile
+
+        h0, l0 = i * self.taille_tuile, j * self.taille_tuile
+        tuile = self.convertir_gris(self.raster[h0:h0 + self.taille_tuile, l0:l0 + self.taille_tuile])
+        self.tuiles[(i, j)] = tuile
+        while len(self.tuiles) > self.nb_tuiles_cache:
+            self.tuiles.popitem(last=False)
+        return tuile
+
+    # Assemble la fenêtre [h0, h1) x [l0, l1) à partir des tuiles qui la recouvrent
+    def lire_fenetre(self, h0, h1, l0, l1):
+        fenetre = np.empty((max(0, h1 - h0), max(0, l1 - l0)), dtype=np.uint8)
+        if fenetre.size == 0:
+            return fenetre
+
+        taille = self.taille_tuile
+        for i in range(h0 // taille, (h1 - 1) // taille + 1):
+            for j in range(l0 // taille, (l1 - 1) // taille + 1):
+                tuile = self.obtenir_tuile(i, j)
+                a0, a1 = max(h0, i * taille), min(h1, (i + 1) * taille)
+                b0, b1 = max(l0, j * taille), min(l1, (j + 1) * taille)
+                fenetre[a0 - h0:a1 - h0, b0 - l0:b1 - l0] = \
+                    tuile[a0 - i * taille:a1 - i * taille, b0 - j * taille:b1 - j * taille]
+        return fenetre
+
+    # Accès par tranches source[h0:h1, l0:l1] (pas de 1), comme pour un tableau NumPy
+    def __getitem__(self, cles):
+        tranche_h, tranche_l = cles if isinstance(cles, tuple) else (cles, slice(None))
+        if not isinstance(tranche_h, slice) or not isinstance(tranche_l, slice) or \
+                tranche_h.step not in (None, 1) or tranche_l.step not in (None, 1):
+            raise IndexError("Seules les tranches contiguës sont prises en charge.")
+
+        h0, h1, _ = tranche_h.indices(self.hauteur)
+        l0, l1, _ = tranche_l.indices(self.largeur)
+        return self.lire_fenetre(h0, h1, l0, l1)
+
+    # Empreinte du contenu gris, calculée par bandes de lignes sans passer par le cache :
+    # identique à celle de l'image entière en mémoire
+    def calculer_empreinte(self):
+        empreinte = hashlib.blake2b(digest_size=16)
+        for h0 in range(0, self.hauteur, self.taille_tuile):
+            empreinte.update(self.convertir_gris(self.raster[h0:h0 + self.taille_tuile]))
+        return empreinte.hexdigest()
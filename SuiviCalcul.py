@@ -0,0 +1,41 @@
+import time
+
+# Nombre de pixels développés entre deux consultations du suivi par les moteurs
+INTERVALLE_SUIVI = 4096
+
+# Délai minimal (en secondes) entre deux comptes rendus de progression
+DELAI_PROGRESSION = 0.1
+
+class CalculAnnule(Exception):
+
+    # Levée par un moteur dont le suivi a été annulé ; les arbres de plus courts chemins
+    # restent cohérents et peuvent être repris par une requête ultérieure
+    pass
+
+class SuiviCalcul:
+
+    # Jeton d'annulation coopérative et compte rendu de progression d'un calcul. Les moteurs
+    # appellent verifier tous les INTERVALLE_SUIVI pixels développés ; annuler peut être
+    # appelé depuis un autre fil d'exécution. Le rappel reçoit (pixels fixés, distance de
+    # la frontière) au plus une fois par DELAI_PROGRESSION secondes
+    def __init__(self, rappel=None, delai=DELAI_PROGRESSION):
+        self.rappel = rappel
+        self.delai = delai
+        self.annule = False
+        self.dernier_compte_rendu = 0.0
+
+    # Demande l'arrêt du calcul au prochain point de contrôle
+    def annuler(self):
+        self.annule = True
+
+    # Point de contrôle : lève CalculAnnule si l'arrêt a été demandé, sinon transmet la
+    # progression si le délai depuis le dernier compte rendu est écoulé
+    def verifier(self, nb_noeuds_visites, distance):
+        if self.annule:
+            raise CalculAnnule()
+
+        if self.rappel is not None:
+            maintenant = time.perf_counter()
+            if maintenant - self.dernier_compte_rendu >= self.delai:
+                self.dernier_compte_rendu = maintenant
+                self.rappel(nb_noeuds_visites, int(distance))
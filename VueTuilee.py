@@ -0,0 +1,254 @@
+import math
+import time
+from collections import OrderedDict
+import cv2
+import numpy as np
+from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsPathItem, QGraphicsItem
+from PyQt6.QtGui import QPixmap, QPainterPath, QPen, QBrush, QColor, QTransform
+from PyQt6.QtCore import Qt, QRectF, QTimer, pyqtSignal
+
+from AffichageImage import envelopper_image
+
+# Côté (en pixels affichés) des tuiles de la pyramide d'affichage
+TAILLE_TUILE_AFFICHAGE = 256
+
+# Nombre de tuiles converties en QPixmap gardées en cache (512 tuiles de 256² ≈ 128 Mo)
+NB_TUILES_AFFICHAGE = 512
+
+# Temps (en secondes) consacré au décodage de nouvelles tuiles par rafraîchissement ; les
+# tuiles restantes sont remplacées par un niveau plus grossier puis décodées au suivant
+BUDGET_RENDU = 0.03
+
+# Bornes du facteur de zoom de la vue tuilée et pas d'un cran de molette (Ctrl + molette)
+ZOOM_MIN, ZOOM_MAX = 1 / 1024, 16.0
+PAS_ZOOM_MOLETTE = 1.25
+
+class PyramideAffichage:
+
+    # Pyramide d'affichage construite paresseusement : la tuile (i, j) du niveau k couvre
+    # TAILLE_TUILE_AFFICHAGE << k pixels de côté de l'image, réduits d'un facteur 2^k. Elle
+    # est lue dans la source avec un pas de 2^(k - 1) puis réduite de moitié par moyenne, si
+    # bien que son coût ne dépend pas du niveau. Les tuiles converties en QPixmap sont gardées
+    # dans un cache LRU. La source est un tableau (h, l) ou (h, l, 3) BGR, éventuellement
+    # projeté en mémoire
+    def __init__(self, source, taille_tuile=TAILLE_TUILE_AFFICHAGE, nb_tuiles_cache=NB_TUILES_AFFICHAGE):
+        self.source = source
+        self.hauteur, self.largeur = source.shape[:2]
+        self.taille_tuile = taille_tuile
+        self.nb_tuiles_cache = nb_tuiles_cache
+        self.niveau_max = max(0, math.ceil(math.log2(max(self.hauteur, self.largeur) / taille_tuile)))
+        self.tuiles = OrderedDict() # (niveau, i, j) -> QPixmap
+
+    # Pixels de la tuile (i, j) du niveau donné
+    def lire_tuile(self, niveau, i, j):
+        cote = self.taille_tuile << niveau
+        h0, l0 = i * cote, j * cote
+        h1, l1 = min(h0 + cote, self.hauteur), min(l0 + cote, self.largeur)
+        if niveau == 0:
+            return np.ascontiguousarray(self.source[h0:h1, l0:l1])
+
+        pas = 1 << (niveau - 1)
+        bloc = np.ascontiguousarray(self.source[h0:h1:pas, l0:l1:pas])
+        taille = (-(-(l1 - l0) >> niveau), -(-(h1 - h0) >> niveau))
+        return cv2.resize(bloc, taille, interpolation=cv2.INTER_AREA)
+
+    # QPixmap de la tuile : celle du cache, sinon décodée si construire est vrai (None sinon)
+    def obtenir_tuile(self, niveau, i, j, construire=True):
+        cle = (niveau, i, j)
+        pixmap = self.tuiles.get(cle)
+        if pixmap is not None:
+            self.tuiles.move_to_end(cle)
+            return pixmap
+        if not construire:
+            return None
+
+        q_image, _ = envelopper_image(self.lire_tuile(niveau, i, j))
+        pixmap = QPixmap.fromImage(q_image)
+        self.tuiles[cle] = pixmap
+        while len(self.tuiles) > self.nb_tuiles_cache:
+            self.tuiles.popitem(last=False)
+        return pixmap
+
+class VueTuilee(QGraphicsView):
+    signal_clic = pyqtSignal(int, int)
+    signal_survol = pyqtSignal(int, int)
+    signal_zoom = pyqtSignal(float)
+
+    # Vue des très grandes images : seules les tuiles visibles au niveau de détail du zoom
+    # courant sont décodées et envoyées à l'affichage. Marqueurs et chemins sont des éléments
+    # vectoriels de la scène, en coordonnées image (l, h) ; les signaux donnent (h, l)
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setScene(QGraphicsScene(self))
+        self.setMouseTracking(True)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.pyramide = None
+        self.elements = [] # Marqueurs et chemins dessinés
+
+        self.apercu = QGraphicsPathItem()
+        self.apercu.setPen(self.creer_stylo((0, 255, 255)))
+        self.apercu.setZValue(2)
+        self.apercu.hide()
+        self.scene().addItem(self.apercu)
+
+        # Redessine la vue quand des tuiles n'ont pas pu être décodées dans le budget
+        self.minuterie_tuiles = QTimer(self)
+        self.minuterie_tuiles.setSingleShot(True)
+        self.minuterie_tuiles.timeout.connect(self.viewport().update)
+
+    # Affiche une nouvelle image (None pour vider la vue), ajustée à la taille de la vue
+    def definir_source(self, source):
+        self.effacer_dessins()
+        self.pyramide = None if source is None else PyramideAffichage(source)
+        if self.pyramide is None:
+            self.scene().setSceneRect(QRectF())
+            return
+
+        self.scene().setSceneRect(0, 0, self.pyramide.largeur, self.pyramide.hauteur)
+        QTimer.singleShot(0, self.ajuster_a_la_vue) # Taille de la vue connue une fois affichée
+
+    def ajuster_a_la_vue(self):
+        if self.pyramide is None: return
+        facteur = min(self.viewport().width() / self.pyramide.largeur,
+                      self.viewport().height() / self.pyramide.hauteur, 1.0)
+        self.definir_zoom(facteur)
+
+    def facteur_zoom(self):
+        return self.transform().m11()
+
+    def definir_zoom(self, facteur):
+        facteur = min(max(facteur, ZOOM_MIN), ZOOM_MAX)
+        self.setTransform(QTransform.fromScale(facteur, facteur))
+        self.signal_zoom.emit(facteur)
+
+    # Ctrl + molette : zoom autour du pointeur ; la molette seule fait défiler
+    def wheelEvent(self, evenement):
+        if evenement.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.definir_zoom(self.facteur_zoom() * PAS_ZOOM_MOLETTE ** (evenement.angleDelta().y() / 120))
+            evenement.accept()
+        else:
+            super().wheelEvent(evenement)
+
+    # Pixel (h, l) de l'image sous la position donnée de la vue, ou None hors de l'image
+    def pixel_sous(self, position):
+        if self.pyramide is None:
+            return None
+        point = self.mapToScene(position.toPoint())
+        h, l = math.floor(point.y()), math.floor(point.x())
+        if 0 <= h < self.pyramide.hauteur and 0 <= l < self.pyramide.largeur:
+            return h, l
+        return None
+
+    def mousePressEvent(self, evenement):
+        pixel = self.pixel_sous(evenement.position())
+        if evenement.button() == Qt.MouseButton.LeftButton and pixel is not None:
+            self.signal_clic.emit(*pixel)
+        super().mousePressEvent(evenement)
+
+    def mouseMoveEvent(self, evenement):
+        pixel = self.pixel_sous(evenement.position())
+        if pixel is not None:
+            self.signal_survol.emit(*pixel)
+        super().mouseMoveEvent(evenement)
+
+    # Dessine les tuiles visibles du niveau de détail adapté au zoom (un pixel de tuile pour
+    # au moins un pixel d'écran)
+    def drawBackground(self, peintre, rectangle):
+        super().drawBackground(peintre, rectangle)
+        pyramide = self.pyramide
+        if pyramide is None: return
+
+        niveau = min(pyramide.niveau_max, max(0, math.floor(math.log2(1 / self.facteur_zoom()))))
+        cote = pyramide.taille_tuile << niveau
+        i0, j0 = max(0, int(rectangle.top()) // cote), max(0, int(rectangle.left()) // cote)
+        i1 = min((pyramide.hauteur - 1) // cote, int(rectangle.bottom()) // cote)
+        j1 = min((pyramide.largeur - 1) // cote, int(rectangle.right()) // cote)
+
+        echeance = time.perf_counter() + BUDGET_RENDU
+        incomplet = False
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cible = QRectF(j * cote, i * cote, min(cote, pyramide.largeur - j * cote),
+                               min(cote, pyramide.hauteur - i * cote))
+                pixmap = pyramide.obtenir_tuile(niveau, i, j, time.perf_counter() < echeance)
+                if pixmap is not None:
+                    peintre.drawPixmap(cible, pixmap, QRectF(pixmap.rect()))
+                else:
+                    incomplet = True
+                    self.dessiner_ancetre(peintre, niveau, i, j, cible)
+
+        if incomplet:
+            self.minuterie_tuiles.start(0)
+
+    # Remplace une tuile pas encore décodée par la partie correspondante de la première tuile
+    # plus grossière présente dans le cache
+    def dessiner_ancetre(self, peintre, niveau, i, j, cible):
+        pyramide = self.pyramide
+        for ancetre in range(niveau + 1, pyramide.niveau_max + 1):
+            ecart = ancetre - niveau
+            pixmap = pyramide.obtenir_tuile(ancetre, i >> ecart, j >> ecart, construire=False)
+            if pixmap is None:
+                continue
+
+            cote, echelle = pyramide.taille_tuile << ancetre, 1 << ancetre
+            source = QRectF((cible.x() - (j >> ecart) * cote) / echelle, (cible.y() - (i >> ecart) * cote) / echelle,
+                            cible.width() / echelle, cible.height() / echelle)
+            peintre.drawPixmap(cible, pixmap, source)
+            return
+
+    # Stylo d'épaisseur constante à l'écran pour une couleur BGR
+    @staticmethod
+    def creer_stylo(couleur, epaisseur=2):
+        stylo = QPen(QColor(couleur[2], couleur[1], couleur[0]))
+        stylo.setWidth(epaisseur)
+        stylo.setCosmetic(True)
+        return stylo
+
+    # Tracé passant par le centre des pixels du chemin ; seuls les changements de direction
+    # sont gardés comme sommets
+    @staticmethod
+    def creer_trace(chemin):
+        points = np.asarray(chemin, dtype=np.int64).reshape(-1, 2)
+        if len(points) > 2:
+            pas = np.diff(points, axis=0)
+            virages = np.any(pas[1:] != pas[:-1], axis=1)
+            points = points[np.concatenate(([True], virages, [True]))]
+
+        trace = QPainterPath()
+        trace.moveTo(points[0, 1] + 0.5, points[0, 0] + 0.5)
+        for h, l in points[1:].tolist():
+            trace.lineTo(l + 0.5, h + 0.5)
+        return trace
+
+    # Disque de rayon constant à l'écran centré sur le pixel (h, l)
+    def ajouter_marqueur(self, noeud, rayon, couleur):
+        marqueur = QGraphicsEllipseItem(-rayon, -rayon, 2 * rayon, 2 * rayon)
+        marqueur.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIgnoresTransformations)
+        marqueur.setPos(noeud[1] + 0.5, noeud[0] + 0.5)
+        marqueur.setBrush(QBrush(QColor(couleur[2], couleur[1], couleur[0])))
+        marqueur.setPen(QPen(Qt.PenStyle.NoPen))
+        marqueur.setZValue(3)
+        self.scene().addItem(marqueur)
+        self.elements.append(marqueur)
+
+    def ajouter_chemin(self, chemin, couleur, epaisseur=2):
+        if not chemin: return
+        trace = QGraphicsPathItem(self.creer_trace(chemin))
+        trace.setPen(self.creer_stylo(couleur, epaisseur))
+        trace.setZValue(1)
+        self.scene().addItem(trace)
+        self.elements.append(trace)
+
+    # Chemin d'aperçu (un seul à la fois) ; un chemin vide le masque
+    def definir_apercu(self, chemin):
+        if not chemin:
+            self.apercu.hide()
+            return
+        self.apercu.setPath(self.creer_trace(chemin))
+        self.apercu.show()
+
+    def effacer_dessins(self):
+        for element in self.elements:
+            self.scene().removeItem(element)
+        self.elements = []
+        self.apercu.hide()
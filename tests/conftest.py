@@ -0,0 +1,41 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+# Les modules du projet sont à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ModeleurGraphe import ModeleurGraphe
+
+# Fabrique de modeleurs chargés sur une image couleur aléatoire (graine fixe) enregistrée
+# dans le dossier temporaire du test
+@pytest.fixture
+def creer_modeleur(tmp_path):
+    def creer(hauteur=40, largeur=50, graine=0, lissage=0):
+        generateur = np.random.default_rng(graine)
+        image = generateur.integers(0, 256, size=(hauteur, largeur, 3), dtype=np.uint8)
+        if lissage:
+            image = cv2.GaussianBlur(image, (0, 0), lissage)
+
+        chemin = str(tmp_path / f"image_{hauteur}x{largeur}_{graine}.png")
+        cv2.imwrite(chemin, image)
+        modeleur = ModeleurGraphe()
+        reussi, message = modeleur.charger_image(chemin)
+        assert reussi, message
+        return modeleur
+
+    return creer
+
+# Coût d'un chemin [(h, l), ...] recalculé à partir des plans de poids du modeleur
+def cout_chemin(modeleur, chemin):
+    plans = modeleur.obtenir_plans_poids()
+    codes = {decalage: k for k, decalage in enumerate(modeleur.obtenir_liste_voisins())}
+    cout = 0
+    for (h, l), (h_suivant, l_suivant) in zip(chemin, chemin[1:]):
+        poids = int(plans[codes[(h_suivant - h, l_suivant - l)], h, l])
+        assert poids, "Arête absente du graphe"
+        cout += poids
+    return cout
@@ -0,0 +1,74 @@
+import pytest
+
+import HierarchieContraction
+import ModeleurGraphe
+import RechercheAnytime
+import RechercheHierarchique
+import RechercheIncrementale
+from ModeleurGraphe import MOTEURS_RECHERCHE
+from SuiviCalcul import CalculAnnule, SuiviCalcul
+
+DEPART, ARRIVEE = (0, 0), (35, 45)
+
+# Les moteurs consultent le suivi à chaque point de contrôle, même sur une petite image
+@pytest.fixture(autouse=True)
+def intervalle_unitaire(monkeypatch):
+    for module in (ModeleurGraphe, HierarchieContraction, RechercheHierarchique,
+                   RechercheIncrementale, RechercheAnytime):
+        monkeypatch.setattr(module, 'INTERVALLE_SUIVI', 1)
+
+def suivi_annule():
+    suivi = SuiviCalcul()
+    suivi.annuler()
+    return suivi
+
+@pytest.mark.parametrize("moteur", list(MOTEURS_RECHERCHE))
+def test_requete_annulee(creer_modeleur, moteur):
+    modeleur = creer_modeleur()
+    modeleur.definir_moteur_recherche(moteur)
+    # Les prétraitements sont faits d'abord, sans suivi : seule la requête est annulée
+    if moteur in ('hierarchique', 'contraction', 'pyramide'):
+        modeleur.calculer_chemin(DEPART, ARRIVEE)
+
+    with pytest.raises(CalculAnnule):
+        modeleur.calculer_chemin(DEPART, ARRIVEE, suivi_annule())
+    assert modeleur.suivi is None
+
+@pytest.mark.parametrize("moteur", ['hierarchique', 'contraction', 'pyramide'])
+def test_pretraitement_annule(creer_modeleur, moteur):
+    modeleur = creer_modeleur(300, 20)
+    modeleur.definir_moteur_recherche(moteur)
+
+    with pytest.raises(CalculAnnule):
+        modeleur.calculer_chemin(DEPART, (299, 19), suivi_annule())
+
+def test_construction_contraction_annulee(creer_modeleur):
+    modeleur = creer_modeleur()
+    with pytest.raises(CalculAnnule):
+        modeleur.construire_contraction(sauvegarder=False, suivi=suivi_annule())
+    assert modeleur.contraction is None
+
+def test_construction_pyramide_annulee(creer_modeleur):
+    modeleur = creer_modeleur(300, 20)
+    with pytest.raises(CalculAnnule):
+        modeleur.construire_pyramide(suivi=suivi_annule())
+    assert modeleur.pyramide is None
+
+def test_incremental_reprend_apres_annulation(creer_modeleur):
+    modeleur = creer_modeleur()
+    modeleur.definir_moteur_recherche('incremental')
+    with pytest.raises(CalculAnnule):
+        modeleur.calculer_chemin(DEPART, ARRIVEE, suivi_annule())
+
+    _, cout, _ = modeleur.calculer_chemin(DEPART, ARRIVEE)
+    assert cout == modeleur.executer_dijkstra(DEPART, ARRIVEE)[1]
+
+def test_reperes_annules(creer_modeleur):
+    modeleur = creer_modeleur()
+    modeleur.pretraiter_reperes(nb_reperes=2)
+    reperes = modeleur.reperes
+
+    with pytest.raises(CalculAnnule):
+        modeleur.pretraiter_reperes(nb_reperes=4, suivi=suivi_annule())
+    assert modeleur.reperes == reperes and modeleur.suivi is None
+    assert modeleur.reperes_valides()
@@ -0,0 +1,26 @@
+import pytest
+
+from RechercheAnytime import RechercheAnytime
+from conftest import cout_chemin
+
+@pytest.mark.parametrize("mode", ['4', '8'])
+def test_cout_annonce_egal_au_cout_du_chemin(creer_modeleur, mode):
+    modeleur = creer_modeleur(60, 70, lissage=1)
+    modeleur.definir_mode_connexite(mode)
+    _, cout_optimal, _ = modeleur.executer_dijkstra((1, 2), (58, 66))
+
+    recherche = RechercheAnytime(modeleur, 1 * modeleur.largeur + 2, 58 * modeleur.largeur + 66, epsilon=5.0)
+    solutions = list(recherche.ameliorer())
+    assert len(solutions) > 1
+
+    for chemin, cout, borne in solutions:
+        assert cout == cout_chemin(modeleur, chemin)
+        assert cout <= borne * cout_optimal
+    assert solutions[-1][1] == cout_optimal
+
+def test_calculer_cout_chemin(creer_modeleur):
+    modeleur = creer_modeleur()
+    modeleur.definir_mode_connexite('8')
+    chemin, cout, _ = modeleur.executer_dijkstra((0, 0), (39, 49))
+    assert modeleur.calculer_cout_chemin(chemin) == cout == cout_chemin(modeleur, chemin)
+    assert modeleur.calculer_cout_chemin(chemin[:1]) == 0
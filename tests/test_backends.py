@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from BackendsDijkstra import BackendNumpy, BackendScipy
+from ModeleurGraphe import PREDECESSEUR_AUCUN
+from conftest import cout_chemin
+
+@pytest.mark.parametrize("mode", ['4', '8'])
+def test_champ_scipy_identique_au_champ_numpy(creer_modeleur, mode):
+    pytest.importorskip("scipy")
+    modeleur = creer_modeleur()
+    modeleur.definir_mode_connexite(mode)
+    u_sources = [0, 17 * modeleur.largeur + 23, modeleur.hauteur * modeleur.largeur - 1]
+
+    distances_numpy, _, _ = BackendNumpy.calculer_champ(modeleur, u_sources)
+    distances_scipy, predecesseurs_scipy, _ = BackendScipy.calculer_champ(modeleur, u_sources)
+
+    # Tous les pixels sont atteints (0 = non atteint)
+    np.testing.assert_array_equal(distances_scipy, distances_numpy)
+    assert not (distances_scipy == 0).any()
+
+    # Seules les sources n'ont pas de prédécesseur
+    sans_predecesseur = np.flatnonzero(predecesseurs_scipy == PREDECESSEUR_AUCUN)
+    assert sorted(sans_predecesseur.tolist()) == sorted(u_sources)
+
+def test_dijkstra_avec_backend_scipy(creer_modeleur):
+    pytest.importorskip("scipy")
+    modeleur = creer_modeleur()
+    _, cout_attendu, _ = modeleur.executer_dijkstra((3, 4), (35, 44))
+
+    modeleur.cache_arbres.vider()
+    modeleur.definir_backend_dijkstra('scipy')
+    chemin, cout, _ = modeleur.executer_dijkstra((3, 4), (35, 44))
+
+    assert cout == cout_attendu
+    assert chemin[0] == (3, 4) and chemin[-1] == (35, 44)
+    assert cout_chemin(modeleur, chemin) == cout
@@ -0,0 +1,20 @@
+def test_arbre_range_sous_sa_cle_de_creation(creer_modeleur):
+    modeleur = creer_modeleur()
+    arbre = modeleur.obtenir_arbre(0)
+    cle_creation = modeleur.cle_arbre(0)
+    assert arbre.cle == cle_creation
+
+    # La connexité change pendant que l'arbre est étendu (aperçu dans un autre fil)
+    modeleur.definir_mode_connexite('8')
+    modeleur.etendre_arbre(arbre)
+
+    assert modeleur.cache_arbres.obtenir(cle_creation) is arbre
+    assert modeleur.cache_arbres.obtenir(modeleur.cle_arbre(0)) is None
+
+def test_arbre_repris_depuis_le_cache(creer_modeleur):
+    modeleur = creer_modeleur()
+    chemin, cout, _ = modeleur.executer_dijkstra((0, 0), (10, 10))
+
+    # Le même départ vers un pixel déjà fixé ne développe aucun pixel
+    _, cout_repris, nb_noeuds_visites = modeleur.executer_dijkstra((0, 0), (10, 10))
+    assert cout_repris == cout and nb_noeuds_visites == 0
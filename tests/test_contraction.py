@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import HierarchieContraction
+from HierarchieContraction import HierarchieContraction as Hierarchie
+from conftest import cout_chemin
+
+def verifier_requetes(modeleur, hierarchie, nb_requetes=15):
+    generateur = np.random.default_rng(1)
+    for _ in range(nb_requetes):
+        depart = tuple(generateur.integers((modeleur.hauteur, modeleur.largeur)).tolist())
+        arrivee = tuple(generateur.integers((modeleur.hauteur, modeleur.largeur)).tolist())
+        _, cout_attendu, _ = modeleur.executer_dijkstra(depart, arrivee)
+
+        chemin, cout, _ = hierarchie.executer(depart[0] * modeleur.largeur + depart[1],
+                                              arrivee[0] * modeleur.largeur + arrivee[1])
+        assert cout == cout_attendu
+        assert chemin[0] == depart and chemin[-1] == arrivee
+        assert cout_chemin(modeleur, chemin) == cout
+
+@pytest.mark.parametrize("mode", ['4', '8'])
+def test_contraction_exacte(creer_modeleur, mode):
+    modeleur = creer_modeleur(30, 35, lissage=1)
+    modeleur.definir_mode_connexite(mode)
+    verifier_requetes(modeleur, Hierarchie.construire(modeleur))
+
+def test_contraction_avec_noyau(creer_modeleur, monkeypatch):
+    # Un degré maximal bas laisse une partie des pixels dans le noyau, dont les arêtes
+    # descendent aussi vers des rangs inférieurs
+    monkeypatch.setattr(HierarchieContraction, 'DEGRE_MAX_CONTRACTION', 6)
+    modeleur = creer_modeleur(30, 35, lissage=1)
+    modeleur.definir_mode_connexite('8')
+    hierarchie = Hierarchie.construire(modeleur)
+
+    sources = np.repeat(np.arange(len(hierarchie.rangs)), np.diff(hierarchie.debut))
+    assert (hierarchie.rangs[hierarchie.cibles] < hierarchie.rangs[sources]).any()
+    verifier_requetes(modeleur, hierarchie)
+
+def test_sauvegarde_et_chargement(creer_modeleur, tmp_path):
+    modeleur = creer_modeleur(20, 25)
+    hierarchie = Hierarchie.construire(modeleur)
+    chemin_fichier = str(tmp_path / 'image.ch.npz')
+    hierarchie.sauvegarder(chemin_fichier)
+
+    rechargee = Hierarchie.charger(chemin_fichier, hierarchie.cle)
+    np.testing.assert_array_equal(rechargee.cibles, hierarchie.cibles)
+    assert rechargee.executer(0, 499)[1] == hierarchie.executer(0, 499)[1]
+    assert Hierarchie.charger(chemin_fichier, ('autre', '4', 'contraste')) is None
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from FilesPriorite import FILES_PRIORITE, POIDS_MAX
+
+# Extraction de priorités monotones (chaque ajout est dans [minimum, minimum + amplitude]),
+# à partir d'une origine négative comme celle des distances stockées
+@pytest.mark.parametrize("type_file", list(FILES_PRIORITE))
+def test_extraction_dans_l_ordre_des_priorites(type_file):
+    origine = int(np.iinfo(np.int32).min)
+    file_priorite = FILES_PRIORITE[type_file](POIDS_MAX, origine)
+    file_priorite.ajouter(origine, 0)
+
+    generateur = np.random.default_rng(0)
+    extraites, u_suivant = [], 1
+    while file_priorite:
+        u = file_priorite.extraire()
+        priorite = file_priorite.courant
+        extraites.append((priorite, u))
+        if u_suivant < 2000:
+            for poids in generateur.integers(1, POIDS_MAX + 1, size=2).tolist():
+                file_priorite.ajouter(priorite + poids, u_suivant)
+                u_suivant += 1
+
+    priorites = [priorite for priorite, _ in extraites]
+    assert priorites == sorted(priorites)
+    assert sorted(u for _, u in extraites) == list(range(u_suivant))
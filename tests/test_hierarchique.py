@@ -0,0 +1,42 @@
+import pytest
+
+from SuiviCalcul import CalculAnnule, SuiviCalcul
+from conftest import cout_chemin
+
+REQUETES = [((0, 0), (69, 79)), ((5, 70), (66, 2)), ((33, 40), (37, 44)), ((10, 10), (12, 50))]
+
+@pytest.mark.parametrize("backend", ['numpy', 'scipy'])
+@pytest.mark.parametrize("mode", ['4', '8'])
+def test_hierarchie_exacte(creer_modeleur, backend, mode):
+    if backend == 'scipy':
+        pytest.importorskip("scipy")
+    modeleur = creer_modeleur(70, 80, lissage=1)
+    modeleur.definir_mode_connexite(mode)
+    modeleur.definir_backend_dijkstra(backend)
+    modeleur.construire_hierarchie(taille_tuile=16, exact=True)
+
+    for depart, arrivee in REQUETES:
+        chemin, cout, _ = modeleur.hierarchie.executer(depart, arrivee)
+        assert cout == modeleur.executer_dijkstra(depart, arrivee)[1]
+        assert chemin[0] == depart and chemin[-1] == arrivee
+        assert cout_chemin(modeleur, chemin) == cout
+
+def test_couts_intra_tuile_identiques_entre_backends(creer_modeleur):
+    pytest.importorskip("scipy")
+    modeleur = creer_modeleur(40, 40)
+    modeleur.construire_hierarchie(taille_tuile=16, exact=True)
+    couts_numpy = modeleur.hierarchie.couts_tuile
+
+    modeleur.definir_backend_dijkstra('scipy')
+    modeleur.construire_hierarchie(taille_tuile=16, exact=True)
+    for attendus, couts in zip(couts_numpy, modeleur.hierarchie.couts_tuile):
+        assert (attendus == couts).all()
+
+def test_construction_annulable(creer_modeleur):
+    modeleur = creer_modeleur()
+    suivi = SuiviCalcul()
+    suivi.annuler()
+
+    with pytest.raises(CalculAnnule):
+        modeleur.construire_hierarchie(taille_tuile=16, exact=True, suivi=suivi)
+    assert modeleur.hierarchie is None
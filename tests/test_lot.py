@@ -0,0 +1,31 @@
+import pytest
+
+from RechercheHierarchique import RechercheHierarchique
+from RecherchePyramide import RecherchePyramide
+
+REQUETES = [((0, 0), (299, 279)), ((150, 3), (2, 270)), ((40, 40), (45, 52)), ((290, 10), (10, 270))]
+
+# Les prétraitements faits par executer_lot dans le processus principal sont partagés : un
+# processus du pool qui les reconstruirait échouerait (pool créé par fork)
+@pytest.fixture
+def constructions_interdites(monkeypatch):
+    def construction_interdite(self, suivi=None):
+        raise AssertionError("Prétraitement reconstruit dans un processus du pool")
+
+    def interdire():
+        monkeypatch.setattr(RechercheHierarchique, 'construire', construction_interdite)
+        monkeypatch.setattr(RecherchePyramide, 'construire', construction_interdite)
+    return interdire
+
+@pytest.mark.parametrize("moteur", ['dijkstra', 'hierarchique', 'pyramide'])
+def test_lot_identique_aux_requetes_en_serie(creer_modeleur, constructions_interdites, moteur):
+    modeleur = creer_modeleur(300, 280, lissage=1)
+    modeleur.definir_moteur_recherche(moteur)
+    attendus = [modeleur.calculer_chemin(depart, arrivee)[:2] for depart, arrivee in REQUETES]
+
+    # Les requêtes en série ont fait les prétraitements : le lot ne doit plus en faire
+    constructions_interdites()
+    resultats = [(chemin, cout) for chemin, cout, _ in modeleur.executer_lot(REQUETES, nb_processus=2, taille_paquet=1)]
+
+    assert [cout for _, cout in resultats] == [cout for _, cout in attendus]
+    assert [chemin for chemin, _ in resultats] == [chemin for chemin, _ in attendus]
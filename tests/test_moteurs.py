@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from FilesPriorite import FILES_PRIORITE
+from conftest import cout_chemin
+
+MOTEURS_EXACTS = ['dijkstra', 'a_etoile', 'bidirectionnel', 'delta_stepping']
+
+@pytest.mark.parametrize("type_file", list(FILES_PRIORITE))
+@pytest.mark.parametrize("mode", ['4', '8'])
+@pytest.mark.parametrize("moteur", MOTEURS_EXACTS)
+def test_moteurs_exacts_donnent_le_cout_optimal(creer_modeleur, mode, moteur, type_file):
+    modeleur = creer_modeleur()
+    modeleur.definir_mode_connexite(mode)
+    _, cout_attendu, _ = modeleur.executer_dijkstra((2, 3), (37, 45))
+
+    # Le coût de référence est calculé avec le tas, le moteur testé avec chaque file
+    modeleur.cache_arbres.vider()
+    modeleur.definir_file_priorite(type_file)
+    modeleur.definir_moteur_recherche(moteur)
+    chemin, cout, _ = modeleur.calculer_chemin((2, 3), (37, 45))
+
+    assert type(cout) is int
+    assert cout == cout_attendu
+    assert chemin[0] == (2, 3) and chemin[-1] == (37, 45)
+    assert cout_chemin(modeleur, chemin) == cout
+
+# L'état des recherches projeté sur un fichier neuf n'est pas rempli : 0 signifie "non atteint"
+@pytest.mark.parametrize("moteur", MOTEURS_EXACTS + ['incremental', 'anytime'])
+def test_etat_memmap_neuf_non_rempli(creer_modeleur, tmp_path, moteur):
+    modeleur = creer_modeleur()
+    _, cout_attendu, _ = modeleur.executer_dijkstra((2, 3), (37, 45))
+
+    modeleur.definir_dossier_memmap(str(tmp_path))
+    distances, predecesseurs, origine = modeleur.creer_etat_recherche()
+    assert isinstance(distances, np.memmap) and not distances.any() and not predecesseurs.any()
+    assert origine == np.iinfo(distances.dtype).min
+
+    modeleur.definir_moteur_recherche(moteur)
+    modeleur.definir_budget_anytime(10.0)
+    _, cout, _ = modeleur.calculer_chemin((2, 3), (37, 45))
+    assert cout == cout_attendu
+
+def test_dijkstra_multi_identique_aux_requetes_simples(creer_modeleur):
+    modeleur = creer_modeleur()
+    arrivees = [(37, 45), (0, 49), (20, 20), (2, 3), (39, 0)]
+    chemins, couts, _ = modeleur.executer_dijkstra_multi((2, 3), arrivees)
+
+    for arrivee, chemin, cout in zip(arrivees, chemins, couts):
+        modeleur.cache_arbres.vider()
+        _, cout_attendu, _ = modeleur.executer_dijkstra((2, 3), arrivee)
+        assert cout == cout_attendu
+        assert chemin[0] == (2, 3) and chemin[-1] == arrivee
+        assert cout_chemin(modeleur, chemin) == cout
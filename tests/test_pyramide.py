@@ -0,0 +1,22 @@
+import pytest
+
+from conftest import cout_chemin
+
+@pytest.mark.parametrize("modele, parametres", [
+    ('gradient', {'inverse': False}), ('gradient', {'inverse': True}), ('couleur', {'echelle': 2.0})])
+@pytest.mark.parametrize("largeur_couloir", [0, 4])
+@pytest.mark.parametrize("verifier_optimalite", [False, True])
+def test_cout_pyramide_egal_au_cout_du_chemin(creer_modeleur, modele, parametres, largeur_couloir, verifier_optimalite):
+    modeleur = creer_modeleur(300, 280, lissage=1)
+    modeleur.definir_modele_cout(modele, **parametres)
+    _, cout_optimal, _ = modeleur.executer_dijkstra((4, 6), (291, 271))
+
+    modeleur.construire_pyramide(largeur_couloir, verifier_optimalite)
+    assert len(modeleur.pyramide.niveaux) > 1
+    chemin, cout, _ = modeleur.executer_pyramide((4, 6), (291, 271))
+
+    assert chemin[0] == (4, 6) and chemin[-1] == (291, 271)
+    assert cout == cout_chemin(modeleur, chemin)
+    assert cout >= cout_optimal
+    if verifier_optimalite:
+        assert cout == cout_optimal
@@ -0,0 +1,88 @@
+import tempfile
+
+import cv2
+import numpy as np
+import pytest
+
+import ModeleurGraphe
+from SourceImage import SourceTuilee
+
+def enregistrer_raster(tmp_path, hauteur=30, largeur=40):
+    chemin = str(tmp_path / "raster.npy")
+    np.save(chemin, np.random.default_rng(0).integers(0, 256, size=(hauteur, largeur), dtype=np.uint8))
+    return chemin
+
+def test_dossier_memmap_automatique_limite_au_raster(creer_modeleur, tmp_path, monkeypatch):
+    monkeypatch.setattr(ModeleurGraphe, 'dossier_en_memoire', lambda dossier: False)
+    modeleur = creer_modeleur()
+    chemin_image = modeleur.chemin_fichier_original
+
+    assert modeleur.charger_image(enregistrer_raster(tmp_path))[0]
+    assert modeleur.dossier_memmap == tempfile.gettempdir()
+    assert isinstance(modeleur.obtenir_plans_poids(), np.memmap)
+    _, cout, _ = modeleur.executer_dijkstra((0, 0), (29, 39))
+    assert cout > 0
+
+    assert modeleur.charger_image(chemin_image)[0]
+    assert modeleur.dossier_memmap is None
+    assert not isinstance(modeleur.obtenir_plans_poids(), np.memmap)
+
+def test_dossier_memmap_explicite_conserve(creer_modeleur, tmp_path):
+    modeleur = creer_modeleur()
+    chemin_image = modeleur.chemin_fichier_original
+    modeleur.definir_dossier_memmap(str(tmp_path))
+
+    assert modeleur.charger_image(enregistrer_raster(tmp_path))[0]
+    assert modeleur.charger_image(chemin_image)[0]
+    assert modeleur.dossier_memmap == str(tmp_path)
+    assert isinstance(modeleur.obtenir_plans_poids(), np.memmap)
+
+# Un dossier temporaire en mémoire vive (tmpfs) est écarté au profit de celui du raster ; sans
+# dossier sur disque, le chargement échoue
+def test_dossier_memmap_automatique_hors_tmpfs(creer_modeleur, tmp_path, monkeypatch):
+    modeleur = creer_modeleur()
+    monkeypatch.setattr(ModeleurGraphe, 'dossier_en_memoire', lambda dossier: dossier == tempfile.gettempdir())
+    assert modeleur.charger_image(enregistrer_raster(tmp_path))[0]
+    assert modeleur.dossier_memmap == str(tmp_path)
+
+    monkeypatch.setattr(ModeleurGraphe, 'dossier_en_memoire', lambda dossier: True)
+    modeleur = creer_modeleur()
+    reussi, _ = modeleur.charger_image(enregistrer_raster(tmp_path))
+    assert not reussi and not modeleur.est_chargee
+    with pytest.raises(ValueError):
+        modeleur.definir_dossier_memmap(str(tmp_path))
+
+# Fenêtres à cheval sur plusieurs tuiles, avec un cache plus petit que le raster
+@pytest.mark.parametrize("canaux", [(), (3,)])
+def test_fenetres_tuilees_identiques_au_raster(canaux):
+    raster = np.random.default_rng(1).integers(0, 256, size=(70, 90) + canaux, dtype=np.uint8)
+    gris = cv2.cvtColor(raster, cv2.COLOR_BGR2GRAY) if canaux else raster
+    source = SourceTuilee(raster, taille_tuile=16, nb_tuiles_cache=3)
+
+    for h0, h1, l0, l1 in [(0, 70, 0, 90), (5, 37, 14, 61), (15, 17, 31, 33), (60, 70, 80, 90), (3, 3, 0, 9)]:
+        np.testing.assert_array_equal(source[h0:h1, l0:l1], gris[h0:h1, l0:l1])
+    assert len(source.tuiles) <= 3
+    assert source.calculer_empreinte() == SourceTuilee(gris).calculer_empreinte()
+
+# Plans calculés par bandes (raster de plusieurs tuiles de hauteur, en memmap) identiques à
+# ceux de la même image chargée en mémoire, ainsi que l'empreinte et les coûts
+@pytest.mark.parametrize("mode", ['4', '8'])
+@pytest.mark.parametrize("modele", ['contraste', 'gradient'])
+def test_plans_raster_identiques_a_l_image_en_memoire(tmp_path, mode, modele):
+    gris = np.random.default_rng(2).integers(0, 256, size=(1100, 40), dtype=np.uint8)
+    chemin_raster, chemin_image = str(tmp_path / "raster.npy"), str(tmp_path / "image.png")
+    np.save(chemin_raster, gris)
+    cv2.imwrite(chemin_image, gris)
+
+    modeleurs = [ModeleurGraphe.ModeleurGraphe(), ModeleurGraphe.ModeleurGraphe()]
+    for modeleur, chemin in zip(modeleurs, (chemin_raster, chemin_image)):
+        assert modeleur.charger_image(chemin)[0]
+        modeleur.definir_mode_connexite(mode)
+        modeleur.definir_modele_cout(modele)
+    raster, image = modeleurs
+
+    assert isinstance(raster.image_gris, SourceTuilee) and raster.image_gris.taille_tuile < raster.hauteur
+    assert isinstance(raster.obtenir_plans_poids(), np.memmap)
+    np.testing.assert_array_equal(raster.obtenir_plans_poids(), image.obtenir_plans_poids())
+    assert raster.empreinte_image == image.empreinte_image
+    assert raster.executer_dijkstra((0, 0), (1099, 39))[1] == image.executer_dijkstra((0, 0), (1099, 39))[1]